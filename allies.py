@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import json
-import random
+from collections import namedtuple
 from collections.abc import Callable, Sequence
-from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Literal, Self, overload
+from typing import TYPE_CHECKING, Any, Literal, overload
+
+import dmg
 
 # import type: output only ->
 from effects import (
@@ -36,102 +38,132 @@ from effects import (
     Weaken,
 )
 from flags import FLAG
+from sink import engine
 from value_index import VALUE_INDEX
 
 if TYPE_CHECKING:
     from battle import Ally, Enemy, View
 
 
-@dataclass
-class PercDmgObject:
-    DAMAGE: int
+data_dir = (Path(__file__).parent / "data").resolve()
 
-    def __mod__(self, other: int):
-        return DamageObject(self.DAMAGE, other)
+AD: dict = json.load(data_dir.joinpath("AD.json").open("r"))
+BASE_HP: dict = json.load(data_dir.joinpath("HP.json").open("r"))
+general: dict = json.load(data_dir.joinpath("general.json").open("r"))
 
 
-@dataclass
-class DamageObject:
-    base: int
-    multiplier: int
+def level_of(general: dict) -> int:
+    """the level of the xp in a general document (general.json or the profile's)"""
+    xp = general.get("xp", 0)
+    scale = general.get("level_scale")
 
-    @property
-    def damage(self):
-        return int((self.base / 100) * self.multiplier)
+    if scale is None:
+        raise KeyError("level_scale")
 
-    def __int__(self):
-        return self.damage
+    level = 0
 
-    def __mod__(self, other) -> Self:
-        return type(self)(self.damage, other)
+    while True:
+        if xp > scale:
+            level += 1
+            xp -= scale
+            scale += int(scale / 2)
+            continue
+        break
 
+    return level
 
-def get_chance(chance: int) -> bool:
-    if chance > 100 or chance < 0:
-        raise ValueError(
-            f"Invalid chance parameter: {chance},"
-            " expected an integer in range 0-100 (inclusive)"
-        )
-    return random.choices([True, False], weights=[chance, 100 - chance])[0]
 
+HP: dict[str, float] = {}
+AD_DICT: dict[str, int] = {}
 
-data_dir = (Path(__file__).parent / "data").resolve()
 
-AD: dict = json.load(data_dir.joinpath("AD.json").open("r"))
-HP: dict = json.load(data_dir.joinpath("HP.json").open("r"))
-general: dict = json.load(data_dir.joinpath("general.json").open("r"))
+def set_level(new: int) -> None:
+    """
+    scale the health and attack damage of the birds to level `new`,
+    data/general.json's level on import, main.py sets the level
+    of the profile it plays with (the sqlite one if there is one)
+    """
+    global level, red, chuck, matilda, bomb, blues
+
+    level = new
+
+    for name, val in BASE_HP.items():
+        perc = val / 100 * 2
+        HP[name] = val + perc * level
+
+    # AD in hundredths of a hp, +2% per level, exact at any level, see dmg.attack
+    AD_DICT.update(
+        {name: int(val * (dmg.HUNDREDTHS + 2 * level)) for name, val in AD.items()}
+    )
+
+    # there should be a better way to do this
+    red = AD_DICT["red"]
+    chuck = AD_DICT["chuck"]
+    matilda = AD_DICT["matilda"]
+    bomb = AD_DICT["bomb"]
+    blues = AD_DICT["blues"]
+
+
+level: int
+red: int
+chuck: int
+matilda: int
+bomb: int
+blues: int
 
-xp = general.get("xp", 0)
-scale = general.get("level_scale")
+set_level(level_of(general))
 
-if scale is None:
-    raise KeyError("level_scale")
 
-level = 0
+@cache
+def record_type(fields: tuple[str, ...]) -> type:
+    """the immutable record of an ability with these stats, one type per set of stats"""
+    return namedtuple("Stats", fields)
 
-while True:
-    if xp > scale:
-        level += 1
-        xp -= scale
-        scale += int(scale / 2)
-        continue
-    break
 
-for name, val in HP.items():
-    perc = val / 100 * 2
-    val += perc * level
-    HP[name] = val
+def record(stats: dict[str, Any]) -> Any:
+    return record_type(tuple(stats))(**stats)
 
-for name, val in AD.items():
-    perc = val / 100 * 2
-    val += perc * level
-    AD[name] = val
 
-AD_DICT = {name: PercDmgObject(val) for name, val in AD.items()}
+# VALUE_INDEX compiled once into a record per ability,
+# dict[(birdname, classname, typ), record], chilis have no class: (birdname, None, "chili")
+STATS: dict[tuple[str, str | None, str], Any] = {}
 
-# there should be a better way to do this
-red = AD_DICT["red"]
-chuck = AD_DICT["chuck"]
-matilda = AD_DICT["matilda"]
-bomb = AD_DICT["bomb"]
-blues = AD_DICT["blues"]
+for birdname, classes in VALUE_INDEX.items():
+    for classname, abilities in classes.items():
+        if classname == "chili":
+            STATS[birdname, None, "chili"] = record(abilities)
+            continue
 
-# TODO: make the getattr get the stats fully
-# so they can be modified after (to finally be able to send 50% damage)
+        for typ, stats in abilities.items():
+            STATS[birdname, classname, typ] = record(stats)
 
 
 class AbilityHandlerObject:
-    name: str
+    """
+    a copy of an ability's stats to change before sending it, see Ability.get
+
+    reads go to the ability's record, a stat written
+    to the copy only changes the copy, not the record
+    """
+
+    def __init__(self, stats: Any, name: str) -> None:
+        self.stats = stats
+        self.name = name
 
     def sbm[T: Effect](self, effect: type[T], **kwargs) -> T:
         return effect(name=self.name, **kwargs)
 
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stats, name)
+
 
 class Ability:
     def __init__(self, ability: Callable) -> None:
         self.ability = ability
         self.name = self.ability.__name__.replace("_", " ").strip()
         self.flags: Sequence[FLAG] = ()
+        # the record of the ability's stats in STATS, see bind
+        self.stats: Any = None
 
         # container is received upon BirdCollection initiation so be careful!
         self.container: BirdCollection
@@ -142,7 +174,7 @@ class Ability:
     # i really wanna typehint Effect and also capture args, but only kwargs
     # but in the current type system, thats not possible
     def sbm[T: Effect](self, effect: type[T], **kwargs) -> T:
-        print(f"Submitted effect {effect.__name__} with name {self.name}")
+        engine.debug("Submitted effect {} with name {}", effect.__name__, self.name)
         return effect(name=self.name, **kwargs)
 
     # subclasses should override this function (and super() call)
@@ -151,23 +183,21 @@ class Ability:
         self.ability(self, birdself, *args)
         birdself.battle.death_check()
 
-    def get(self) -> Any:
-        birdname = self.container.birdname
-        classname = self.container.current_class
-
-        copy = AbilityHandlerObject()
-
-        if self.typ == "chili":
-            obj: dict = VALUE_INDEX[birdname][self.typ]
-        else:
-            obj: dict = VALUE_INDEX[birdname][classname][self.typ]
+    def bind(self, classname: str | None) -> None:
+        """
+        look up the ability's record in STATS,
+        its stats become plain attributes of the ability
+        """
+        self.stats = STATS.get((self.container.birdname, classname, self.typ))
 
-        for name, val in obj.items():
-            setattr(copy, name, val)
+        if self.stats is not None:
+            vars(self).update(self.stats._asdict())
 
-        copy.name = self.name
+    def get(self) -> Any:
+        if self.stats is None:
+            raise KeyError(f"{self.container.birdname} {self.name} has no stats")
 
-        return copy
+        return AbilityHandlerObject(self.stats, self.name)
 
     def send(self, new: AbilityHandlerObject, *args) -> None:
         self.ability(new, *args)
@@ -186,6 +216,7 @@ class Ability:
     @overload
     def __getattr__(self, name: str) -> Any: ...
 
+    # only for stats missing from the record (see bind)
     def __getattr__(self, name: str) -> Any:
         birdname = self.container.birdname
         classname = self.container.current_class
@@ -242,16 +273,19 @@ class BirdCollection:
         if not classes:
             raise ValueError("Expected at least one BirdClass object")
 
-        for cls in classes:
-            cls.attack.container = cls.support.container = self
-
         self.TOTAL_HP = self.hp = int(HP[birdname])
 
         self.classes = {cls.classname: cls for cls in classes}
         self.chili = Chili(chili)
         self.birdname = birdname
 
+        for cls in classes:
+            cls.attack.container = cls.support.container = self
+            cls.attack.bind(cls.classname)
+            cls.support.bind(cls.classname)
+
         self.chili.container = self
+        self.chili.bind(None)
 
     def get_class(self, classname: str) -> BirdClass:
         try:
@@ -302,13 +336,13 @@ self: the bird activating their chili ability
 
 
 def _Attack(atk: Attack, self: Ally, target: Enemy):
-    damage = red % atk.damage
+    damage = dmg.attack(red, atk.damage)
 
     effects = [atk.sbm(ForceTarget, target=self, turns=3)]
 
     target.deal_damage(damage, self, effects)
 
-    print(f"{self.name} deals {int(damage)} hp to {target.name}!")
+    self.battle.log.info("{} deals {} hp to {}!", self.name, damage, target.name)
 
 
 def Protect(pas: Passive, self: Ally, target: Enemy):
@@ -317,11 +351,11 @@ def Protect(pas: Passive, self: Ally, target: Enemy):
     shield = pas.sbm(Shield, effectiveness=55, turns=2)
 
     target.add_pos_effects(shield)
-    print(f"{target.name} gets a 55% shield for 2 turns!")
+    self.battle.log.info("{} gets a 55% shield for 2 turns!", target.name)
 
 
 def Overpower(atk: Attack, self: Ally, target: Enemy):
-    damage = red % atk.damage
+    damage = dmg.attack(red, atk.damage)
 
     target.deal_damage(damage, self, [atk.sbm(DamageDebuff, turns=2, effectiveness=25)])
 
@@ -332,7 +366,7 @@ def Aura_Of_Fortitude(pas: Passive, self: Ally, target: Enemy):
 
 
 def Dragon_Strike(atk: Attack, self: Ally, target: Enemy):
-    slice = red % atk.damage
+    slice = dmg.attack(red, atk.damage)
 
     for i in range(3):
         target.deal_damage(slice, self)
@@ -347,10 +381,10 @@ def Defensive_Formation(pas: Passive, self: Ally, target: Enemy):
 
 
 def Revenge(atk: Attack, self: Ally, target: Enemy):
-    damage = red % atk.damage
+    damage = dmg.attack(red, atk.damage)
 
-    damage = PercDmgObject(int(damage)) % (
-        100 + (abs(int(self.hp / (self.TOTAL_HP / 100)) - 100) * 2)
+    damage = dmg.percent(
+        damage, 100 + (abs(dmg.share(self.hp, self.TOTAL_HP) - 100) * 2)
     )
 
     target.deal_damage(damage, self)
@@ -365,21 +399,19 @@ def avenger_support(pas: Passive, self: Ally, target: Enemy):
 
 
 def Holy_Strike(atk: Attack, self: Ally, target: Enemy):
-    damage = red % atk.damage
+    damage = dmg.attack(red, atk.damage)
     heal = atk.heal
 
     _, _, damage, *_ = target.deal_damage(damage, self)
 
-    actual_heal = PercDmgObject(damage) % heal
+    actual_heal = dmg.percent(damage, heal)
 
-    if all(unit.hp == unit.TOTAL_HP for unit in self.battle.allied_units.values()):
+    # fixed: the heal should be based percentage wise
+    heal_target = self.battle.units.lowest_percent(is_ally=True)
+
+    if heal_target.hp == heal_target.TOTAL_HP:  # everyone is at full health
         self.heal(actual_heal)
     else:
-        # fixed: the heal should be based percentage wise
-        heal_target = min(
-            self.battle.allied_units.values(),
-            key=lambda unit: unit.hp / (unit.TOTAL_HP / 100),
-        )
         heal_target.heal(actual_heal)
 
 
@@ -390,7 +422,7 @@ def _Devotion(pas: Passive, self: Ally, target: Ally):
 
 
 def Feral_Assault(atk: Attack, self: Ally, target: Enemy):
-    damage = red % atk.damage
+    damage = dmg.attack(red, atk.damage)
     slice = atk.slice
 
     for _ in range(slice):  # how find out
@@ -402,7 +434,7 @@ def Feral_Assault(atk: Attack, self: Ally, target: Enemy):
         new = target.get_target(self)
 
         if new.neg_effects:
-            damage = PercDmgObject(int(damage)) % 150
+            damage = dmg.percent(damage, 150)
 
         # XXX i actually think i dont have to use the direct parameter?
         new.deal_damage(damage, self, direct=True)
@@ -424,14 +456,17 @@ def Ancestral_Protection(pas: Passive, self: Ally, target: Enemy):
 
 
 def Storm(atk: Attack, self: Ally, target: Enemy):
-    damage = chuck % atk.damage
+    damage = dmg.attack(chuck, atk.damage)
 
-    for enemy in self.battle.enemy_units.values():
-        enemy.deal_damage(damage, self, direct=True)
+    self.battle.deal_damage_many(
+        ((enemy, damage, ()) for enemy in self.battle.enemy_units.values()),
+        self,
+        direct=True,
+    )
 
 
 def Shock_Shield(pas: Passive, self: Ally, target: Ally):
-    damage = chuck % pas.damage
+    damage = dmg.attack(chuck, pas.damage)
 
     effects = pas.sbm(ShockShield, turns=3, damage=damage)
 
@@ -439,11 +474,11 @@ def Shock_Shield(pas: Passive, self: Ally, target: Ally):
 
 
 def Energy_Drain(atk: Attack, self: Ally, target: Enemy):
-    damage = chuck % atk.damage
+    damage = dmg.attack(chuck, atk.damage)
     chance = atk.dispell_chance
 
     for enemy in self.battle.enemy_units.values():
-        if get_chance(chance):
+        if self.battle.rng.chance(chance):
             enemy.dispell()
 
         enemy.deal_damage(damage, self, direct=True)
@@ -452,42 +487,42 @@ def Energy_Drain(atk: Attack, self: Ally, target: Enemy):
 def Lightning_Fast(pas: Passive, self: Ally, target: Ally):
     target._class.attack(
         target,
-        random.choice((*self.battle.enemy_units.values(),)),
+        self.battle.rng.choice((*self.battle.enemy_units.values(),)),
         flags=[FLAG.super_atk],
     )
 
 
 def Acid_Rain(atk: Attack, self: Ally, target: Enemy):
-    damage = chuck % atk.damage
-    poison = chuck % atk.poison
+    damage = dmg.attack(chuck, atk.damage)
+    poison = dmg.attack(chuck, atk.poison)
 
     # XXX mutability issues may occur
     # mutability issues did infact occur i love myself im so silly :3
 
-    for enemy in self.battle.enemy_units.values():
-        enemy.deal_damage(
-            damage,
-            self,
-            effects=(atk.sbm(ToxicPoison, turns=3, damage=poison),),
-            direct=True,
-        )
+    self.battle.deal_damage_many(
+        (
+            (enemy, damage, (atk.sbm(ToxicPoison, turns=3, damage=poison),))
+            for enemy in self.battle.enemy_units.values()
+        ),
+        self,
+        direct=True,
+    )
 
 
 def Healing_Rain(pas: Passive, self: Ally, target: Ally):
-    heal = PercDmgObject(self.TOTAL_HP) % pas.heal
+    heal = dmg.percent(self.TOTAL_HP, pas.heal)
 
     target.cleanse()
 
-    for ally in self.battle.allied_units.values():
-        ally.heal(heal)
+    self.battle.heal_many((ally, heal) for ally in self.battle.allied_units.values())
 
 
 # this is one of the hardest functions to write
 def Chain_Lightning(atk: Attack, self: Ally, target: Enemy):
-    damage0 = chuck % atk.damage
-    damage1 = chuck % atk.damage1
-    damage2 = chuck % atk.damage2
-    damage3 = chuck % atk.damage3
+    damage0 = dmg.attack(chuck, atk.damage)
+    damage1 = dmg.attack(chuck, atk.damage1)
+    damage2 = dmg.attack(chuck, atk.damage2)
+    damage3 = dmg.attack(chuck, atk.damage3)
 
     # this is gonna be a little harder
     # what im i gonna do is
@@ -581,27 +616,29 @@ def _Energize(pas: Passive, self: Ally, target: Ally):
 
 
 def Thunderclap(atk: Attack, self: Ally, target: Enemy):
-    damage = chuck % atk.damage
+    damage = dmg.attack(chuck, atk.damage)
 
     effect = atk.sbm(Weaken, effectiveness=atk.effectiveness, turns=3)
 
-    for enemy in self.battle.enemy_units.values():
-        if target.is_same(enemy):
-            enemy.deal_damage(damage, self, effects=(effect,), direct=True)
-            continue
-
-        enemy.deal_damage(damage, self, direct=True)
+    self.battle.deal_damage_many(
+        (
+            (enemy, damage, (effect,) if target.is_same(enemy) else ())
+            for enemy in self.battle.enemy_units.values()
+        ),
+        self,
+        direct=True,
+    )
 
 
 def Rage_Of_Thunder(pas: Passive, self: Ally, target: Ally):
-    damage = chuck % pas.damage
+    damage = dmg.attack(chuck, pas.damage)
 
     for ally in self.battle.allied_units.values():
         ally.add_pos_effects(pas.sbm(ShockShield, turns=3, damage=damage))
 
 
 def Dancing_Spark(atk: Attack, self: Ally, target: Enemy):
-    damage = chuck % atk.damage
+    damage = dmg.attack(chuck, atk.damage)
 
     effect = atk.sbm(ThunderStorm, shared_damage_perc=atk.shared_damage, turns=3)
 
@@ -624,12 +661,12 @@ def Mirror_Image(pas: Passive, self: Ally, target: Ally):
 
 
 def Healing_Strike(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
+    damage = dmg.attack(matilda, atk.damage)
     heal = atk.heal
 
     _, _, damage, _ = target.deal_damage(damage, self)
 
-    actual_heal = PercDmgObject(damage) % heal
+    actual_heal = dmg.percent(damage, heal)
 
     for ally in self.battle.allied_units.values():
         ally.heal(actual_heal)
@@ -641,8 +678,8 @@ def Healing_Shield(pas: Passive, self: Ally, target: Ally):
 
 
 def Thorny_Vine(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
-    poison = matilda % atk.poison
+    damage = dmg.attack(matilda, atk.damage)
+    poison = dmg.attack(matilda, atk.poison)
 
     target.deal_damage(
         damage, self, effects=(atk.sbm(ThornyPoison, damage=poison, turns=3),)
@@ -650,18 +687,20 @@ def Thorny_Vine(atk: Attack, self: Ally, target: Enemy):
 
 
 def Regrownth(pas: Passive, self: Ally, target: Ally):
-    main = PercDmgObject(self.TOTAL_HP) % pas.heal
-    others = PercDmgObject(self.TOTAL_HP) % pas.others
+    main = dmg.percent(self.TOTAL_HP, pas.heal)
+    others = dmg.percent(self.TOTAL_HP, pas.others)
 
     target.heal(main)
 
-    for ally in self.battle.allied_units.values():
-        if not ally.is_same(target):
-            ally.heal(others)
+    self.battle.heal_many(
+        (ally, others)
+        for ally in self.battle.allied_units.values()
+        if not ally.is_same(target)
+    )
 
 
 def Royal_Order(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
+    damage = dmg.attack(matilda, atk.damage)
 
     target.deal_damage(damage, self)
 
@@ -669,26 +708,26 @@ def Royal_Order(atk: Attack, self: Ally, target: Enemy):
         enemy.add_neg_effects(
             atk.sbm(
                 ForceTarget,
-                target=max(self.battle.allied_units.values(), key=lambda ally: ally.hp),
+                target=self.battle.units.highest(is_ally=True),
                 turns=3,
             )
         )
 
 
 def Royal_Aid(pas: Passive, self: Ally, target: Ally):
-    heal = PercDmgObject(self.TOTAL_HP) % pas.heal
+    heal = dmg.percent(self.TOTAL_HP, pas.heal)
 
     target.cleanse()
     target.heal(heal)
 
 
 def Angelic_Touch(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
+    damage = dmg.attack(matilda, atk.damage)
     slice = atk.slice
     heal = atk.heal
 
     def drain(ally, enemy, damage):
-        return int((ally.TOTAL_HP / 100) * heal)
+        return dmg.percent(ally.TOTAL_HP, heal)
 
     for _ in range(slice):
         target.deal_damage(
@@ -707,19 +746,19 @@ def Spirit_Link(pas: Passive, self: Ally, target: Ally):
 
 
 def Heavy_Metal(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
+    damage = dmg.attack(matilda, atk.damage)
     stun_chance = atk.stun_chance
 
     effects = []
-    if get_chance(stun_chance):
+    if self.battle.rng.chance(stun_chance):
         effects.append(atk.sbm(Knock, turns=1))
 
     target.deal_damage(damage, self, effects)
 
 
 def Soothing_Song(pas: Passive, self: Ally, target: Ally):
-    main_heal = PercDmgObject(self.TOTAL_HP) % pas.main_heal
-    side_heal = PercDmgObject(self.TOTAL_HP) % pas.side_heal
+    main_heal = dmg.percent(self.TOTAL_HP, pas.main_heal)
+    side_heal = dmg.percent(self.TOTAL_HP, pas.side_heal)
 
     for ally in self.battle.allied_units.values():
         if ally.is_same(target):
@@ -730,13 +769,13 @@ def Soothing_Song(pas: Passive, self: Ally, target: Ally):
 
 
 def Sinister_Smite(atk: Attack, self: Ally, target: Enemy):
-    damage = matilda % atk.damage
+    damage = dmg.attack(matilda, atk.damage)
 
     effects = [
         atk.sbm(
             LifeSteal,
             steal_target=self,
-            damage=lambda ally, enemy: damage % 15,
+            damage=lambda ally, enemy: dmg.percent(damage, 15),
             heal=lambda ally, enemy, damage: damage,
         )
     ]
@@ -745,7 +784,7 @@ def Sinister_Smite(atk: Attack, self: Ally, target: Enemy):
 
 
 def Giant_Growth(pas: Passive, self: Ally, target: Ally):
-    print("Passive ability call to witch")
+    self.battle.log.debug("Passive ability call to witch")
     attack_boost = pas.attack
     health_boost = pas.health
 
@@ -758,7 +797,7 @@ def Giant_Growth(pas: Passive, self: Ally, target: Ally):
 
 
 def Pummel(atk: Attack, self: Ally, target: Enemy):
-    target.deal_damage(bomb % atk.damage, self)
+    target.deal_damage(dmg.attack(bomb, atk.damage), self)
 
 
 def pirate_support(pas: Passive, self: Ally, target: Ally):
@@ -768,7 +807,7 @@ def pirate_support(pas: Passive, self: Ally, target: Ally):
 
 
 def Cover_Fire(atk: Attack, self: Ally, target: Enemy):
-    damage = bomb % atk.damage
+    damage = dmg.attack(bomb, atk.damage)
     slice = atk.slice
     debuff = atk.debuff
 
@@ -785,41 +824,46 @@ def _Counter(pas: Passive, self: Ally, target: Ally):
 
 
 def Enrage(atk: Attack, self: Ally, target: Enemy):
-    damage = bomb % atk.damage
+    damage = dmg.attack(bomb, atk.damage)
 
-    bonus = self.battle.chili * 0.5
+    bonus = self.battle.chili // 2
 
-    damage = PercDmgObject(int(damage)) % int(100 + bonus)
+    damage = dmg.percent(damage, 100 + bonus)
 
     target.deal_damage(damage, self)
 
 
 def Frenzy(pas: Passive, self: Ally, target: Ally):
-    damage = PercDmgObject(target.TOTAL_HP) % 15
+    damage = dmg.percent(target.TOTAL_HP, 15)
 
     # XXX might break things, but its really this direct
-    target.hp -= int(damage)
+    target.hp -= damage
 
-    for enemy in self.battle.enemy_units.values():
-        enemy.deal_damage(damage, self, direct=True)
+    self.battle.deal_damage_many(
+        ((enemy, damage, ()) for enemy in self.battle.enemy_units.values()),
+        self,
+        direct=True,
+    )
 
 
 def Raid(atk: Attack, self: Ally, target: Enemy):
     target.dispell()
-    target.deal_damage(bomb % atk.damage, self)
+    target.deal_damage(dmg.attack(bomb, atk.damage), self)
 
 
 def Whip_Up(pas: Passive, self: Ally, target: Ally):
-    deplete = PercDmgObject(target.TOTAL_HP) % 10
+    deplete = dmg.percent(target.TOTAL_HP, 10)
 
-    target.hp -= int(deplete)
+    target.hp -= deplete
     target.add_pos_effects(pas.sbm(DamageBuff, turns=3, effectiveness=pas.buff))
 
 
 def Hulk_Smash(atk: Attack, self: Ally, target: Enemy):
-    damage = int(bomb % atk.damage)
+    damage = dmg.attack(bomb, atk.damage)
 
-    damage = damage * (100 - (self.hp / self.TOTAL_HP))
+    # damage * (100 - hp / total hp), over the total hp to stay whole numbers
+    total = self.TOTAL_HP
+    damage = dmg.truncate(damage * (100 * total - self.hp), total)
 
     target.deal_damage(damage, self)
 
@@ -829,13 +873,13 @@ def Gang_Up(pas: Passive, self: Ally, target: Ally):
 
 
 def Frost_Strike(atk: Attack, self: Ally, target: Enemy):
-    damage = bomb % atk.damage
+    damage = dmg.attack(bomb, atk.damage)
     bonus = atk.bonus
 
     target = target.get_target(self)  # type: ignore
 
     if any(effect.is_knocked for effect in target.effects.values()):
-        damage = damage % bonus
+        damage = dmg.percent(damage, bonus)
 
     target.deal_damage(damage, self, direct=True)
 
@@ -856,7 +900,7 @@ def Freezing_Barrier(pas: Passive, self: Ally, target: Ally):
 
 
 def Volley(atk: Attack, self: Ally, target: Enemy):
-    damage = blues % atk.damage
+    damage = dmg.attack(blues, atk.damage)
     slice = atk.slice
     weaken = atk.weaken
 
@@ -868,7 +912,12 @@ def Volley(atk: Attack, self: Ally, target: Enemy):
 
 def _Ambush(pas: Passive, self: Ally, target: Ally):
     target.add_pos_effects(
-        pas.sbm(Ambush, ambusher=self, turns=2, damage=lambda damage: int(damage / 2))
+        pas.sbm(
+            Ambush,
+            ambusher=self,
+            turns=2,
+            damage=lambda damage: dmg.percent(damage, 50),
+        )
     )
 
 
@@ -882,10 +931,10 @@ def _Ambush(pas: Passive, self: Ally, target: Ally):
 def Heroic_Strike(chili: Chili, self: Ally):
     battle = self.battle
 
-    chili_damage = red % chili.damage
+    chili_damage = dmg.attack(red, chili.damage)
 
     # red's chili always attacks the highest current health target
-    target = max(battle.enemy_units.values(), key=lambda x: x.hp)
+    target = battle.units.highest(is_ally=False)
     target.deal_damage(chili_damage, self)
 
 
@@ -911,7 +960,9 @@ def Speed_Of_Light(chili: Chili, self: Ally):
             return  # once an ally dies, the chili gets cancelled
 
         unit._attack(
-            unit, random.choice([*battle.enemy_units.values()]), flags=(FLAG.super_atk,)
+            unit,
+            battle.rng.choice([*battle.enemy_units.values()]),
+            flags=(FLAG.super_atk,),
         )
         c += 1
 
@@ -927,26 +978,29 @@ def matilda_chili(chili: Chili, self: Ally):
     for unit in battle.allied_units.values():
         unit.cleanse()
 
-    for unit in battle.allied_units.values():
-        actual = PercDmgObject(unit.TOTAL_HP) % heal
-
-        unit.heal(actual)
+    battle.heal_many(
+        (unit, dmg.percent(unit.TOTAL_HP, heal))
+        for unit in battle.allied_units.values()
+    )
 
 
 def Explode(chili: Chili, self: Ally):
-    damage = bomb % chili.damage
+    damage = dmg.attack(bomb, chili.damage)
 
-    for unit in self.battle.enemy_units.values():
-        unit.deal_damage(damage, self)
+    self.battle.deal_damage_many(
+        ((unit, damage, ()) for unit in self.battle.enemy_units.values()), self
+    )
 
 
 def Egg_Surprise(chili: Chili, self: Ally):
     battle = self.battle
-    damage = blues % chili.damage
+    damage = dmg.attack(blues, chili.damage)
 
-    random.choice([*battle.enemy_units.values()]).dispell()
-    random.choice([*battle.enemy_units.values()]).deal_damage(damage, self, direct=True)
-    random.choice([*battle.enemy_units.values()]).add_neg_effects(
+    battle.rng.choice([*battle.enemy_units.values()]).dispell()
+    battle.rng.choice([*battle.enemy_units.values()]).deal_damage(
+        damage, self, direct=True
+    )
+    battle.rng.choice([*battle.enemy_units.values()]).add_neg_effects(
         chili.sbm(Knock, turns=1)
     )
 
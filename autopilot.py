@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from rng import BattleRNG
+
+# the autopilot, a monte carlo tree search policy, see AutoPolicy
+
+if TYPE_CHECKING:
+    from battle import Action, Ally, Battlefield
+
+
+@dataclass(slots=True)
+class Node:
+    """
+    the statistics of one decision in the search tree
+
+    the tree is open loop, a node is reached by a sequence of actions
+    and not by a battle state, every visit rolls the chances
+    (chance effects, random targets) again with a fresh rng,
+    so a node's value is the average over the outcomes of those rolls,
+    these are the chance nodes of the search
+    """
+
+    visits: int = 0
+    value: float = 0.0  # the sum of the values of every visit
+    children: dict[Action, Node] = field(default_factory=dict)
+
+    def mean(self) -> float:
+        return self.value / self.visits if self.visits else 0.0
+
+
+class AutoPolicy:
+    """
+    pick every ally action with a time budgeted monte carlo tree search
+
+    every search iteration forks the battle (see Battlefield.fork),
+    walks down the tree with UCB1, adds one new node, plays random
+    actions for `horizon` more rounds and scores how the battle went,
+    see evaluate
+
+    seed: the seed for the rngs of the search
+    budget: seconds to think per action, None for no limit
+    iterations: the most search iterations per action, None for no limit,
+    set this without a budget for reproducible searches
+    horizon: rounds to play ahead after leaving the tree
+    exploration: the exploration constant of UCB1
+
+    the search runs in the calling thread, the rollouts are pure python
+    and threads would only take turns on the GIL, simulate.py plays
+    its battles on a process pool instead
+
+    every fork of the search gets closed once its done (see Battlefield.close),
+    so the battle goes on reading its waves like it was never searched
+    """
+
+    def __init__(
+        self,
+        seed: int | None = None,
+        budget: float | None = 0.2,
+        iterations: int | None = None,
+        horizon: int = 3,
+        exploration: float = 1.4,
+    ) -> None:
+        if budget is None and iterations is None:
+            raise ValueError("A search needs a budget, iterations or both")
+
+        self.random = random.Random(seed)
+        self.budget = budget
+        self.iterations = iterations
+        self.horizon = horizon
+        self.exploration = exploration
+
+    def choose(self, battle: Battlefield, choices: Sequence[Ally]) -> Action | None:
+        from battle import silent
+
+        if not any(battle.legal_actions(ally) for ally in choices):
+            return None
+
+        deadline = None if self.budget is None else time.perf_counter() + self.budget
+
+        # the forks are silent, nothing gets printed while searching
+        root = battle.fork()
+        root.echo = silent
+
+        try:
+            tree = self.search(root, self.random.getrandbits(63), deadline)
+        finally:
+            root.close()
+
+        children = tree.children
+
+        if not children:  # out of time before the first iteration
+            return self.actions(battle)[0]
+
+        # the most visited, then the most valuable
+        return max(children, key=lambda a: (children[a].visits, children[a].value))
+
+    def search(self, root: Battlefield, seed: int, deadline: float | None) -> Node:
+        """grow one tree from `root` until the budget or iterations run out"""
+        rand = random.Random(seed)
+        tree = Node()
+        reference = Reference.of(root)
+        done = 0
+
+        while (deadline is None or time.perf_counter() < deadline) and (
+            self.iterations is None or done < self.iterations
+        ):
+            battle = root.fork(BattleRNG(rand.getrandbits(63)))
+
+            try:
+                self.iterate(tree, battle, reference, rand)
+            finally:
+                battle.close()
+
+            done += 1
+
+        return tree
+
+    def iterate(
+        self, tree: Node, battle: Battlefield, reference: Reference, rand: random.Random
+    ) -> None:
+        from battle import result
+
+        node = tree
+        path = [tree]
+
+        # selection, down the tree until an action hasnt been tried yet
+        while battle.result == result.no_result:
+            actions = self.actions(battle)
+
+            if not actions:
+                break
+
+            new = [action for action in actions if action not in node.children]
+
+            if new:  # expansion
+                action = rand.choice(new)
+                node.children[action] = node = Node()
+                path.append(node)
+                self.step(battle, action)
+                break
+
+            parent = node
+            action = max(actions, key=lambda action: self.ucb(parent, action))
+            node = node.children[action]
+            path.append(node)
+            self.step(battle, action)
+
+        self.rollout(battle, reference.turn + self.horizon, rand)
+        value = evaluate(battle, reference)
+
+        # backpropagation
+        for node in path:
+            node.visits += 1
+            node.value += value
+
+    def ucb(self, parent: Node, action: Action) -> float:
+        child = parent.children[action]
+        return child.mean() + self.exploration * math.sqrt(
+            math.log(parent.visits) / child.visits
+        )
+
+    def actions(self, battle: Battlefield) -> list[Action]:
+        """
+        the legal actions of the first ally who has any,
+        the allies play in a fixed order to keep the tree narrow
+        """
+        for ally in battle.unplayed():
+            actions = battle.legal_actions(ally)
+            if actions:
+                return actions
+
+        return []
+
+    def step(self, battle: Battlefield, action: Action) -> None:
+        """play `action` and go on until the next ally decision"""
+        from battle import result
+
+        if battle.perform(action) != result.no_result:
+            return
+
+        while not self.actions(battle):
+            if battle.enemies_turn() != result.no_result:
+                return
+
+            if battle.allies_turn() != result.no_result:
+                return
+
+    def rollout(self, battle: Battlefield, turn: int, rand: random.Random) -> None:
+        """play random actions until the battle ends or `turn` is over"""
+        from battle import result
+
+        while battle.result == result.no_result and battle.turn <= turn:
+            actions = self.actions(battle)
+
+            if not actions:  # nobody can play, the round goes on without them
+                if battle.enemies_turn() != result.no_result:
+                    return
+                battle.allies_turn()
+                continue
+
+            self.step(battle, rand.choice(actions))
+
+
+@dataclass(slots=True)
+class Reference:
+    """what a searched position gets compared to, see evaluate"""
+
+    turn: int
+    wave: int
+    allies_hp: int
+
+    @classmethod
+    def of(cls, battle: Battlefield) -> Reference:
+        return cls(
+            battle.turn,
+            battle.wave_int,
+            sum(ally.TOTAL_HP for ally in battle.allied_units.values()),
+        )
+
+
+def evaluate(battle: Battlefield, reference: Reference) -> float:
+    """
+    how good `battle` looks compared to `reference`, from 0.0 to 1.0
+
+    a won battle is 1.0, a lost one 0.0, otherwise the surviving ally health
+    and the progress through the waves (waves cleared plus the health
+    the current wave lost) both count
+    """
+    from battle import result
+
+    if battle.result == result.won:
+        return 1.0
+
+    if battle.result == result.lost:
+        return 0.0
+
+    allies = sum(ally.hp for ally in battle.allied_units.values())
+
+    enemies = battle.enemy_units.values()
+    wave_hp = sum(enemy.TOTAL_HP for enemy in enemies) or 1
+    wave_damage = 1 - sum(enemy.hp for enemy in enemies) / wave_hp
+
+    progress = battle.wave_int - reference.wave + wave_damage
+
+    return 0.6 * min(1.0, allies / reference.allies_hp) + 0.4 * progress / (
+        progress + 1
+    )
+
+
+def describe(action: Action) -> str:
+    """`action` as the battle> command which plays it"""
+    return " ".join(
+        part for part in (action.kind, action.ally, action.target) if part is not None
+    )
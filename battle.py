@@ -1,20 +1,37 @@
 from __future__ import annotations
 
-import random
-from collections.abc import Iterable, Sequence
+import itertools
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Final, Protocol, runtime_checkable
+from operator import attrgetter
+from typing import TYPE_CHECKING, Final, Literal, Protocol, runtime_checkable
 
 import rich.table
 from rich import print
 
 from allies import CLASSES_DICT
+from commands import Dispatcher, completing
+from effects import HookRegistry
 from enemies import Enemy
+from expiry import ALLIES_TURN, ENEMIES_TURN, ExpiryWheel
 
 # import type: switch
 from help import help
+from prompts import ask
+from render import BattleView
+from rng import BattleRNG
+from sink import INFO, EventSink
+from units import UnitRegistry
 from value_index import BIRDS_TABLE
 from view import View
+from waves import (
+    DUMMY_ENEMIES,
+    DUMMY_FIRST,
+    DUMMY_LEVELS,
+    DUMMY_SPREAD,
+    WaveStream,
+)
 
 
 class Table(rich.table.Table):
@@ -28,6 +45,7 @@ class Table(rich.table.Table):
 if TYPE_CHECKING:
     from battle import View
     from effects import Effect
+    from journal import Journal
     from main import MainObj
 
 
@@ -88,11 +106,52 @@ class DummyControlSet:
     def control(self, name: str) -> Iterable[str]:
         return (name,)
 
+    def resolve(self, alias: str) -> str | None:
+        return alias
+
 
 @runtime_checkable
 class SupportsControl(Protocol):
     def control(self, name: str) -> Iterable[str]: ...
 
+    # the action of an alias, see commands.Commands
+    def resolve(self, alias: str) -> str | None: ...
+
+
+type ActionKind = Literal["attack", "support", "chili"]
+
+
+@dataclass(frozen=True)
+class Action:
+    """
+    a single ally move, the headless version of a battle> command
+
+    kind: "attack", "support" or "chili"
+    ally: the clsname of the ally playing the action
+    target: the name of the targeted unit,
+    None for chilies, ambiguous attacks and self support
+    """
+
+    kind: ActionKind
+    ally: str
+    target: str | None = None
+
+
+@runtime_checkable
+class Policy(Protocol):
+    def choose(self, battle: Battlefield, choices: Sequence[Ally]) -> Action | None:
+        """
+        pick the next action for one of `choices`,
+        the allies who can still play this turn
+
+        return None to end the allies' turn early
+        """
+        ...
+
+
+def silent(*args, **kwargs) -> None:
+    """an echo which doesnt output anything, for headless battles"""
+
 
 class Battlefield:
     def __init__(
@@ -101,7 +160,11 @@ class Battlefield:
         allies: Sequence[Ally],
         chili=0,
         control_set: SupportsControl = DummyControlSet(),
-        highlighter,
+        highlighter=None,
+        echo: Callable[..., None] = print,
+        rng: BattleRNG | None = None,
+        journal: Journal | None = None,
+        stream: Iterable[list[Enemy]] = (),
     ):
         """
         A battlefield representing an angry birds epic battle
@@ -119,7 +182,18 @@ class Battlefield:
             the names that match
             if not return the an iterable with the only item being
             the string passed in passed in
+            and obj.resolve(str), the other way around, the action
+            an alias is for (see commands.Commands)
             by default a control set without any bindinds is chosen
+            echo=print, where battle messages are sent,
+            pass `silent` for headless battles, it subscribes
+            to the battle's `log` (see EventSink) at the INFO level
+            rng=None, the random number service of this battle,
+            every chance roll goes through it, pass a seeded
+            BattleRNG for reproducible battles
+            journal=None, a Journal to record every event of this battle in
+            stream=(), the waves after `waves`, any iterable, a generator
+            only makes the next wave once the battle gets to it, see WaveStream
 
             this is all asbstract, we are always gonna be using
             mainobj as our control "set", its not the container
@@ -161,21 +235,34 @@ class Battlefield:
         Battlefield.start_battle() will raise a
         ValueError if theres no units on either side
         """
-        if not waves:
+        self.waves = WaveStream(itertools.chain(waves, stream))
+        self.wave_int = 1  # also the index of the next wave
+
+        first = self.waves.get(0)
+        if first is None:
             raise ValueError("No waves")
 
         self.control_set = control_set
         self.highlighter = highlighter
-
-        self.WAVES = waves
-        self.wave_int = 1
-
-        self.exhaust_waves = list(waves)
-        del self.exhaust_waves[0]
+        self.log = EventSink()
+        self.echo = echo
+        self.rng = BattleRNG() if rng is None else rng
+
+        self.journal = journal
+        if journal is not None:
+            journal.seed = self.rng.seed
+            self.rng.journal = journal
+        self.hooks = HookRegistry()
+        self.expiry = ExpiryWheel()
+        self.screen: BattleView | None = None  # see view_battle
+        # dict[id, unit], the units whose hp dropped to 0 since the last death_check
+        self.dying: dict[int, View] = {}
+
+        self.waves.add_reader(self)
 
         self._id = -1
 
-        enemies = {enemy.name: enemy for enemy in waves[0]}
+        enemies = {enemy.name: enemy for enemy in first}
         _allies = {ally.clsname: ally for ally in allies}
 
         for unit in _allies.values():
@@ -184,20 +271,45 @@ class Battlefield:
         for unit in enemies.values():
             unit.id = self.id
 
-        self.allied_units = _allies
-        self.enemy_units = enemies
+        self.units = UnitRegistry()
+
+        for unit in (*_allies.values(), *enemies.values()):
+            self.units.add(unit)
+
         self.turn = 0
+        self.played: list[str] = []
         self._chili = chili  # in procents
         self.result = result.no_result
 
         for unit in self.units.values():
             unit.battle = self
 
+        if journal is not None:
+            for unit in self.units.values():
+                journal.spawn(unit)
+            journal.chili(self._chili)
+
     @property
     def id(self):
         self._id += 1
         return self._id
 
+    @property
+    def echo(self) -> Callable[..., None]:
+        """where the battle messages are sent, see __init__"""
+        return self._echo
+
+    @echo.setter
+    def echo(self, echo: Callable[..., None]) -> None:
+        old = getattr(self, "_echo", None)
+        if old is not None:
+            self.log.unsubscribe(old)
+
+        self._echo = echo
+
+        if echo is not silent:
+            self.log.subscribe(echo, INFO)
+
     @property
     def chili(self):
         return self._chili
@@ -208,15 +320,26 @@ class Battlefield:
         if self.chili > 100:
             self._chili = 100
 
+        if self.journal is not None:
+            self.journal.chili(self._chili)
+
+    @property
+    def allied_units(self) -> Mapping[str, Ally]:
+        """read only, use the add_*_unit methods to add units"""
+        return self.units.allies
+
     @property
-    def units(self):
-        """return the two unit dictionaries combined/merged"""
-        return self.allied_units | self.enemy_units
+    def enemy_units(self) -> Mapping[str, Enemy]:
+        """read only, use the add_*_unit methods to add units"""
+        return self.units.enemies
 
     def add_allied_unit(self, unit: Ally):
         unit.battle = self
         unit.id = self.id
-        self.allied_units[unit.name] = unit
+        self.units.add(unit)
+
+        if self.journal is not None:
+            self.journal.spawn(unit)
 
     def add_units_based_on_attr(self, *units: View):
         for unit in units:
@@ -231,29 +354,303 @@ class Battlefield:
     def add_enemy_unit(self, unit: Enemy):
         unit.battle = self
         unit.id = self.id
-        self.enemy_units[unit.name] = unit
+        self.units.add(unit)
+
+        if self.journal is not None:
+            self.journal.spawn(unit)
+
+    def deal_damage_many[T: View](
+        self,
+        hits: Iterable[tuple[View, ConvertibleToInt, Sequence[Effect]]],
+        source: T,
+        direct: bool = False,
+    ) -> list[tuple[View, T, int, Sequence[Effect]]]:
+        """
+        one area of effect attack, every (target, damage, effects) of `hits`
+        gets hit by `source` in order, see View.deal_damage
+
+        the same as calling deal_damage on every target yourself,
+        the after_hit effects of a hit (counters, shared damage...) react
+        before the next target gets hit, the effects dispatched to
+        (see HookRegistry) are gathered once and reused until an effect
+        of the battle comes or goes
+
+        the dead are left for the death_check after the ability,
+        which then removes all of them at once
+
+        -> the results of deal_damage, one per hit
+        """
+        return [
+            target.deal_damage(damage, source, effects, direct)
+            for target, damage, effects in hits
+        ]
+
+    def heal_many(self, heals: Iterable[tuple[View, ConvertibleToInt]]) -> None:
+        """heal every (target, heal) of `heals` in order, see deal_damage_many"""
+        for target, heal in heals:
+            target.heal(heal)
 
     def death_check(self):
-        for unit in self.units.values():
-            if unit.is_dead():
-                if isinstance(unit, Ally):
-                    del self.allied_units[unit.clsname]
-                else:
-                    del self.enemy_units[unit.name]
+        """
+        remove the units which died since the last check,
+        bring in the next wave or decide the result
+
+        only the units View.hp put under `dying` get looked at,
+        not every unit of the battle, units get added with their hp
+        above 0 and can only die through it
+        """
+        dying = self.dying
+        dead = [
+            unit for unit in dying.values() if unit.is_dead() and self.units.has(unit)
+        ]
+        dying.clear()
+
+        # in the order the units were added, ids only go up
+        dead.sort(key=attrgetter("id"))
 
-                print(f"\n{unit.name} dies.")
+        for unit in dead:
+            self.units.remove(unit)
+            self.hooks.drop(unit)
+            self.expiry.drop(unit)
+
+            if self.journal is not None:
+                self.journal.death(unit)
+
+            self.log.info("\n{} dies.", unit.name)
 
         if not self.allied_units:
             self.result = result.lost
 
         if not self.enemy_units:
-            if len(self.exhaust_waves):
+            if self.waves.get(self.wave_int) is not None:
                 self.next_wave()
-                print(f"Wave defeated! Incoming wave {self.wave_int}...\n")
+                self.log.info("Wave defeated! Incoming wave {}...\n", self.wave_int)
             else:
                 self.result = result.won
 
-    def start_battle(self) -> result:
+        if self.journal is not None and self.result != result.no_result:
+            self.journal.result(self.result.value)
+
+    def allies_turn(self) -> result:
+        """
+        start a new round, the allies' turn
+
+        expires the effects which run out at the start of the allies' turn
+        and triggers Effect.enemies_end_of_turn for every effect
+        """
+        self.played: list[str] = []
+        self.turn += 1
+
+        self.log.info("\nBirds turn!\n")
+
+        if self.journal is not None:
+            self.journal.new_turn(self.turn, enemies=False)
+
+        for unit, effect in self.expiry.tick(ALLIES_TURN):
+            if self.journal is not None:
+                self.journal.expired(unit, effect)
+
+            effect.on_exit()
+
+            unit.remove_effect(effect)
+
+            self.log.info("'{}' effect expired on {}.", effect.name, unit.name)
+
+        for effect in self.hooks["enemies_end_of_turn"]:
+            effect.enemies_end_of_turn()
+            self.death_check()
+            if self.result != result.no_result:
+                return self.result
+
+        return self.result
+
+    def enemies_turn(self) -> result:
+        """
+        play out the enemies' turn
+
+        expires the effects which run out at the start of the enemies' turn,
+        triggers Effect.allies_end_of_turn for every effect
+        and lets every enemy attack
+        """
+        self.log.info("\nEnemies' turn!\n")
+
+        if self.journal is not None:
+            self.journal.new_turn(self.turn, enemies=True)
+
+        for unit, effect in self.expiry.tick(ENEMIES_TURN):
+            if self.journal is not None:
+                self.journal.expired(unit, effect)
+
+            effect.on_exit()
+
+            unit.remove_effect(effect)
+
+            self.log.info("'{}' effect expired on {}.", effect.name, unit.name)
+
+        for effect in self.hooks["allies_end_of_turn"]:
+            effect.allies_end_of_turn()
+            self.death_check()
+            if self.result != result.no_result:
+                return self.result
+
+        for enemy in list(self.enemy_units.values()):
+            try:
+                self.enemy_units[enemy.name]
+            except KeyError:  # the enemy is dead
+                continue
+
+            enemy.attack()
+            self.death_check()
+            if self.result != result.no_result:
+                return self.result
+
+        self.log.info("\nEnd of enemies' turn!\n")
+
+        return self.result
+
+    def unplayed(self) -> list[Ally]:
+        """allies who still havent played their turn and arent knocked"""
+        return [
+            unit
+            for unit in self.allied_units.values()
+            if unit.clsname not in self.played
+            and not any(effect.is_knocked for effect in unit.effects.values())
+        ]
+
+    def blocked_by(self, ally: Ally, kind: ActionKind) -> list[str]:
+        """names of the effects preventing `ally` from using `kind`"""
+        return [
+            effect.name
+            for effect in ally.effects.values()
+            if not getattr(effect, f"can_{kind}")
+        ]
+
+    def legal_actions(self, ally: Ally) -> list[Action]:
+        """every action `ally` is allowed to play right now"""
+        actions: list[Action] = []
+
+        if not self.blocked_by(ally, "attack"):
+            actions.extend(
+                Action("attack", ally.clsname, name) for name in self.enemy_units
+            )
+
+        if not self.blocked_by(ally, "support"):
+            actions.extend(
+                Action("support", ally.clsname, name) for name in self.allied_units
+            )
+
+        if self.chili == 100 and not self.blocked_by(ally, "chili"):
+            actions.append(Action("chili", ally.clsname))
+
+        return actions
+
+    def act(self, action: Action) -> result:
+        """
+        validate and play `action`, the headless counterpart of typing
+        a command at the battle> prompt
+
+        raises ValueError if the action is not allowed
+        """
+        ally = self.allied_units.get(action.ally)
+
+        if ally is None:
+            raise ValueError(f"No ally named '{action.ally}'")
+
+        if ally.clsname in self.played:
+            raise ValueError(f"'{ally.clsname}' has already played this turn")
+
+        if effects := self.blocked_by(ally, action.kind):
+            raise ValueError(
+                f"'{ally.clsname}' can't use {action.kind}"
+                f" because of {', '.join(effects)}"
+            )
+
+        if action.kind == "attack":
+            if action.target is None and not ally._attack.supports_ambiguos_use:
+                raise ValueError("Missing target argument")
+
+            if action.target is not None and action.target not in self.enemy_units:
+                raise ValueError(f"No enemy named '{action.target}'")
+
+        elif action.kind == "support":
+            if action.target is not None and action.target not in self.allied_units:
+                raise ValueError(f"No ally named '{action.target}'")
+
+        elif self.chili != 100:
+            raise ValueError(
+                f"Chili is not charged up to 100%, chili is at {self.chili}%"
+            )
+
+        return self.perform(action)
+
+    def perform(self, action: Action) -> result:
+        """play `action` without validating it, see Battlefield.act"""
+        ally = self.allied_units[action.ally]
+        journal = self.journal
+
+        self.played.append(ally.clsname)
+
+        if action.kind == "attack":
+            if action.target is None:
+                # grab the first enemy, it literally doesnt care
+                enemy = next(iter(self.enemy_units.values()))
+            else:
+                enemy = self.enemy_units[action.target]
+
+            if journal is not None:
+                journal.action(action, ally, enemy)
+
+            ally.attack(enemy)
+
+        elif action.kind == "support":
+            target = self.allied_units[action.target or ally.clsname]
+
+            if journal is not None:
+                journal.action(action, ally, target)
+
+            ally.support(target)
+
+        else:
+            if journal is not None:
+                journal.action(action, ally, None)
+
+            ally.chili()
+            self.chili = 0
+
+        return self.result
+
+    def run(self, policy: Policy, max_turns: int | None = None) -> result:
+        """
+        play the whole battle headlessly, without prompts or rendering
+
+        `policy` supplies every ally action, the turn structure is the same
+        as Battlefield.start_battle, see Policy
+
+        max_turns: stop after this many rounds, the result is then
+        result.no_result, for battles which might never end
+        """
+        self.check_units()
+
+        while True:
+            if max_turns is not None and self.turn >= max_turns:
+                return self.result
+
+            if self.allies_turn() != result.no_result:
+                return self.result
+
+            while choices := self.unplayed():
+                action = policy.choose(self, choices)
+
+                if action is None:
+                    break
+
+                if self.act(action) != result.no_result:
+                    return self.result
+
+            if self.enemies_turn() != result.no_result:
+                return self.result
+
+    def check_units(self):
         if not self.units:
             raise ValueError(
                 f"Missing units on either side,"
@@ -261,345 +658,374 @@ class Battlefield:
                 f" enemies={len(self.enemy_units)}"
             )
 
-        control = self.control_set.control
+    # forking
 
-        while True:
-            self.played: list[str] = []
-            self.turn += 1
+    def fork(self, rng: BattleRNG | None = None) -> Battlefield:
+        """
+        an independent copy of this battle to play ahead with,
+        for lookahead and what-if analysis
 
-            print("\nBirds turn!\n")
+        the units and their effects (with their remaining turns),
+        the chili, the wave, the turn and the played allies get copied,
+        nothing done to the fork touches this battle or the other way around
 
-            to_delete: dict[View, Effect] = {}
+        the copies are shallow, the birds, classes, abilities
+        and the functions effects hold are shared,
+        the waves still to come are shared too, the enemies of a wave
+        only get copied once a battle reaches it, see next_wave
 
-            for unit in self.enemy_units.values():
-                for effect in unit.neg_effects.values():
-                    effect.turns -= 1
-                    if effect.turns == 0:
-                        to_delete[unit] = effect
+        rng: the rng of the fork, by default a copy of this battle's rng,
+        so the fork rolls exactly what this battle would,
+        pass rng.split(...) to let forks roll differently
 
-            for unit in self.allied_units.values():
-                for effect in unit.pos_effects.values():
-                    effect.turns -= 1
-                    if effect.turns == 0:
-                        to_delete[unit] = effect
+        a fork has no journal
+        """
+        new = object.__new__(type(self))
+        new.control_set = self.control_set
+        new.highlighter = self.highlighter
+        new.log = EventSink()
+        new.echo = self.echo
+        new.journal = None
+        new.screen = None
+
+        self._copy_into(new, rng)
+        return new
+
+    def close(self) -> None:
+        """
+        a fork which is done, it stops reading the waves, so the battle
+        it was forked from goes back to playing the original enemies
+        (and not copies) once its the only one left reading them
+        """
+        self.waves.remove_reader(self)
+
+    def snapshot(self) -> Battlefield:
+        """the current state to go back to later, see restore"""
+        return self.fork()
 
-            for unit, effect in to_delete.items():
-                effect.on_exit()
+    def restore(self, snapshot: Battlefield) -> None:
+        """
+        go back to the state of `snapshot`, a snapshot or fork of this battle,
+        the snapshot is left untouched, so it can be restored again
 
-                if effect.is_pos:
-                    del unit.pos_effects[effect.name]
-                else:
-                    del unit.neg_effects[effect.name]
+        the journal is kept but not rewound
+        """
+        snapshot._copy_into(self)
 
-                print(f"'{effect.name}' effect expired on {unit.name}.")
+        if self.journal is not None:
+            self.rng.journal = self.journal
 
-            for unit in self.units.values():
-                for effect in unit.effects.values():
-                    effect.enemies_end_of_turn()
-                    self.death_check()
-                    if self.result != result.no_result:
-                        return self.result
+    def _copy_into(self, new: Battlefield, rng: BattleRNG | None = None) -> None:
+        # dict[id(original), copy], units and effects referring to each other
+        # (wearers, targets, effects shared by several units) keep doing so
+        copies: dict[int, object] = {}
 
-            while True:
-                self.view_battle()
+        def copy_unit[T: View](unit: T) -> T:
+            clone = copies.get(id(unit))
+            if clone is not None:
+                return clone  # type: ignore
+
+            clone = copies[id(unit)] = shallow_copy(unit)
+            clone.battle = new
+            clone.pos_effects = {
+                name: copy_effect(effect) for name, effect in unit.pos_effects.items()
+            }
+            clone.neg_effects = {
+                name: copy_effect(effect) for name, effect in unit.neg_effects.items()
+            }
+
+            # the only unit a unit refers to
+            target = getattr(unit, "current_target", None)
+            if target is not None:
+                clone.current_target = copy_unit(target)  # type: ignore
+
+            return clone
+
+        def copy_effect(effect: Effect) -> Effect:
+            clone = copies.get(id(effect))
+            if clone is not None:
+                return clone  # type: ignore
+
+            clone = copies[id(effect)] = shallow_copy(effect)
 
-                check = [
-                    unit
-                    for unit in self.allied_units.values()
-                    if unit.clsname not in self.played
-                ]
+            attrs = clone.__dict__
+            for name, value in attrs.items():
+                if is_unit(value):  # wearer, target, protector...
+                    attrs[name] = copy_unit(value)
 
-                temp = [unit.name for unit in check]
+            return clone
 
-                for unit in check:
-                    if any(effect.is_knocked for effect in unit.effects.values()):
-                        temp.remove(unit.name)
+        units = UnitRegistry()
+        for unit in self.units.values():
+            units.add(copy_unit(unit))
+
+        new.units = units
+        new.dying = {
+            id: copy_unit(unit)
+            for id, unit in self.dying.items()
+            if self.units.has(unit)
+        }
+        new.hooks = self.hooks.copy(copy_effect)
+        new.expiry = self.expiry.copy(copy_unit, copy_effect)
+        new.rng = self.rng.copy() if rng is None else rng
+
+        new.waves = self.waves
+        new.waves.add_reader(new)
+        new.wave_int = self.wave_int
+
+        new._id = self._id
+        new.turn = self.turn
+        new._chili = self._chili
+        new.result = self.result
+        new.played = self.played.copy()
+
+    def start_battle(self) -> result:
+        self.check_units()
+
+        # the battle> prompt, a handler returns the result of the battle once it ended
+        handlers = {
+            "help": self.command_help,
+            "attack": self.command_attack,
+            "support": self.command_support,
+            "chili": self.command_chili,
+            "stat": self.command_stat,
+            "turns": self.command_turns,
+            "hint": self.command_hint,
+            "abort": self.command_abort,
+        }
+        commands = Dispatcher(self.control_set, handlers, aliasable=handlers)
+
+        # tab completes the unit names
+        with completing(lambda prefix: self.units.prefixed(prefix)):
+            return self.play_prompt(commands)
+
+    def play_prompt(self, commands: Dispatcher[result | None]) -> result:
+        while True:
+            if self.allies_turn() != result.no_result:
+                return self.result
+
+            while True:
+                self.view_battle()
 
-                if not temp:
+                if not self.unplayed():
                     break
 
-                cmd = input("\nbattle> ").lower().strip().split(" ")
+                cmd = ask("\nbattle> ").lower().strip().split(" ")
 
                 command = cmd[0]
 
-                if command in control("help"):
-                    print(help["battle_help"])
+                if not command:
                     continue
 
-                elif command in control("attack"):
-                    try:
-                        attack, ally, *args = cmd
-                    except ValueError:
-                        print("Not enough arguments")
-                        continue
-
-                    target = args[0] if args else None
-
-                    ally = self.startswith_ally(ally)
-
-                    if ally is None:
-                        continue
-
-                    _marker = False
-                    effects = []
-
-                    for effect in ally.effects.values():
-                        if not effect.can_attack:
-                            effects.append(effect.name)
-                            _marker = True
-
-                    if _marker:
-                        if len(effects) == 1:
-                            print(
-                                f"'{ally.clsname}' can't attack because of '{effects[0]}' effect."
-                            )
-                        else:
-                            string_effects = ", ".join(
-                                f"'{effect}'" for effect in effects
-                            )
-                            print(
-                                f"'{ally.clsname}' can't attack because of {string_effects} effects."
-                            )
-
-                        continue
-
-                    if target is None and not ally._attack.supports_ambiguos_use:
-                        print("Missing target argument.")
-                        continue
-
-                    elif target is None:
-                        # grab the first enemy, it literally doesnt care
-                        enemy = list(self.enemy_units.values())[0]
-
-                    else:
-                        enemy = self.startswith_enemy(target)
-
-                        if enemy is None:
-                            continue
-
-                    self.played.append(ally.clsname)
-                    ally.attack(self.enemy_units[enemy.name])
-                    if self.result != result.no_result:
-                        return self.result
-
-                elif command in control("support"):
-                    try:
-                        passive, ally, *args = cmd
-                    except ValueError:
-                        print("Not enough arguments")
-                        continue
-
-                    if len(args) == 0:
-                        target = ally
-                    else:
-                        target = args[0]
-
-                    ally = self.startswith_ally(ally)
-
-                    if ally is None:
-                        continue
-
-                    _marker = False
-                    effects = []
-
-                    for effect in ally.effects.values():
-                        if not effect.can_support:
-                            effects.append(effect.name)
-                            _marker = True
-
-                    if _marker:
-                        if len(effects) == 1:
-                            print(
-                                f"'{ally.clsname}' can't use support because of '{effects[0]}' effect."
-                            )
-                        else:
-                            string_effects = ", ".join(
-                                f"'{effect}'" for effect in effects
-                            )
-                            print(
-                                f"'{ally.clsname}' can't use support because of {string_effects} effects."
-                            )
-
-                        continue
-
-                    target = self.startswith_ally(target)
-
-                    if target is None:
-                        continue
-
-                    self.played.append(ally.clsname)
-                    ally.support(self.allied_units[target.clsname])
-
-                    if self.result != result.no_result:
-                        return self.result
-
-                elif command in control("chili"):
-                    try:
-                        attack, ally, *args = cmd
-                    except ValueError:
-                        print("Not enough arguments")
-                        continue
-
-                    if "-help" in args or "-h" in args:
-                        print(help["chili"])
-                        continue
-
-                    ally = self.startswith_ally(ally)
-
-                    if ally is None:
-                        continue
-
-                    _marker = False
-                    effects = []
-
-                    for effect in ally.effects.values():
-                        if not effect.can_chili:
-                            effects.append(effect.name)
-                            _marker = True
-
-                    if _marker:
-                        if len(effects) == 1:
-                            print(
-                                f"'{ally.clsname}' can't use chili because of '{effects[0]}' effect."
-                            )
-                        else:
-                            string_effects = ", ".join(
-                                f"'{effect}'" for effect in effects
-                            )
-                            print(
-                                f"'{ally.clsname}' can't use chili because of {string_effects} effects."
-                            )
-
-                        continue
-
-                    if self.chili != 100:
-                        print(
-                            f"Chili is not charged up to 100%, chili is at {self.chili}%"
-                        )
-                        continue
+                action = commands.lookup(command)
 
-                    self.played.append(ally.clsname)
-                    ally.chili()
-                    self.chili = 0
+                if action is None:
+                    print(f"No command found for '{command}'\ntype help for help\n")
+                    continue
 
-                    if self.result != result.no_result:
-                        return self.result
+                res = commands.run(action, cmd)
 
-                elif command in control("stat"):
-                    try:
-                        stat, target, *args = cmd
-                    except ValueError:
-                        print("Missing argument 'target' for command stat")
-                        continue
+                if res is not None:
+                    return res
 
-                    if target in self.units:
-                        target = self.units[target]
+            if self.enemies_turn() != result.no_result:
+                return self.result
 
-                        name = (
-                            target.clsname if isinstance(target, Ally) else target.name
-                        )
+    def command_help(self, cmd: list[str]) -> result | None:
+        print(help["battle_help"])
 
-                        with Table(title=f"Viewing stats of {name}") as table:
-                            table.add_column("Name")
-                            table.add_column("Current Health/Total Health")
-                            table.add_column("Effects")
-
-                            table.add_row(
-                                name,
-                                f"{target.hp}/{target.TOTAL_HP}",
-                                (", ".join(target.effects) or "No active effects"),
-                            )
-                    else:
-                        print(f"No unit found for '{target}'")
-
-                elif command in control("turns"):
-                    with Table() as table:
-                        table.add_column("Unplayed:")
-                        for unit in self.allied_units.values():
-                            if unit.clsname not in self.played:
-                                table.add_row(unit.clsname)
-
-                elif command in control("abort"):
-                    while True:
-                        i = input(
-                            "Are you sure you want to abort?\nCONFIRM/no\nabort> "
-                        )
-                        if i == "CONFIRM":
-                            return result.game_aborted
-                        elif i == "no":
-                            break
-                        else:
-                            print("Please input CONFIRM or no\n")
-
-                elif not command:
-                    continue
+    def command_attack(self, cmd: list[str]) -> result | None:
+        try:
+            attack, ally, *args = cmd
+        except ValueError:
+            print("Not enough arguments")
+            return None
 
-                else:
-                    print(f"No command found for '{command}'\ntype help for help\n")
+        target = args[0] if args else None
 
-            print("\nEnemies' turn!\n")
+        ally = self.startswith_ally(ally)
 
-            to_delete = {}
+        if ally is None:
+            return None
 
-            for unit in self.enemy_units.values():
-                for effect in unit.pos_effects.values():
-                    effect.turns -= 1
-                    if effect.turns == 0:
-                        to_delete[unit] = effect
+        effects = self.blocked_by(ally, "attack")
 
-            for unit in self.allied_units.values():
-                for effect in unit.neg_effects.values():
-                    effect.turns -= 1
-                    if effect.turns == 0:
-                        to_delete[unit] = effect
+        if effects:
+            if len(effects) == 1:
+                print(
+                    f"'{ally.clsname}' can't attack because of '{effects[0]}' effect."
+                )
+            else:
+                string_effects = ", ".join(f"'{effect}'" for effect in effects)
+                print(
+                    f"'{ally.clsname}' can't attack because of {string_effects} effects."
+                )
 
-            for unit, effect in to_delete.items():
-                effect.on_exit()
+            return None
 
-                if effect.is_pos:
-                    del unit.pos_effects[effect.name]
-                else:
-                    del unit.neg_effects[effect.name]
+        if target is None and not ally._attack.supports_ambiguos_use:
+            print("Missing target argument.")
+            return None
 
-                print(f"'{effect.name}' effect expired on {unit.name}.")
+        elif target is not None:
+            enemy = self.startswith_enemy(target)
 
-            for unit in self.units.values():
-                for effect in unit.effects.values():
-                    effect.allies_end_of_turn()
-                    self.death_check()
-                    if self.result != result.no_result:
-                        return self.result
-
-            for enemy in list(self.enemy_units.values()):
-                try:
-                    self.enemy_units[enemy.name]
-                except KeyError:  # the enemy is dead
-                    continue
+            if enemy is None:
+                return None
 
-                enemy.attack()
-                self.death_check()
-                if self.result != result.no_result:
-                    return self.result
+            target = enemy.name
+
+        if self.perform(Action("attack", ally.clsname, target)) != result.no_result:
+            return self.result
+
+    def command_support(self, cmd: list[str]) -> result | None:
+        try:
+            passive, ally, *args = cmd
+        except ValueError:
+            print("Not enough arguments")
+            return None
+
+        if len(args) == 0:
+            target = ally
+        else:
+            target = args[0]
+
+        ally = self.startswith_ally(ally)
+
+        if ally is None:
+            return None
+
+        effects = self.blocked_by(ally, "support")
+
+        if effects:
+            if len(effects) == 1:
+                print(
+                    f"'{ally.clsname}' can't use support because of '{effects[0]}' effect."
+                )
+            else:
+                string_effects = ", ".join(f"'{effect}'" for effect in effects)
+                print(
+                    f"'{ally.clsname}' can't use support because of {string_effects} effects."
+                )
+
+            return None
+
+        target = self.startswith_ally(target)
+
+        if target is None:
+            return None
+
+        if (
+            self.perform(Action("support", ally.clsname, target.clsname))
+            != result.no_result
+        ):
+            return self.result
+
+    def command_chili(self, cmd: list[str]) -> result | None:
+        try:
+            attack, ally, *args = cmd
+        except ValueError:
+            print("Not enough arguments")
+            return None
+
+        if "-help" in args or "-h" in args:
+            print(help["chili"])
+            return None
+
+        ally = self.startswith_ally(ally)
+
+        if ally is None:
+            return None
+
+        effects = self.blocked_by(ally, "chili")
+
+        if effects:
+            if len(effects) == 1:
+                print(
+                    f"'{ally.clsname}' can't use chili because of '{effects[0]}' effect."
+                )
+            else:
+                string_effects = ", ".join(f"'{effect}'" for effect in effects)
+                print(
+                    f"'{ally.clsname}' can't use chili because of {string_effects} effects."
+                )
+
+            return None
+
+        if self.chili != 100:
+            print(f"Chili is not charged up to 100%, chili is at {self.chili}%")
+            return None
+
+        if self.perform(Action("chili", ally.clsname)) != result.no_result:
+            return self.result
+
+    def command_stat(self, cmd: list[str]) -> result | None:
+        try:
+            stat, target, *args = cmd
+        except ValueError:
+            print("Missing argument 'target' for command stat")
+            return None
+
+        if target in self.units:
+            target = self.units[target]
+
+            name = target.clsname if isinstance(target, Ally) else target.name
+
+            with Table(title=f"Viewing stats of {name}") as table:
+                table.add_column("Name")
+                table.add_column("Current Health/Total Health")
+                table.add_column("Effects")
+
+                table.add_row(
+                    name,
+                    f"{target.hp}/{target.TOTAL_HP}",
+                    (", ".join(target.effects) or "No active effects"),
+                )
+        else:
+            print(f"No unit found for '{target}'")
+
+    def command_turns(self, cmd: list[str]) -> result | None:
+        with Table() as table:
+            table.add_column("Unplayed:")
+            for unit in self.allied_units.values():
+                if unit.clsname not in self.played:
+                    table.add_row(unit.clsname)
+
+    def command_hint(self, cmd: list[str]) -> result | None:
+        from autopilot import AutoPolicy, describe
+
+        action = AutoPolicy().choose(self, self.unplayed())
+
+        if action is None:
+            print("No ally can do anything this turn")
+        else:
+            print(f"hint: {describe(action)}")
 
-            print("\nEnd of enemies' turn!\n")
+    def command_abort(self, cmd: list[str]) -> result | None:
+        while True:
+            i = ask("Are you sure you want to abort?\nCONFIRM/no\nabort> ")
+            if i == "CONFIRM":
+                return result.game_aborted
+            elif i == "no":
+                break
+            else:
+                print("Please input CONFIRM or no\n")
 
     def startswith_unit(self, unit: str) -> Ally | Enemy | None:
         if unit in self.units:
             return self.units[unit]
 
-        saved = ""
-        for allyname in self.units:
-            if allyname.startswith(unit):
-                if saved:
-                    print(f"There are two or more units starting with '{unit}'!")
-                    return None
-                saved = allyname
+        names = self.units.prefixed(unit, 2)
+
+        if len(names) > 1:
+            print(f"There are two or more units starting with '{unit}'!")
+            return None
 
-        if not saved:
+        if not names:
             print(f"Didnt find a unit matching or starting with '{unit}'!")
             return None
 
-        return self.units[saved]
+        return self.units[names[0]]
 
     def startswith_ally(self, ally: str) -> Ally | None:
         s = self.startswith_unit(ally)
@@ -617,60 +1043,116 @@ class Battlefield:
 
         return s
 
-    def view_battle(self):
-        with Table(title="Allies") as allies:
-            allies.add_column("Name")
-            allies.add_column("Current Health/Total Health")
-            allies.add_column("Effects")
-
-            for ally in self.allied_units.values():
-                should_we_do_it = ally.clsname not in self.played
-
-                if should_we_do_it:
-                    string = f"[b]{ally.clsname}[/b]"
-                else:
-                    string = ally.clsname
-
-                allies.add_row(
-                    string,
-                    f"{ally.hp}/{ally.TOTAL_HP}",
-                    ", ".join(ally.effects),
-                )
-
-        with Table(title="Enemies") as enemies:
-            enemies.add_column("Name")
-            enemies.add_column("Current Health/Total Health")
-            enemies.add_column("Effects")
-
-            for enemy in self.enemy_units.values():
-                enemies.add_row(
-                    enemy.name,
-                    f"{enemy.hp}/{enemy.TOTAL_HP}",
-                    ", ".join(enemy.effects),
-                )
+    def view_battle(self, force: bool = False):
+        """
+        print the allies, enemies and chili tables,
+        only if something in them changed unless `force`, see BattleView
+        """
+        if self.screen is None:
+            self.screen = BattleView(self)
 
-        with Table() as t:
-            t.add_column("chili")
-            t.add_row(f"{self.chili}%")
+        self.screen.draw(force)
 
     def next_wave(self):
-        wave = self.exhaust_waves[0]
-        del self.exhaust_waves[0]
+        wave = self.waves.get(self.wave_int)
+        if wave is None:
+            raise ValueError("No waves left")
+
+        # while forks read the waves too, every battle plays copies
+        # and leaves the originals untouched, see close
+        if self.waves.shared():
+            wave = [fresh_enemy(enemy) for enemy in wave]
 
         for enemy in wave:
             enemy.id = self.id
             enemy.battle = self
 
-        self.enemy_units = {enemy.name: enemy for enemy in wave}
+        for enemy in list(self.enemy_units.values()):
+            self.units.remove(enemy)
+
+        for enemy in wave:
+            self.units.add(enemy)
+
+        if self.journal is not None:
+            self.journal.wave(self.wave_int + 1)
+            for enemy in wave:
+                self.journal.spawn(enemy)
+
         self.wave_int += 1
         self.played = []
 
+        self.waves.release()
+
+
+# forking helpers, copy.copy and isinstance against the View abc
+# would be the slow part of a fork
+
+_unit_types: dict[type, bool] = {}
+
+
+def is_unit(value: object) -> bool:
+    cls = type(value)
+    unit = _unit_types.get(cls)
+
+    if unit is None:
+        unit = _unit_types[cls] = issubclass(cls, View)
+
+    return unit
+
+
+def shallow_copy[T](obj: T) -> T:
+    """copy.copy for plain objects with a __dict__, without the copy protocol"""
+    clone = object.__new__(type(obj))
+    clone.__dict__.update(obj.__dict__)
+    return clone
+
+
+def fresh_enemy(enemy: Enemy) -> Enemy:
+    """a copy of an enemy from a shared wave, which hasnt joined a battle yet"""
+    clone = shallow_copy(enemy)
+    clone.pos_effects = {}
+    clone.neg_effects = {}
+    return clone
+
+
+def dummy_waves(rng: BattleRNG) -> Iterator[list[Enemy]]:
+    """
+    the dummy testing waves, a weak first wave
+    followed by 96 waves of steadily stronger dummies, see waves.DUMMY_LEVELS
+
+    rng: where the random health and damage rolls come from
+
+    a generator, a wave only gets rolled once it is needed,
+    unpack it (`*dummy_waves(rng)`) to roll every wave up front,
+    like with the battle's own rng, or pass it as the `stream`
+    of a Battlefield with an rng of its own (see WaveStream)
+    """
+    choice = rng.choice
+
+    yield [
+        Enemy(name=f"dummy{i}", hp=DUMMY_FIRST, damage=DUMMY_FIRST)
+        for i in range(DUMMY_ENEMIES)
+    ]
+
+    _range = DUMMY_SPREAD
+
+    for i in DUMMY_LEVELS:
+        mul = i * 10
+        wave = []
+        for _ in range(DUMMY_ENEMIES):
+            wave.append(
+                Enemy(
+                    f"dummy{_}{i}",
+                    hp=choice(range(mul - _range, mul + _range + 1, _range)),
+                    damage=choice(range(mul - _range, mul + _range + 1, _range)),
+                )
+            )
+        yield wave
+
 
 def battle_interface(mainobj: MainObj) -> result:
     fp = mainobj.jsons["picked"]
 
-    control = mainobj.control
-
     # dict[birdname, list[classname]]
     CHOICES: dict[str, list[str]] = {
         name: [n for n in iter] for name, iter in BIRDS_TABLE.items()
@@ -693,146 +1175,184 @@ def battle_interface(mainobj: MainObj) -> result:
             "\nor type help for help\n"
         )
 
-    while True:
-        _INPUT = input("battle> ")
-        print()
+    # the battle> prompt before the battle, a handler returns a result to leave it
+    def command_help(words: list[str]) -> result | None:
+        print(help["prebattle_help"])
 
-        INPUT = _INPUT.split(" ")[0]
+    def command_picked(words: list[str]) -> result | None:
+        if not PICKED:
+            print(
+                "No allies picked, use the pick command to pick some\ntype help for help\n"
+            )
+            return None
 
-        if INPUT in control("help"):
-            print(help["prebattle_help"])
+        with Table(title="Picked allies") as table:
+            table.add_column("Name")
+            table.add_column("Class")
 
-        elif INPUT == "picked":
-            if not PICKED:
-                print(
-                    "No allies picked, use the pick command to pick some\ntype help for help\n"
-                )
-                continue
+            for name, cls in PICKED.items():
+                table.add_row(name, cls)
 
-            with Table(title="Picked allies") as table:
-                table.add_column("Name")
-                table.add_column("Class")
+    def command_choices(words: list[str]) -> result | None:
+        with Table(title="All allies and class choices") as table:
+            table.add_column("Name")
+            table.add_column("Classes")
 
-                for name, cls in PICKED.items():
-                    table.add_row(name, cls)
+            for name, iter in CHOICES.items():
+                table.add_row(name, ", ".join(iter))
 
-        elif INPUT == "choices":
-            with Table(title="All allies and class choices") as table:
-                table.add_column("Name")
-                table.add_column("Classes")
+    def command_pick(words: list[str]) -> result | None:
+        pick, *args = words
 
-                for name, iter in CHOICES.items():
-                    table.add_row(name, ", ".join(iter))
+        if not args:
+            print("'name' is a required argument to command pick")
+            return None
 
-        elif INPUT in control("pick"):
-            pick, *args = _INPUT.split(" ")
+        if len(args) >= 2:
+            name, cls, *possibly_unused = args
+            if name not in CHOICES:
+                print(f"Ally '{name}' doesn't exist")
+            return None
+        else:
+            cls = args[0]
+            if cls not in CLASSES:
+                print(f"Class '{cls}' doesn't exist")
+                return None
 
-            if not args:
-                print("'name' is a required argument to command pick")
-                continue
+            name = CLASSES[cls]
 
-            if len(args) >= 2:
-                name, cls, *possibly_unused = args
-                if name not in CHOICES:
-                    print(f"Ally '{name}' doesn't exist")
-                continue
-            else:
-                cls = args[0]
-                if cls not in CLASSES:
-                    print(f"Class '{cls}' doesn't exist")
-                    continue
+        try:
+            CLASSES_DICT[name].get_class(cls)
+        except (KeyError, ValueError):
+            print(f"class {cls} is unavailable... for now")
+            return None
 
-                name = CLASSES[cls]
+        PICKED[name] = cls
 
-            try:
-                CLASSES_DICT[name].get_class(cls)
-            except (KeyError, ValueError):
-                print(f"class {cls} is unavailable... for now")
-                continue
+        print(f"picked '{name}' with '{cls}' class")
 
-            PICKED[name] = cls
+    def command_unpick(words: list[str]) -> result | None:
+        unpick, *args = words
 
-            print(f"picked '{name}' with '{cls}' class")
+        if not args:
+            print("'name' is a required argument to command unpick")
+            return None
 
-        elif INPUT in control("unpick"):
-            unpick, *args = _INPUT.split(" ")
+        if len(args) >= 2:
+            name, cls, *possibly_unused = args
+            if name not in CHOICES:
+                print(f"Ally '{name}' doesn't exist")
+            return None
+        else:
+            cls = args[0]
+            if cls not in CLASSES:
+                print(f"Class '{name}' doesn't exist")
+                return None
 
-            if not args:
-                print("'name' is a required argument to command unpick")
-                continue
+            name = CLASSES[cls]
 
-            if len(args) >= 2:
-                name, cls, *possibly_unused = args
-                if name not in CHOICES:
-                    print(f"Ally '{name}' doesn't exist")
-                continue
-            else:
-                cls = args[0]
-                if cls not in CLASSES:
-                    print(f"Class '{name}' doesn't exist")
-                    continue
+        if name not in PICKED:
+            print(f"Class {cls} is not picked.")
+            return None
 
-                name = CLASSES[cls]
+        del PICKED[name]
 
-            if name not in PICKED:
-                print(f"Class {cls} is not picked.")
-                continue
+        print(f"removed '{name}' with '{cls}' class")
 
-            del PICKED[name]
+    def command_start(words: list[str]) -> result | None:
+        if len(PICKED) == 0:
+            print("Cannot start with no allies.")
+            return None
 
-            print(f"removed '{name}' with '{cls}' class")
+        elif len(PICKED) > mainobj.MAX_ALLIES:
+            print(
+                f"Maximum amount of allies exceeded,"
+                f"\nYou may bring at most {mainobj.MAX_ALLIES} allies."
+            )
+            return None
 
-        elif INPUT == "start":
-            if len(PICKED) == 0:
-                print("Cannot start with no allies.")
-                continue
+        else:
+            print("Battle started!")
+            fp.save(PICKED)
 
-            elif len(PICKED) > mainobj.MAX_ALLIES:
-                print(
-                    f"Maximum amount of allies exceeded,"
-                    f"\nYou may bring at most {mainobj.MAX_ALLIES} allies."
-                )
-                continue
+            rng = BattleRNG()
 
-            else:
-                print("Battle started!")
-                fp.save(PICKED)
-
-                # dummy testing battle
-                battle = Battlefield(
-                    [Enemy(name=f"dummy{i}", hp=10, damage=10) for i in range(7)],
-                    allies=[Ally(name, cls) for name, cls in PICKED.items()],
-                    control_set=mainobj,
-                    highlighter=mainobj.highlighter,
-                    chili=100,
-                )
+            # recorded in the profile, if there is one
+            journal = None
+
+            if mainobj.profile is not None:
+                from journal import Journal
 
-                _range = 20
-
-                for i in range(5, 101):
-                    mul = i * 10
-                    wave = []
-                    for _ in range(7):
-                        wave.append(
-                            Enemy(
-                                f"dummy{_}{i}",
-                                hp=random.choice(
-                                    range(mul - _range, mul + _range + 1, _range)
-                                ),
-                                damage=random.choice(
-                                    range(mul - _range, mul + _range + 1, _range)
-                                ),
-                            )
+                journal = Journal()
+
+            # dummy testing battle, the waves get rolled as they come
+            battle = Battlefield(
+                stream=dummy_waves(rng.split("waves")),
+                allies=[Ally(name, cls) for name, cls in PICKED.items()],
+                control_set=mainobj,
+                highlighter=mainobj.highlighter,
+                chili=100,
+                rng=rng,
+                journal=journal,
+            )
+
+            res = battle.start_battle()
+
+            # an aborted battle isnt a loss, it doesnt count for win_rate
+            if (
+                mainobj.profile is not None
+                and journal is not None
+                and res != result.game_aborted
+            ):
+                from profiledb import BattleRecord, ability_stats
+
+                mainobj.profile.record(
+                    [
+                        BattleRecord(
+                            dict(PICKED),
+                            res.name,
+                            battle.turn,
+                            rng.seed,
+                            abilities=ability_stats(journal),
                         )
-                    battle.exhaust_waves.append(wave)
+                    ]
+                )
+
+            return res
 
-                return battle.start_battle()
+    def command_exit(words: list[str]) -> result | None:
+        return result.interface_aborted
 
-        elif INPUT in control("exit"):
-            return result.interface_aborted
+    handlers = {
+        "help": command_help,
+        "picked": command_picked,
+        "choices": command_choices,
+        "pick": command_pick,
+        "unpick": command_unpick,
+        "start": command_start,
+        "exit": command_exit,
+    }
+    commands = Dispatcher(
+        mainobj, handlers, aliasable=("help", "pick", "unpick", "exit")
+    )
+
+    while True:
+        _INPUT = ask("battle> ")
+        print()
+
+        words = _INPUT.split(" ")
+        INPUT = words[0]
 
-        elif not INPUT:
+        if not INPUT:
             continue
 
-        else:
+        action = commands.lookup(INPUT)
+
+        if action is None:
             print(f"No command found for '{INPUT}'")
+            continue
+
+        res = commands.run(action, words)
+
+        if res is not None:
+            return res
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Protocol
+
+from sink import engine
+
+# the commands of the prompts (main menu>, battle>, controls>...),
+# what an alias typed at a prompt means (Commands) and who handles it (Dispatcher)
+
+
+class Commands:
+    """
+    the controls (controls.json, dict[action, list[aliases]]) turned around,
+    dict[alias, action], so resolving what was typed is one dict lookup
+
+    built from `controls()` (the current controls) on the first lookup,
+    and again with `rebuild` when the aliases change (the controls> prompt does),
+    an action which isnt in the controls is its own only alias,
+    an alias of two actions goes to the first one
+    """
+
+    def __init__(self, controls: Callable[[], Mapping[str, Iterable[str]]]) -> None:
+        self.controls = controls
+        self.aliases: dict[str, str] | None = None
+        self.actions: frozenset[str] = frozenset()  # the actions in the controls
+
+    def rebuild(self) -> None:
+        controls = self.controls()
+        aliases: dict[str, str] = {}
+
+        for action, names in controls.items():
+            for alias in names:
+                aliases.setdefault(alias, action)
+
+        self.aliases = aliases
+        self.actions = frozenset(controls)
+
+    def resolve(self, alias: str) -> str | None:
+        """the action of `alias`, None if it only was an action with other aliases"""
+        if self.aliases is None:
+            self.rebuild()
+            assert self.aliases is not None
+
+        action = self.aliases.get(alias)
+
+        if action is None and alias not in self.actions:
+            return alias
+
+        return action
+
+
+class SupportsResolve(Protocol):
+    def resolve(self, alias: str) -> str | None: ...
+
+
+@dataclass
+class Timing:
+    calls: int = 0
+    total: float = 0.0  # seconds
+    slowest: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class Dispatcher[R]:
+    """
+    the handler table of a prompt, dict[action, handler]
+
+    the actions in `aliasable` are resolved through `commands`
+    (so "a" can mean attack), the others only match their own name,
+    like "start" at the battle> prompt
+
+    `timings` keeps how long every action took (and the engine sink
+    gets a debug message per command), a handler asking for more
+    input (a confirmation) counts the time the player took too
+    """
+
+    def __init__(
+        self,
+        commands: SupportsResolve,
+        handlers: Mapping[str, Callable[[list[str]], R]],
+        aliasable: Collection[str] = (),
+    ) -> None:
+        self.commands = commands
+        self.handlers = handlers
+        self.aliasable = frozenset(aliasable)
+        self.timings: dict[str, Timing] = {}
+
+    def lookup(self, alias: str) -> str | None:
+        """the action `alias` runs at this prompt, None if it isnt a command here"""
+        action = self.commands.resolve(alias)
+
+        if action in self.aliasable and action in self.handlers:
+            return action
+
+        if alias in self.handlers and alias not in self.aliasable:
+            return alias
+
+        return None
+
+    def run(self, action: str, args: list[str]) -> R:
+        """run the handler of `action` with the words typed (the alias first)"""
+        start = time.perf_counter()
+
+        try:
+            return self.handlers[action](args)
+        finally:
+            elapsed = time.perf_counter() - start
+
+            timing = self.timings.get(action)
+            if timing is None:
+                timing = self.timings[action] = Timing()
+
+            timing.calls += 1
+            timing.total += elapsed
+            timing.slowest = max(timing.slowest, elapsed)
+
+            engine.debug("command {} took {:.2f}ms", action, elapsed * 1000)
+
+
+@contextmanager
+def completing(complete: Callable[[str], list[str]]) -> Iterator[None]:
+    """
+    tab completion of the arguments typed at a prompt (not the command, the first word)
+    while in the with block, `complete(prefix)` -> what the word could be
+
+    does nothing without readline (windows), the completion from before comes back after
+    """
+    try:
+        import readline
+    except ImportError:
+        yield
+        return
+
+    matches: list[str] = []
+
+    def completer(text: str, state: int) -> str | None:
+        nonlocal matches
+
+        # readline asks for state 0, 1, 2... until it gets None
+        if state == 0:
+            before = readline.get_line_buffer()[: readline.get_begidx()]
+            matches = complete(text.lower()) if before.strip() else []
+
+        return matches[state] if state < len(matches) else None
+
+    previous = readline.get_completer()
+    delims = readline.get_completer_delims()
+
+    readline.set_completer(completer)
+    readline.set_completer_delims(" ")
+    readline.parse_and_bind("tab: complete")
+
+    try:
+        yield
+    finally:
+        readline.set_completer(previous)
+        readline.set_completer_delims(delims)
@@ -2,7 +2,9 @@ from typing import TYPE_CHECKING
 
 from rich import print
 
+from commands import Dispatcher
 from help import help
+from prompts import ask
 
 # module to change names for actions
 # can be found in .\data\controls.jsons
@@ -27,252 +29,278 @@ def controls_interface(mainobj: "MainObj"):
 
     CHANGES_BEEN_MADE = False
 
-    control = mainobj.control
-
     highlighter = mainobj.highlighter
     highlighters = highlighter.highlighters
 
-    print()
-    while True:
-        inp = input("controls> ")
-        print()
+    # the controls> prompt, a handler returns True to leave it
+    def command_help(parts: list[str]) -> bool | None:
+        print(help["controls_interface"])
 
-        parts = inp.split(" ")
-        command = parts[0]
+    def command_defaults(parts: list[str]) -> bool | None:
+        print("defaults:\n")
+        print("\n".join(CONTROLS), "\n")
 
-        if command in control("help"):
-            print(help["controls_interface"])
+    def command_add(parts: list[str]) -> bool | None:
+        nonlocal CHANGES_BEEN_MADE
 
-        elif command == "defaults":
-            print("defaults:\n")
-            print("\n".join(CONTROLS), "\n")
+        try:
+            add, action, new, *args = parts
+        except ValueError:
+            print("Missing arguments for command add")
+            return None
 
-        elif command == "add":
-            try:
-                add, action, new, *args = parts
-            except ValueError:
-                print("Missing arguments for command add")
-                continue
+        if action not in CONTROLS:
+            print("Action doesnt exist")
+            return None
 
-            if action not in CONTROLS:
-                print("Action doesnt exist")
-                continue
+        if new in CONTROLS[action]:
+            print(f"'{new}' alias already exists for action '{action}'")
+            return None
 
-            if new in CONTROLS[action]:
-                print(f"'{new}' alias already exists for action '{action}'")
-                continue
+        CONTROLS[action].append(new)
+        CHANGES_BEEN_MADE = True
+        mainobj.commands.rebuild()
 
-            CONTROLS[action].append(new)
-            CHANGES_BEEN_MADE = True
+        print(f"Added alias '{new}'")
 
-            print(f"Added alias '{new}'")
+    def command_del(parts: list[str]) -> bool | None:
+        nonlocal CHANGES_BEEN_MADE
 
-        elif command == "del":
-            try:
-                delete, action, alias, *args = parts
-            except ValueError:
-                print("Missing arguments for command del")
-                continue
+        try:
+            delete, action, alias, *args = parts
+        except ValueError:
+            print("Missing arguments for command del")
+            return None
 
-            if action not in CONTROLS:
-                print("Action doesnt exist")
-                continue
+        if action not in CONTROLS:
+            print("Action doesnt exist")
+            return None
 
-            if alias not in CONTROLS[action]:
-                print(f"'{alias}' doesnt exist for action '{action}'")
-                continue
+        if alias not in CONTROLS[action]:
+            print(f"'{alias}' doesnt exist for action '{action}'")
+            return None
 
-            if alias in DEFAULT_PRESET[action]:
-                print(f"Cannot remove alias '{alias}' which is a default.")
-                continue
+        if alias in DEFAULT_PRESET[action]:
+            print(f"Cannot remove alias '{alias}' which is a default.")
+            return None
 
-            CONTROLS[action].remove(alias)
-            CHANGES_BEEN_MADE = True
+        CONTROLS[action].remove(alias)
+        CHANGES_BEEN_MADE = True
+        mainobj.commands.rebuild()
 
-            print(f"Removed alias '{alias}'")
+        print(f"Removed alias '{alias}'")
 
-        elif command == "show":
-            show, *args = parts
+    def command_show(parts: list[str]) -> bool | None:
+        show, *args = parts
 
-            if not args:
-                print("Current controls:\n")
-                for action, aliases in CONTROLS.items():
-                    print(f"\n    {action}: {', '.join(aliases)}")
-                continue
+        if not args:
+            print("Current controls:\n")
+            for action, aliases in CONTROLS.items():
+                print(f"\n    {action}: {', '.join(aliases)}")
+            return None
 
-            action = " ".join(args)
+        action = " ".join(args)
 
-            if action not in CONTROLS:
-                print("Action doesnt exist")
-                continue
+        if action not in CONTROLS:
+            print("Action doesnt exist")
+            return None
 
-            print(f"Aliases for action '{action}':\n")
+        print(f"Aliases for action '{action}':\n")
 
-            print("\n".join(CONTROLS[action]), "\n")
+        print("\n".join(CONTROLS[action]), "\n")
 
-        elif command == "save":
-            if not CHANGES_BEEN_MADE:
-                print("No changes to save")
-                continue
+    def command_save(parts: list[str]) -> bool | None:
+        nonlocal CHANGES_BEEN_MADE
 
-            print("Are you sure you want to save your changes?")
-            while True:
-                i = input("y/n> ")
+        if not CHANGES_BEEN_MADE:
+            print("No changes to save")
+            return None
 
-                if i == "y":
-                    controls_file.content = CONTROLS
-                    controls_file.save()
+        print("Are you sure you want to save your changes?")
+        while True:
+            i = ask("y/n> ")
 
-                    presets_file.content = PRESETS
-                    presets_file.save()
+            if i == "y":
+                controls_file.content = CONTROLS
+                controls_file.save()
 
-                    general = mainobj.jsons["general"]
-                    content = general.content
-                    content["highlighter"]["types"] = highlighter.current.keys()
-                    content["highlighter"]["switch"] = highlighter.switch
-                    general.save(content)
+                presets_file.content = PRESETS
+                presets_file.save()
 
-                    print("Success")
-                    CHANGES_BEEN_MADE = False
-                    break
+                general = mainobj.jsons["general"]
+                content = general.content
+                content["highlighter"]["types"] = list(highlighter.current)
+                content["highlighter"]["switch"] = highlighter.switch
+                general.save(content)
 
-                elif i == "n":
-                    print("Cancelled saving")
-                    break
-                else:
-                    print("Invalid input")
+                mainobj.commands.rebuild()
 
-        elif command in control("exit"):
-            if not CHANGES_BEEN_MADE:
+                print("Success")
+                CHANGES_BEEN_MADE = False
                 break
 
-            _exit = False
+            elif i == "n":
+                print("Cancelled saving")
+                break
+            else:
+                print("Invalid input")
 
-            print("Are you sure you want to exit? There are unsaved changes")
-            while True:
-                i = input("exit/cancel/save(and exit)> ")
+    def command_exit(parts: list[str]) -> bool | None:
+        if not CHANGES_BEEN_MADE:
+            return True
 
-                if i == "save":
-                    controls_file.save(CONTROLS)
+        _exit = False
 
-                    presets_file.content = PRESETS
-                    presets_file.save()
+        print("Are you sure you want to exit? There are unsaved changes")
+        while True:
+            i = ask("exit/cancel/save(and exit)> ")
 
-                    print("Success")
-                    _exit = True
-                    break
+            if i == "save":
+                controls_file.save(CONTROLS)
 
-                elif i == "cancel":
-                    print("Cancelled saving")
-                    break
+                presets_file.content = PRESETS
+                presets_file.save()
 
-                elif i == "exit":
-                    print("Exiting without saving changes...")
-                    _exit = True
-
-                else:
-                    print("Invalid input")
+                mainobj.commands.rebuild()
 
-            if _exit:
+                print("Success")
+                _exit = True
                 break
 
-        elif command == "presets":
-            if len(parts) == 1:  # were dealing with bare presets
-                for presetname, iter in PRESETS.items():
-                    print(f"\n{presetname}:")
+            elif i == "cancel":
+                print("Cancelled saving")
+                break
 
-                    for action, aliases in iter.items():
-                        print(f"\n    {action}: {', '.join(aliases)}")
+            elif i == "exit":
+                print("Exiting without saving changes...")
+                _exit = True
 
-                continue
+            else:
+                print("Invalid input")
 
-            subcommand = parts[1]
+        if _exit:
+            return True
 
-            if subcommand == "set":
-                try:
-                    presets, set, name, *args = parts
-                except ValueError:
-                    print("Missing arguments for command presets set")
-                    continue
+    def command_presets(parts: list[str]) -> bool | None:
+        nonlocal CONTROLS, CHANGES_BEEN_MADE
 
-                name = " ".join([name] + args)
+        if len(parts) == 1:  # were dealing with bare presets
+            for presetname, iter in PRESETS.items():
+                print(f"\n{presetname}:")
 
-                if name not in PRESETS:
-                    print(f"preset '{name}' doesnt exist")
-                    continue
+                for action, aliases in iter.items():
+                    print(f"\n    {action}: {', '.join(aliases)}")
 
-                CONTROLS = PRESETS[name]
-                CHANGES_BEEN_MADE = True
+            return None
 
-                print("Success")
+        subcommand = parts[1]
 
-            elif subcommand == "save":
-                try:
-                    presets, save, name, *args = parts
-                except ValueError:
-                    print("Missing arguments for command presets save")
-                    continue
+        if subcommand == "set":
+            try:
+                presets, set, name, *args = parts
+            except ValueError:
+                print("Missing arguments for command presets set")
+                return None
 
-                name = " ".join([name] + args)
+            name = " ".join([name] + args)
 
-                if name in PRESETS:
-                    print(f"There is already a preset with the name {name}!")
-                    continue
+            if name not in PRESETS:
+                print(f"preset '{name}' doesnt exist")
+                return None
 
-                PRESETS[name] = CONTROLS
-                CHANGES_BEEN_MADE = True
+            CONTROLS = PRESETS[name]
+            CHANGES_BEEN_MADE = True
 
-                print(f"Saved current controls as {name}!")
+            print("Success")
 
-            elif subcommand == "delete":
-                try:
-                    presets, delete, name, *args = parts
-                except ValueError:
-                    print("Missing arguments for command presets save")
-                    continue
+        elif subcommand == "save":
+            try:
+                presets, save, name, *args = parts
+            except ValueError:
+                print("Missing arguments for command presets save")
+                return None
 
-                name = " ".join([name] + args)
+            name = " ".join([name] + args)
 
-                if name not in PRESETS:
-                    print(f"preset '{name}' doesnt exist")
-                    continue
+            if name in PRESETS:
+                print(f"There is already a preset with the name {name}!")
+                return None
 
-                # hehehe i love hard coding
-                if name == "DEFAULT":
-                    print("Cannot delete default preset")
-                    continue
+            PRESETS[name] = CONTROLS
+            CHANGES_BEEN_MADE = True
 
-                print(f"Are you sure you want to delete preset '{name}'?\n")
-                while True:
-                    i = input("y/n> ")
+            print(f"Saved current controls as {name}!")
 
-                    if i == "y":
-                        del PRESETS[name]
-                        print(f"Deleted '{name}'")
-                        CHANGES_BEEN_MADE = True
-                        break
+        elif subcommand == "delete":
+            try:
+                presets, delete, name, *args = parts
+            except ValueError:
+                print("Missing arguments for command presets save")
+                return None
 
-                    elif i == "n":
-                        print("Cancelled deletion")
-                        break
+            name = " ".join([name] + args)
 
-                    else:
-                        print("Invalid input")
+            if name not in PRESETS:
+                print(f"preset '{name}' doesnt exist")
+                return None
 
-            elif command == "highlighter":
-                high, *args = parts
+            # hehehe i love hard coding
+            if name == "DEFAULT":
+                print("Cannot delete default preset")
+                return None
 
-                if not args:
-                    print("Missing arguments.")
-                    continue
+            print(f"Are you sure you want to delete preset '{name}'?\n")
+            while True:
+                i = ask("y/n> ")
 
-                item, value = args
+                if i == "y":
+                    del PRESETS[name]
+                    print(f"Deleted '{name}'")
+                    CHANGES_BEEN_MADE = True
+                    break
 
-                if item == "switch":
-                    highlighter.switch = (
-                        True if args[0].capitalize() == "True" else False
-                    )
+                elif i == "n":
+                    print("Cancelled deletion")
+                    break
 
                 else:
-                    if value in highlighters:
-                        highlighter.current[item] = highlighters[item]
+                    print("Invalid input")
+
+        elif parts[0] == "highlighter":
+            high, *args = parts
+
+            if not args:
+                print("Missing arguments.")
+                return None
+
+            item, value = args
+
+            if item == "switch":
+                highlighter.switch = True if args[0].capitalize() == "True" else False
+
+            else:
+                if value in highlighters:
+                    highlighter.current[item] = highlighters[item]
+
+    handlers = {
+        "help": command_help,
+        "defaults": command_defaults,
+        "add": command_add,
+        "del": command_del,
+        "show": command_show,
+        "save": command_save,
+        "exit": command_exit,
+        "presets": command_presets,
+    }
+    commands = Dispatcher(mainobj, handlers, aliasable=("help", "exit"))
+
+    print()
+    while True:
+        inp = ask("controls> ")
+        print()
+
+        parts = inp.split(" ")
+        action = commands.lookup(parts[0])
+
+        if action is not None and commands.run(action, parts):
+            break
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Final
+
+# the integer damage math of every hit, heal and effect, see percent
+#
+# a percentage is a whole number, 150 is 150%,
+# the attack damage (AD) of a bird is kept in hundredths of a hp
+# so its level scaling stays exact (see allies.AD_DICT),
+# AD times a percentage is in basis points of a hp
+#
+# rounding: every step truncates toward 0, like int() of the float math
+# it replaced, modifiers applied one after another (percents, the hooks
+# of effects) round after each one, in the order they're applied
+#
+# vector.py does the same math on numpy arrays and has to round the same way
+
+HUNDREDTHS: Final = 100  # of a hp, the unit of AD
+BASIS: Final = 10_000  # basis points in a hp, AD * a percentage
+
+
+def truncate(scaled: int, divisor: int) -> int:
+    """scaled / divisor, truncated toward 0"""
+    if scaled >= 0:
+        return scaled // divisor
+
+    return -(-scaled // divisor)
+
+
+def percent(value: int, pct: int) -> int:
+    """pct% of value"""
+    return truncate(value * pct, 100)
+
+
+def percents(value: int, *pcts: int) -> int:
+    """value with every percentage applied in turn, each step rounded"""
+    for pct in pcts:
+        value = truncate(value * pct, 100)
+
+    return value
+
+
+def attack(ad: int, pct: int) -> int:
+    """pct% of an attack damage in hundredths of a hp (see HUNDREDTHS), in hp"""
+    return truncate(ad * pct, BASIS)
+
+
+def share(part: int, whole: int) -> int:
+    """how many percent of whole part is, like a unit's hp of its total hp"""
+    return truncate(part * 100, whole)
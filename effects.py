@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-import random
 from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, ClassVar, Literal
+
+import dmg
 
 # import type: output only
 
 if TYPE_CHECKING:
     from battle import Ally, ConvertibleToInt, View
 
+# the events an effect can handle which are dispatched to every effect in the battle
+# Effect subclasses get their `events` from the ones they override
+EVENTS = (
+    "on_hit",
+    "after_hit",
+    "on_heal",
+    "after_heal",
+    "allies_end_of_turn",
+    "enemies_end_of_turn",
+)
+
 # a lot of return types for these effects may seems useless
 # first, they just mean the specified type without the typevar
 # and also they are never gonna be useful
@@ -27,7 +39,8 @@ class Effect[V: View, A: View]:
     `name`: str = the ability that caused this effect, offensive, passive, or chili ability
 
     `turns`: int = the amount of turns before this effect expires, should not be toyed around with,
-    effects automatically expire, and `on_exit` method is called when the effect expires
+    effects automatically expire, and `on_exit` method is called when the effect expires,
+    this stays the applied duration, see ExpiryWheel.remaining for the turns left
 
     attr:
 
@@ -38,11 +51,25 @@ class Effect[V: View, A: View]:
     `is_pos`: property[bool] = if this effect is a positive effect, positive effects can be dispelled and
     negative effects can be cleansed, (ex.: shield is positive, weaken is negative)
 
+    `events`: ClassVar[frozenset[str]] = the battle wide events (see EVENTS) this effect handles,
+    detected automatically from the methods a subclass overrides, the battle only
+    calls an effect for the events it handles, see HookRegistry
+
     """
 
     name: str  # ability which caused this effect
     turns: int  # turns before it expires
 
+    events: ClassVar[frozenset[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.events = frozenset(
+            event
+            for event in EVENTS
+            if getattr(cls, event) is not getattr(Effect, event)
+        )
+
     def __post_init__(self):
         self.wearer: View  # defined during application
         self.is_pos: bool | None  # defined using subclasses
@@ -142,14 +169,77 @@ class Effect[V: View, A: View]:
         """For abilities doing things after the rage chili is used, such as bonus attacks and such"""
 
 
-def get_chance(chance: int) -> bool:
-    if chance > 100 or chance < 0:
-        raise ValueError(
-            f"Invalid chance parameter: {chance},"
-            " expected an integer in range 0-100 (inclusive)"
-        )
+class HookRegistry:
+    """
+    every effect of a battle, grouped by the events (see EVENTS) they handle
+
+    each Battlefield keeps one, units register their effects
+    as they get applied and unregister them once they are gone,
+    so an event is only dispatched to the effects which override it
+
+    an event goes to the effects in the order of their units
+    (the order they joined the battle, their ids), a unit's positive
+    effects before its negative ones, each in the order of the unit's
+    effect dictionary, no matter the order they got registered in
+    """
 
-    return random.choices([True, False], weights=[chance, 100 - chance])[0]
+    def __init__(self) -> None:
+        # dict[event, dict[(unit id, is_pos, effect name), Effect]]
+        self.hooks: dict[str, dict[tuple[int, bool | None, str], Effect]] = {
+            event: {} for event in EVENTS
+        }
+        # dict[event, the effects to dispatch it to], built on the first
+        # dispatch and thrown away once an effect for the event comes or goes
+        self.dispatch: dict[str, tuple[Effect, ...]] = {}
+
+    def register(self, unit: View, effect: Effect) -> None:
+        key = (unit.id, effect.is_pos, effect.name)
+        for event in effect.events:
+            self.hooks[event][key] = effect
+            self.dispatch.pop(event, None)
+
+    def unregister(self, unit: View, effect: Effect) -> None:
+        key = (unit.id, effect.is_pos, effect.name)
+        for event in effect.events:
+            if self.hooks[event].pop(key, None) is not None:
+                self.dispatch.pop(event, None)
+
+    def drop(self, unit: View) -> None:
+        """unregister all effects of `unit`, when it dies"""
+        for effect in unit.effects.values():
+            self.unregister(unit, effect)
+
+    def __getitem__(self, event: str) -> tuple[Effect, ...]:
+        # a copy, effects are free to add and remove effects while being dispatched
+        try:
+            return self.dispatch[event]
+        except KeyError:
+            hooks = sorted(self.hooks[event].items(), key=dispatch_order)
+            effects = self.dispatch[event] = tuple(effect for _, effect in hooks)
+            return effects
+
+    def copy(self, remap: Callable[[Effect], Effect]) -> HookRegistry:
+        """
+        a copy with every effect replaced by remap(effect),
+        keeps the dispatch order, see Battlefield.fork
+        """
+        new = type(self).__new__(type(self))
+        new.hooks = {
+            event: {key: remap(effect) for key, effect in hooks.items()}
+            for event, hooks in self.hooks.items()
+        }
+        new.dispatch = {}
+        return new
+
+
+def dispatch_order(hook: tuple[tuple[int, bool | None, str], Effect]) -> tuple:
+    """the sort key of a registered effect, see HookRegistry"""
+    (id, is_pos, name), effect = hook
+
+    wearer = effect.wearer
+    effects = wearer.pos_effects if is_pos else wearer.neg_effects
+
+    return id, not is_pos, list(effects).index(name)
 
 
 # subclassing
@@ -181,7 +271,7 @@ class Shield(PosEffect):
     ):
         if victim.is_same(self.wearer):
             eff = self.effectiveness
-            damage = int((damage / 100) * (100 - eff))
+            damage = dmg.percent(damage, 100 - eff)
         return victim, attacker, damage, effects
 
 
@@ -220,7 +310,7 @@ class ThornyShield[V: View, A: View](PosEffect):
 
     def after_hit(self, victim: V, attacker: A, damage: int, effects: Sequence[Effect]):
         if victim.is_same(self.wearer):
-            reflect = int((damage / 100) * self.percentage)
+            reflect = dmg.percent(damage, self.percentage)
             attacker.deal_damage(reflect, self.wearer)
 
 
@@ -234,7 +324,7 @@ class DamageBuff[A: View, V: View](PosEffect):
         self, attacker: A, victim: V, damage: int, effects: Sequence[Effect]
     ) -> tuple[A, V, int, Sequence[Effect]]:
         eff = self.effectiveness
-        damage = int((damage / 100) * (100 + eff))
+        damage = dmg.percent(damage, 100 + eff)
         return attacker, victim, damage, effects
 
 
@@ -248,7 +338,7 @@ class DamageDebuff[A: View, V: View](NegEffect):
         self, attacker: A, victim: V, damage: int, effects: Sequence[Effect]
     ) -> tuple[A, V, int, Sequence[Effect]]:
         eff = self.effectiveness
-        damage = int((damage / 100) * (100 - eff))
+        damage = dmg.percent(damage, 100 - eff)
         return attacker, victim, damage, effects
 
 
@@ -259,10 +349,8 @@ class Mimic[T: View](NegEffect):
     def on_heal(self, target: T, heal: int) -> Literal[0]:
         battle = self.wearer.battle
 
-        if target.is_ally:
-            heal_target = min(battle.enemy_units.values(), key=lambda enemy: enemy.hp)
-        else:
-            heal_target = min(battle.allied_units.values(), key=lambda ally: ally.hp)
+        # the lowest health unit of the other side
+        heal_target = battle.units.lowest(is_ally=not target.is_ally)
 
         heal_target.heal(heal)
 
@@ -336,6 +424,7 @@ class Stun(NegEffect):
     """
 
     def __post_init__(self):
+        super().__post_init__()
         self.can_attack = self.can_support = self.can_chili = False
 
 
@@ -389,9 +478,9 @@ class HealingShield(PosEffect):
         self, victim: View, attacker: View, damage: int, effects: Sequence[Effect]
     ):
         if victim.is_same(self.wearer):
-            print("Healing shield attempts to heal")
+            self.wearer.battle.log.debug("Healing shield attempts to heal")
             for unit in self.wearer.battle.allied_units.values():
-                unit.heal(int((damage / 100) * self.effectiveness))
+                unit.heal(dmg.percent(damage, self.effectiveness))
 
 
 @dataclass
@@ -406,7 +495,7 @@ class Weaken[A: View, V: View](NegEffect):
         return (
             victim,
             attacker,
-            int(damage + ((damage / 100) * (100 - self.effectiveness))),
+            dmg.percent(damage, 200 - self.effectiveness),
             effects,
         )
 
@@ -496,7 +585,7 @@ class Energize(PosEffect):
     ) -> None:
         victim.battle.chili += self.chili_boost
 
-        if get_chance(self.stun_chance):
+        if victim.battle.rng.chance(self.stun_chance):
             attacker.add_neg_effects(Knock(name=self.name, turns=self.stun_duration))
 
 
@@ -513,7 +602,7 @@ class Mirror(PosEffect):
         if attacker.is_same(self.wearer) and isinstance(attacker, Ally):
             get = attacker._class.attack.get()
 
-            get.damage = int((get.damage / 100) * self.atk_damage_perc)
+            get.damage = dmg.percent(get.damage, self.atk_damage_perc)
 
             attacker._attack.send(get, attacker, victim)
 
@@ -528,21 +617,20 @@ class ThunderStorm(NegEffect):
         self, victim: View, attacker: View, damage: int, effects: Sequence[Effect]
     ) -> None:
         if victim.is_same(self.wearer):
-            shared_damage = int((damage / 100) * self.shared_damage_perc)
-
-            if not victim.is_ally:
-                for enemy in victim.battle.enemy_units.values():
-                    if enemy.is_same(victim):
-                        continue
-
-                    enemy.deal_damage(shared_damage, self.wearer, direct=True)
-
-            else:
-                for ally in victim.battle.allied_units.values():
-                    if ally.is_same(victim):
-                        continue
-
-                    ally.deal_damage(shared_damage, self.wearer, direct=True)
+            shared_damage = dmg.percent(damage, self.shared_damage_perc)
+
+            battle = victim.battle
+            units = battle.allied_units if victim.is_ally else battle.enemy_units
+
+            battle.deal_damage_many(
+                (
+                    (unit, shared_damage, ())
+                    for unit in units.values()
+                    if not unit.is_same(victim)
+                ),
+                self.wearer,
+                direct=True,
+            )
 
 
 @dataclass
@@ -556,7 +644,7 @@ class LifeDrain(NegEffect):
     and the amount of damage deal
 
     and return the amount to heal (of type ConvertibleToInt)
-    can be int, DamageObject or another custom object
+    can be int or anything else int() accepts
     """
 
     drain: Callable[[View, View, int], ConvertibleToInt]
@@ -634,8 +722,10 @@ class GiantGrownth(DamageBuff):
     health_boost: int
 
     def on_enter(self):
-        print("on enter called")
         wearer = self.wearer
+        log = wearer.battle.log
+
+        log.debug("on enter called")
         health_boost = self.health_boost
         TOTAL_HP = wearer.TOTAL_HP
 
@@ -643,10 +733,10 @@ class GiantGrownth(DamageBuff):
         boost = perc1 * health_boost
 
         self.boost = boost
-        print("health before: total={0}, hp={1}".format(wearer.TOTAL_HP, wearer.hp))
+        log.debug("health before: total={0}, hp={1}", wearer.TOTAL_HP, wearer.hp)
         wearer.TOTAL_HP += boost
         wearer.hp += boost
-        print("health after: total={0}, hp={1}".format(wearer.TOTAL_HP, wearer.hp))
+        log.debug("health after: total={0}, hp={1}", wearer.TOTAL_HP, wearer.hp)
 
     def on_exit(self):
         wearer = self.wearer
@@ -697,5 +787,5 @@ class FreezeBarrier(PosEffect):
         if not victim.is_same(self.wearer):
             return
 
-        if get_chance(self.freeze_chance):
+        if victim.battle.rng.chance(self.freeze_chance):
             attacker.add_neg_effects(Freeze(name=self.name, turns=self.freeze_turns))
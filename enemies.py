@@ -44,11 +44,13 @@ class Enemy(View):
         target = self.current_target
         target, self, damage, _ = target.deal_damage(damage, self)
 
-        print(f"{self.name} attacks {target.name} for {damage} damage")
+        self.battle.log.info(
+            "{} attacks {} for {} damage", self.name, target.name, damage
+        )
 
     def set_target(self):
         # always attack the lowest health target
-        self.current_target = min(self.battle.allied_units.values(), key=lambda x: x.hp)
+        self.current_target = self.battle.units.lowest(is_ally=True)
 
 
 class Brute(Enemy):
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Generator
+from typing import TYPE_CHECKING, Literal
+
+# effect expiry, see ExpiryWheel
+
+if TYPE_CHECKING:
+    from effects import Effect
+    from view import View
+
+type Phase = Literal["allies", "enemies"]
+
+# the phases effects tick down at, the start of the allies' and enemies' turn
+ALLIES_TURN: Phase = "allies"
+ENEMIES_TURN: Phase = "enemies"
+
+
+def phase_of(unit: View, effect: Effect) -> Phase:
+    """
+    the phase `effect` worn by `unit` ticks down at
+
+    the positive effects of allies and the negative effects of enemies
+    run out at the start of the allies' turn, the rest
+    at the start of the enemies' turn
+    """
+    return ALLIES_TURN if unit.is_ally == effect.is_pos else ENEMIES_TURN
+
+
+class ExpiryWheel:
+    """
+    a turn bucketed schedule of when effects expire
+
+    when an effect gets applied it is filed under the phase it ticks down at
+    and the tick (the count of that phase) it runs out at,
+    so every phase only touches the effects which actually expire
+
+    Effect.turns stays the duration the effect was applied with,
+    use remaining() for the turns left
+
+    an effect with 0 or less turns never expires
+    """
+
+    def __init__(self) -> None:
+        # how many times each phase has ticked
+        self.ticks: dict[Phase, int] = {ALLIES_TURN: 0, ENEMIES_TURN: 0}
+
+        # dict[(phase, tick), list[(unit, effect)]], may hold cancelled entries
+        self.buckets: dict[tuple[Phase, int], list[tuple[View, Effect]]] = {}
+
+        # dict[(unit id, is_pos, effect name), (phase, tick)], the live schedule
+        self.due: dict[tuple[int, bool | None, str], tuple[Phase, int]] = {}
+
+    def schedule(self, unit: View, effect: Effect) -> None:
+        if effect.turns <= 0:
+            return
+
+        phase = phase_of(unit, effect)
+        when = (phase, self.ticks[phase] + effect.turns)
+
+        self.due[unit.id, effect.is_pos, effect.name] = when
+        self.buckets.setdefault(when, []).append((unit, effect))
+
+    def cancel(self, unit: View, effect: Effect) -> None:
+        """forget `effect`, when it gets removed before it expires"""
+        self.due.pop((unit.id, effect.is_pos, effect.name), None)
+
+    def drop(self, unit: View) -> None:
+        """forget all effects of `unit`, when it dies"""
+        for effect in unit.effects.values():
+            self.cancel(unit, effect)
+
+    def remaining(self, unit: View, effect: Effect) -> int | None:
+        """turns left before `effect` expires, None if it never does"""
+        when = self.due.get((unit.id, effect.is_pos, effect.name))
+
+        if when is None:
+            return None
+
+        phase, tick = when
+        return tick - self.ticks[phase]
+
+    def tick(self, phase: Phase) -> Generator[tuple[View, Effect], None, None]:
+        """
+        advance `phase` by one and yield every (unit, effect)
+        which expires now, remove the effects while iterating
+        """
+        self.ticks[phase] += 1
+        when = (phase, self.ticks[phase])
+
+        for unit, effect in self.buckets.pop(when, ()):
+            key = (unit.id, effect.is_pos, effect.name)
+
+            if self.due.get(key) != when:
+                continue  # cancelled or rescheduled
+
+            effects = unit.pos_effects if effect.is_pos else unit.neg_effects
+
+            if effects.get(effect.name) is not effect:
+                continue
+
+            del self.due[key]
+            yield unit, effect
+
+    def copy(
+        self, unit: Callable[[View], View], effect: Callable[[Effect], Effect]
+    ) -> ExpiryWheel:
+        """
+        a copy with every entry remapped by unit() and effect(),
+        cancelled entries are left behind, see Battlefield.fork
+        """
+        new = type(self).__new__(type(self))
+        new.ticks = self.ticks.copy()
+        new.due = self.due.copy()  # only ids, names and ticks
+        new.buckets = {}
+
+        due = self.due
+        for when, entries in self.buckets.items():
+            live = [
+                (unit(u), effect(e))
+                for u, e in entries
+                if due.get((u.id, e.is_pos, e.name)) == when
+            ]
+            if live:
+                new.buckets[when] = live
+
+        return new
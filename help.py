@@ -1,7 +1,12 @@
+from __future__ import annotations
+
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
 from rich.markup import escape
-from rich.table import Table
+
+if TYPE_CHECKING:
+    from rich.table import Table
 
 # import type: output only
 
@@ -15,6 +20,8 @@ class TableMaker:
         self.rows = rows
 
     def dump(self) -> Table:
+        from rich.table import Table
+
         t = Table(title=self.title)
         for column in self.columns:
             t.add_column(column)
@@ -26,11 +33,20 @@ class TableMaker:
 
 
 class _Help:
+    # the tables are TableMakers until their first use, building
+    # every rich Table up front slowed down the start of the game
+
     def iter(self) -> list[str]:
         return [*self.__dict__.keys()]
 
     def __getitem__(self, item: str):
-        return getattr(self, item)
+        value = getattr(self, item)
+
+        if isinstance(value, TableMaker):
+            value = value.dump()
+            setattr(self, item, value)
+
+        return value
 
     battle_help = TableMaker(
         "Command Name",
@@ -51,10 +67,9 @@ class _Help:
         ("attack", "attack target enemy", "attack <ally> [target]"),
         ("support", "use support ability on target", "support <ally> [target]"),
         ("chili", "use rage chili on target", "chili <target>"),
+        ("hint", "let the autopilot suggest the next action", "No args"),
     )
 
-    battle_help = battle_help.dump()
-
     prebattle_help = TableMaker(
         "Command Name",
         "Description",
@@ -76,8 +91,6 @@ class _Help:
         ("start", "start this battle!", "No arguments"),
     )
 
-    prebattle_help = prebattle_help.dump()
-
     controls_interface = TableMaker(
         "Command Name",
         "Description",
@@ -110,7 +123,5 @@ class _Help:
         ("exit", "exit the controls interface", "Only confirmation"),
     )
 
-    controls_interface = controls_interface.dump()
-
 
 help = _Help()
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import struct
+from collections.abc import Generator, Iterator
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+# a compact binary record of everything that happens in a battle, see Journal
+
+if TYPE_CHECKING:
+    from battle import Action
+    from effects import Effect
+    from view import View
+
+
+class Event(IntEnum):
+    SPAWN = 0  # a=unit id, b=name, value=hp, aux=total hp, flags=is_ally
+    TURN = 1  # value=turn, flags=0 allies' turn, 1 enemies' turn
+    ACTION = 2  # a=ally id, b=target id or -1, value=ACTIONS index
+    DAMAGE = 3  # a=source id, b=target id, value=damage, aux=hp after
+    HEAL = 4  # b=target id, value=heal, aux=hp after
+    HP = 5  # a=unit id, value=hp, aux=total hp, every change of View.hp
+    # a=unit id, b=effect name, value=turns, aux=effect type, flags=is_pos
+    EFFECT_ADD = 6
+    EFFECT_REMOVE = 7  # a=unit id, b=effect name, flags=is_pos
+    EFFECT_EXPIRE = 8  # a=unit id, b=effect name, flags=is_pos, followed by a remove
+    RNG = 9  # a=draw index, value=the draw scaled to RNG_SCALE
+    DEATH = 10  # a=unit id
+    WAVE = 11  # value=wave number
+    CHILI = 12  # value=chili charge
+    RESULT = 13  # value=battle.result value
+
+
+ACTIONS = ("attack", "support", "chili")
+
+# rng draws are stored as integers, draw * RNG_SCALE
+RNG_SCALE = 2**31
+
+
+class Record(NamedTuple):
+    kind: int
+    flags: int
+    turn: int
+    a: int
+    b: int
+    value: int
+    aux: int
+
+
+class Journal:
+    """
+    an append only log of a battle
+
+    every record is a fixed width RECORD packed into one bytearray,
+    strings (unit and effect names) are interned into `names`
+    and records refer to them by index
+
+    attach it with Battlefield(journal=Journal()),
+    the Battlefield writes the seed of its rng into `seed`,
+    see Replay for reading it back
+    """
+
+    RECORD = struct.Struct("<BBHiiii")
+    MAGIC = b"ABEJ"
+    HEADER = struct.Struct("<4sBqI")
+    VERSION = 1
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.seed = seed
+        self.buffer = bytearray()
+        self.names: list[str] = []
+        self._names: dict[str, int] = {}
+        self.turn = 0
+
+    def intern(self, name: str) -> int:
+        index = self._names.get(name)
+
+        if index is None:
+            index = self._names[name] = len(self.names)
+            self.names.append(name)
+
+        return index
+
+    def record(
+        self,
+        kind: Event,
+        a: int = -1,
+        b: int = -1,
+        value: int = 0,
+        aux: int = 0,
+        flags: int = 0,
+    ) -> None:
+        self.buffer += self.RECORD.pack(
+            kind, flags, self.turn & 0xFFFF, a, b, value, aux
+        )
+
+    # typed helpers for the engine
+
+    def spawn(self, unit: View) -> None:
+        self.record(
+            Event.SPAWN,
+            unit.id,
+            self.intern(unit.name),
+            unit.hp,
+            unit.TOTAL_HP,
+            int(unit.is_ally),
+        )
+
+    def new_turn(self, turn: int, enemies: bool) -> None:
+        self.turn = turn
+        self.record(Event.TURN, value=turn, flags=int(enemies))
+
+    def action(self, action: Action, ally: View, target: View | None) -> None:
+        self.record(
+            Event.ACTION,
+            ally.id,
+            -1 if target is None else target.id,
+            ACTIONS.index(action.kind),
+        )
+
+    def damage(self, source: View, target: View, damage: int) -> None:
+        self.record(Event.DAMAGE, source.id, target.id, damage, target.hp)
+
+    def heal(self, target: View, heal: int) -> None:
+        self.record(Event.HEAL, b=target.id, value=heal, aux=target.hp)
+
+    def hp(self, unit: View) -> None:
+        self.record(Event.HP, unit.id, value=unit.hp, aux=unit.TOTAL_HP)
+
+    def effect_added(self, unit: View, effect: Effect) -> None:
+        self.record(
+            Event.EFFECT_ADD,
+            unit.id,
+            self.intern(effect.name),
+            effect.turns,
+            self.intern(type(effect).__name__),
+            int(bool(effect.is_pos)),
+        )
+
+    def effect_removed(self, unit: View, effect: Effect) -> None:
+        self.record(
+            Event.EFFECT_REMOVE,
+            unit.id,
+            self.intern(effect.name),
+            flags=int(bool(effect.is_pos)),
+        )
+
+    def expired(self, unit: View, effect: Effect) -> None:
+        self.record(
+            Event.EFFECT_EXPIRE,
+            unit.id,
+            self.intern(effect.name),
+            flags=int(bool(effect.is_pos)),
+        )
+
+    def rng(self, index: int, draw: float) -> None:
+        self.record(Event.RNG, index, value=int(draw * RNG_SCALE))
+
+    def death(self, unit: View) -> None:
+        self.record(Event.DEATH, unit.id)
+
+    def wave(self, wave: int) -> None:
+        self.record(Event.WAVE, value=wave)
+
+    def chili(self, chili: int) -> None:
+        self.record(Event.CHILI, value=int(chili))
+
+    def result(self, value: int) -> None:
+        self.record(Event.RESULT, value=value)
+
+    # reading
+
+    def __len__(self) -> int:
+        return len(self.buffer) // self.RECORD.size
+
+    def __iter__(self) -> Iterator[Record]:
+        return map(Record._make, self.RECORD.iter_unpack(self.buffer))
+
+    # storage
+
+    def to_bytes(self) -> bytes:
+        names = "\0".join(self.names).encode()
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, -1 if self.seed is None else self.seed, len(names)
+        )
+        return header + names + self.buffer
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Journal:
+        magic, version, seed, size = cls.HEADER.unpack_from(data)
+
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a battle journal, or an unsupported version")
+
+        offset = cls.HEADER.size
+
+        journal = cls(None if seed == -1 else seed)
+
+        names = data[offset : offset + size].decode()
+        for name in names.split("\0") if names else ():
+            journal.intern(name)
+
+        journal.buffer = bytearray(data[offset + size :])
+        return journal
+
+    def save(self, path: Path | str) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Path | str) -> Journal:
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+@dataclass
+class ReplayUnit:
+    id: int
+    name: str
+    is_ally: bool
+    hp: int
+    TOTAL_HP: int
+    alive: bool = True
+    # dict[(is_pos, effect name), effect type name]
+    effects: dict[tuple[bool, str], str] = field(default_factory=dict)
+
+
+class Replay:
+    """
+    rebuild the state of a battle from its journal
+
+    nothing of the engine runs, no abilities, no effect hooks,
+    the recorded state changes are simply applied in order,
+    so replaying is as fast as unpacking the records
+    """
+
+    def __init__(self, journal: Journal) -> None:
+        self.journal = journal
+        self.units: dict[int, ReplayUnit] = {}
+        self.turn = 0
+        self.wave = 1
+        self.chili = 0
+        self.result: int | None = None
+        # list[(draw index, scaled draw)]
+        self.draws: list[tuple[int, int]] = []
+
+    def apply(self, record: Record) -> None:
+        kind = record.kind
+        names = self.journal.names
+
+        if kind == Event.HP:
+            unit = self.units[record.a]
+            unit.hp = record.value
+            unit.TOTAL_HP = record.aux
+
+        elif kind == Event.CHILI:
+            self.chili = record.value
+
+        elif kind == Event.EFFECT_ADD:
+            self.units[record.a].effects[bool(record.flags), names[record.b]] = names[
+                record.aux
+            ]
+
+        elif kind == Event.EFFECT_REMOVE:
+            self.units[record.a].effects.pop(
+                (bool(record.flags), names[record.b]), None
+            )
+
+        elif kind == Event.RNG:
+            self.draws.append((record.a, record.value))
+
+        elif kind == Event.SPAWN:
+            self.units[record.a] = ReplayUnit(
+                record.a, names[record.b], bool(record.flags), record.value, record.aux
+            )
+
+        elif kind == Event.DEATH:
+            self.units[record.a].alive = False
+
+        elif kind == Event.TURN:
+            self.turn = record.value
+
+        elif kind == Event.WAVE:
+            self.wave = record.value
+
+        elif kind == Event.RESULT:
+            self.result = record.value
+
+        # ACTION, DAMAGE, HEAL and EFFECT_EXPIRE only describe what happened,
+        # the state changes they cause have their own records
+
+    def step(self) -> Generator[Record, None, None]:
+        """apply the records one by one, yielding each after it was applied"""
+        for record in self.journal:
+            self.apply(record)
+            yield record
+
+    def play(self) -> Replay:
+        """apply the whole journal"""
+        for _ in self.step():
+            pass
+        return self
+
+    def check_rng(self) -> bool:
+        """
+        if the rng draws replayed so far match the ones the seed produces,
+        draws made before the journal was attached (like the waves) are skipped
+        """
+        from rng import BattleRNG
+
+        if self.journal.seed is None:
+            raise ValueError("The journal has no seed")
+
+        rng = BattleRNG(self.journal.seed)
+
+        for index, draw in self.draws:
+            while rng.draws < index:
+                rng.random()
+
+            if int(rng.random() * RNG_SCALE) != draw:
+                return False
+
+        return True
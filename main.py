@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-import json
+import sys
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from pathlib import Path
 
-# import type: input only
-from battle import battle_interface
-from battle import result as res
-from controls import controls_interface
+import prompts
+from commands import Commands, Dispatcher
+from prompts import ask
+from store import Store
+
+# only whats needed for the main menu gets imported up front,
+# battle (with rich and every ability) and controls on their first use,
+# see startup.py
+
+# the exit status of a --script run, by the result of the last battle played
+# (battle.result names, 0 without a battle), STOPPED if it ended mid battle
+EXIT_STATUS = {"won": 0, "lost": 1, "game_aborted": 2, "interface_aborted": 3}
+STOPPED = 4
 
 highlighters: dict[str, Callable[[str], str]] = {
     "bold": lambda t: f"[b]{t}[/b]",
@@ -18,19 +27,6 @@ highlighters: dict[str, Callable[[str], str]] = {
 }
 
 
-class JSON(Path):
-    def __init__(self, *args) -> None:
-        super().__init__(*args)
-        self.raw_content = self.read_text()
-        self.content: dict = json.loads(self.raw_content)
-
-    def save(self, data: dict | None = None):
-        if data is None:
-            self.write_text(json.dumps(self.content, indent=4))
-        else:
-            self.write_text(json.dumps(data, indent=4))
-
-
 @dataclass
 class Highlighter:
     current: dict[str, Callable[[str], str]] = field(default_factory=dict)
@@ -43,11 +39,25 @@ class Highlighter:
 class MainObj:
     def __init__(self) -> None:
         self.data = Path(__file__).parent / "data"
-        self.jsons: dict[str, JSON] = {}
-        self._jsons: dict[str, Path] = {}
+        # the sqlite profile (see profiledb.py) if there is one,
+        # the history of the battles played only gets recorded there
+        self.profile = None
+
+        if (self.data / "profile.db").exists():
+            from profiledb import DOCUMENTS, Profile
+
+            self.profile = Profile(self.data / "profile.db")
+
+            # created without `profiledb.py init` (or an older one),
+            # the documents it misses come from the json files
+            if any(name not in self.profile for name in DOCUMENTS):
+                self.profile.import_json(self.data)
 
-        for path in self.data.iterdir():
-            self.jsons[path.stem] = JSON(path)
+        # the files are read when first used and saved in the background
+        self.jsons = Store(self.data) if self.profile is None else self.profile
+
+        # dict[alias, action] of the controls, see Commands
+        self.commands = Commands(lambda: self.jsons["controls"].content)
 
         self.fp = Path(__file__)
 
@@ -70,6 +80,9 @@ class MainObj:
     def control(self, name: str) -> Iterable[str]:
         return self.jsons["controls"].content.get(name, [name])
 
+    def resolve(self, alias: str) -> str | None:
+        return self.commands.resolve(alias)
+
     def tabulate_xp(self, xp: int | None = None, scale: int | None = None):
         if xp is None:
             xp = self.xp
@@ -90,33 +103,97 @@ class MainObj:
         self.xp = xp
 
 
+def command_battle(words: list[str]) -> None:
+    import allies
+    from battle import battle_interface
+    from battle import result as res
+
+    # the birds are as strong as the level of this profile
+    allies.set_level(mainobj.level)
+
+    global last_result
+
+    last_result = result = battle_interface(mainobj)
+    print()
+
+    match result:
+        case res.won:
+            print("You won! :D")
+
+        case res.lost:
+            print("You lost! :C")
+
+        case res.game_aborted:
+            print("Game Aborted... :/")
+
+        case res.interface_aborted:
+            print("Left prebattle interface... :S")
+
+
+def command_controls(words: list[str]) -> None:
+    from controls import controls_interface
+
+    controls_interface(mainobj)
+
+
+def parse_args(argv: list[str]) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="angry birds epic, in the terminal")
+    parser.add_argument(
+        "--script",
+        metavar="PATH",
+        help="play the lines of PATH (- for stdin) instead of asking, one per prompt,"
+        " exits with the result of the last battle once they run out",
+    )
+    parser.add_argument(
+        "--record", metavar="PATH", help="write everything typed to PATH, a --script"
+    )
+    args = parser.parse_args(argv)
+
+    if args.script is not None:
+        prompts.source = prompts.Script.open(args.script)
+
+    if args.record is not None:
+        # closed with the source once the main loop ends
+        prompts.source = prompts.Recorder(prompts.source, open(args.record, "w"))
+
+
+# argparse only gets imported with arguments to parse
+if sys.argv[1:]:
+    parse_args(sys.argv[1:])
+
 mainobj = MainObj()
+last_result = None  # battle.result of the last battle
+
+# the main menu> prompt
+commands = Dispatcher(mainobj, {"battle": command_battle, "controls": command_controls})
 
-while True:
-    INPUT = input("main menu> ").strip().lower()
+try:
+    while True:
+        INPUT = ask("main menu> ").strip().lower()
 
-    if INPUT == "battle":
-        result = battle_interface(mainobj)
-        print()
+        if not INPUT:
+            continue
 
-        match result:
-            case res.won:
-                print("You won! :D")
+        action = commands.lookup(INPUT)
 
-            case res.lost:
-                print("You lost! :C")
+        if action is None:
+            print(f"No command found for '{INPUT}'")
+            continue
 
-            case res.game_aborted:
-                print("Game Aborted... :/")
+        commands.run(action, INPUT.split(" "))
 
-            case res.interface_aborted:
-                print("Left prebattle interface... :S")
+except prompts.ScriptEnd as end:
+    print()
 
-    elif INPUT == "controls":
-        controls_interface(mainobj)
+    # out of lines at the main menu is the end of a script,
+    # anywhere else it stopped in the middle of something
+    if end.prompt != "main menu> ":
+        print(end, file=sys.stderr)
+        sys.exit(STOPPED)
 
-    elif not INPUT:
-        continue
+    sys.exit(0 if last_result is None else EXIT_STATUS[last_result.name])
 
-    else:
-        print(f"No command found for '{INPUT}'")
+finally:
+    prompts.source.close()
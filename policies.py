@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from autopilot import AutoPolicy
+
+# policies for headless battles, see battle.Policy
+
+if TYPE_CHECKING:
+    from battle import Action, Ally, Battlefield
+
+
+class RandomPolicy:
+    """Play a random legal action, for the first ally who has one"""
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.random = random.Random(seed)
+
+    def choose(self, battle: Battlefield, choices: Sequence[Ally]) -> Action | None:
+        for ally in choices:
+            actions = battle.legal_actions(ally)
+            if actions:
+                return self.random.choice(actions)
+
+        # nobody can do anything, end the turn
+        return None
+
+
+class AttackFirstPolicy:
+    """Every ally attacks the first enemy, a deterministic baseline"""
+
+    def __init__(self, seed: int | None = None) -> None:
+        pass  # nothing random here, seed is accepted for a uniform signature
+
+    def choose(self, battle: Battlefield, choices: Sequence[Ally]) -> Action | None:
+        from battle import Action
+
+        target = next(iter(battle.enemy_units))
+
+        for ally in choices:
+            if not battle.blocked_by(ally, "attack"):
+                return Action("attack", ally.clsname, target)
+
+        return None
+
+
+# policies by name, for the command line and worker processes
+POLICIES: dict[str, type[RandomPolicy | AttackFirstPolicy | AutoPolicy]] = {
+    "random": RandomPolicy,
+    "attack-first": AttackFirstPolicy,
+    "auto": AutoPolicy,
+}
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+# the optional sqlite profile, see Profile
+# python profiledb.py init  (copies data/*.json into data/profile.db)
+# python profiledb.py winrate paladin --last 1000
+
+if TYPE_CHECKING:
+    from journal import Journal
+
+DATA = Path(__file__).parent / "data"
+PROFILE_FILE = DATA / "profile.db"
+
+# the json files of data/ which are profile state, the rest is game data
+DOCUMENTS = ("general", "picked", "controls", "preset-controls")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY,
+    played REAL NOT NULL,  -- unix time
+    result TEXT NOT NULL,  -- a battle.result name
+    won INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    seed INTEGER,
+    policy TEXT  -- NULL for battles played at the battle> prompt
+);
+
+CREATE TABLE IF NOT EXISTS battle_allies (
+    battle INTEGER NOT NULL REFERENCES battles (id),
+    bird TEXT NOT NULL,
+    class TEXT NOT NULL,
+    PRIMARY KEY (battle, bird)
+) WITHOUT ROWID;
+
+-- the battles of a class, newest first
+CREATE INDEX IF NOT EXISTS battle_allies_class ON battle_allies (class, battle);
+
+CREATE TABLE IF NOT EXISTS ability_stats (
+    battle INTEGER NOT NULL REFERENCES battles (id),
+    bird TEXT NOT NULL,
+    class TEXT NOT NULL,
+    ability TEXT NOT NULL,  -- attack, support or chili
+    uses INTEGER NOT NULL,
+    damage INTEGER NOT NULL,  -- dealt by the bird since it used the ability
+    PRIMARY KEY (battle, bird, ability)
+) WITHOUT ROWID;
+"""
+
+
+class BattleRecord(NamedTuple):
+    """a finished battle, what Profile.record stores"""
+
+    team: Mapping[str, str]  # dict[birdname, classname]
+    result: str  # battle.result name
+    turns: int
+    seed: int | None = None
+    policy: str | None = None
+    # list[(birdname, ability, uses, damage)], see ability_stats
+    abilities: Iterable[tuple[str, str, int, int]] = ()
+
+
+class WinRate(NamedTuple):
+    battles: int
+    wins: int
+
+    @property
+    def rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+
+class ProfileDocument:
+    """a profile json document, the same `content` and `save` as store.Document"""
+
+    def __init__(self, profile: Profile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+        self._content: dict | None = None
+
+    @property
+    def content(self) -> dict:
+        if self._content is None:
+            row = self.profile.db.execute(
+                "SELECT content FROM documents WHERE name = ?", (self.name,)
+            ).fetchone()
+            self._content = json.loads(row[0])
+
+        return self._content
+
+    @content.setter
+    def content(self, content: dict) -> None:
+        self._content = content
+
+    def save(self, data: dict | None = None) -> None:
+        if data is not None:
+            self._content = data
+
+        self.profile.db.execute(
+            "INSERT INTO documents VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET content = excluded.content",
+            (self.name, json.dumps(self.content, indent=4)),
+        )
+
+
+class Profile(Mapping[str, ProfileDocument]):
+    """
+    a sqlite database in WAL mode with the profile documents
+    (general, picked, controls...) and the history of every recorded battle
+
+    it is a Mapping of documents like store.Store, so it can be `MainObj.jsons`,
+    MainObj uses data/profile.db if it exists instead of the json files
+
+    battles get appended in one transaction per `record` call,
+    any amount of processes (the workers of simulate.py) can append
+    at the same time, a writer waits up to `timeout` seconds for the others
+    """
+
+    def __init__(self, path: Path | str = PROFILE_FILE, timeout: float = 30.0) -> None:
+        self.path = Path(path)
+
+        # autocommit, transactions are explicit, see transaction
+        self.db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+
+        # not executescript, it commits instead of joining the transaction
+        with self.transaction():
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    self.db.execute(statement)
+
+        self.documents = {
+            name: ProfileDocument(self, name)
+            for (name,) in self.db.execute("SELECT name FROM documents")
+        }
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # IMMEDIATE takes the write lock up front, two processes
+        # upgrading a read to a write at once would fail instead of wait
+        self.db.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+        self.db.execute("COMMIT")
+
+    def close(self) -> None:
+        self.db.close()
+
+    # documents
+
+    def __getitem__(self, name: str) -> ProfileDocument:
+        return self.documents[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.documents)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def import_json(self, directory: Path = DATA, replace: bool = False) -> list[str]:
+        """
+        copy the profile documents of `directory` (see DOCUMENTS) into the profile,
+        documents it already has are kept unless `replace`
+
+        -> the names of the copied documents
+        """
+        copied = []
+
+        with self.transaction():
+            for name in DOCUMENTS:
+                path = directory / f"{name}.json"
+
+                if not path.exists() or (name in self.documents and not replace):
+                    continue
+
+                self.db.execute(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?)",
+                    (name, path.read_text()),
+                )
+                self.documents[name] = ProfileDocument(self, name)
+                copied.append(name)
+
+        return copied
+
+    # battles
+
+    def record(self, battles: Iterable[BattleRecord]) -> None:
+        """append `battles` to the history, all at once"""
+        with self.transaction():
+            for battle in battles:
+                id = self.db.execute(
+                    "INSERT INTO battles (played, result, won, turns, seed, policy)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        time.time(),
+                        battle.result,
+                        battle.result == "won",
+                        battle.turns,
+                        battle.seed,
+                        battle.policy,
+                    ),
+                ).lastrowid
+
+                self.db.executemany(
+                    "INSERT INTO battle_allies VALUES (?, ?, ?)",
+                    ((id, bird, cls) for bird, cls in battle.team.items()),
+                )
+                self.db.executemany(
+                    "INSERT INTO ability_stats VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (id, bird, battle.team[bird], ability, uses, damage)
+                        for bird, ability, uses, damage in battle.abilities
+                    ),
+                )
+
+    def win_rate(self, classname: str, last: int = 1000) -> WinRate:
+        """how the last `last` battles with a `classname` in the team went"""
+        battles, wins = self.db.execute(
+            "SELECT count(*), coalesce(sum(battles.won), 0) FROM ("
+            "  SELECT battle FROM battle_allies WHERE class = ?"
+            "  ORDER BY battle DESC LIMIT ?"
+            ") AS team JOIN battles ON battles.id = team.battle",
+            (classname, last),
+        ).fetchone()
+
+        return WinRate(battles, wins)
+
+    def ability_stats(
+        self, classname: str, last: int = 1000
+    ) -> dict[str, tuple[float, float]]:
+        """
+        the abilities of a `classname` over its last `last` battles
+
+        -> dict[ability, (uses per battle, damage per battle)]
+        """
+        battles = self.win_rate(classname, last).battles
+
+        rows = self.db.execute(
+            "SELECT stats.ability, sum(stats.uses), sum(stats.damage) FROM ("
+            "  SELECT battle, bird FROM battle_allies WHERE class = ?"
+            "  ORDER BY battle DESC LIMIT ?"
+            ") AS team JOIN ability_stats AS stats"
+            " ON stats.battle = team.battle AND stats.bird = team.bird"
+            " GROUP BY stats.ability",
+            (classname, last),
+        )
+
+        return {
+            ability: (uses / battles, damage / battles)
+            for ability, uses, damage in rows
+        }
+
+
+def ability_stats(journal: Journal) -> list[tuple[str, str, int, int]]:
+    """
+    the actions of every ally in a journaled battle, the damage an ally
+    deals counts for the last ability it used (a poison for the attack
+    which applied it, a counter for the support before it...)
+
+    -> list[(birdname, ability, uses, damage)]
+    """
+    from journal import ACTIONS, Event
+
+    birds: dict[int, str] = {}  # dict[ally id, birdname]
+    using: dict[int, str] = {}  # dict[ally id, the last ability it used]
+    uses: Counter[tuple[int, str]] = Counter()
+    damage: Counter[tuple[int, str]] = Counter()
+
+    for record in journal:
+        if record.kind == Event.SPAWN and record.flags:
+            birds[record.a] = journal.names[record.b]
+
+        elif record.kind == Event.ACTION:
+            ability = using[record.a] = ACTIONS[record.value]
+            uses[record.a, ability] += 1
+
+        elif record.kind == Event.DAMAGE and record.a in using:
+            damage[record.a, using[record.a]] += record.value
+
+    return [
+        (birds[id], ability, count, damage[id, ability])
+        for (id, ability), count in uses.items()
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="the sqlite profile, data/profile.db")
+    parser.add_argument("--path", type=Path, default=PROFILE_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="create it from the data/*.json files")
+    init.add_argument("--replace", action="store_true", help="overwrite documents")
+
+    for name in ("winrate", "abilities"):
+        command = commands.add_parser(name, help=f"{name} of a class's battles")
+        command.add_argument("classname")
+        command.add_argument("--last", type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    profile = Profile(args.path)
+
+    if args.command == "init":
+        copied = profile.import_json(replace=args.replace)
+        print(f"copied {', '.join(copied) or 'nothing'} into {args.path}")
+
+    elif args.command == "winrate":
+        rate = profile.win_rate(args.classname, args.last)
+        print(f"{args.classname}: {rate.rate:.1%} of {rate.battles} battles")
+
+    else:
+        for ability, (uses, damage) in profile.ability_stats(
+            args.classname, args.last
+        ).items():
+            print(f"{ability}: {uses:.2f} uses, {damage:.0f} damage per battle")
+
+    profile.close()
+
+
+if __name__ == "__main__":
+    main()
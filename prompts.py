@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Protocol, TextIO
+
+# where what gets typed at the prompts (main menu>, battle>, controls>,
+# the confirmations...) comes from, see ask
+#
+# python main.py --script moves.txt  (or - for stdin)
+# python main.py --record moves.txt  (play by hand, replay it later with --script)
+
+
+class ScriptEnd(EOFError):
+    """a script ran out of lines while a prompt was waiting for one"""
+
+    def __init__(self, prompt: str, line: int) -> None:
+        super().__init__(f"the script ended after line {line}, at {prompt.strip()!r}")
+        self.prompt = prompt
+
+
+class InputSource(Protocol):
+    def read(self, prompt: str) -> str: ...
+
+    def close(self) -> None: ...
+
+
+class Terminal:
+    """the player, input() with its line editing (and tab completion, see commands)"""
+
+    def read(self, prompt: str) -> str:
+        return input(prompt)
+
+    def close(self) -> None:
+        pass
+
+
+class Script:
+    """
+    the lines of a file, one per prompt, confirmations included,
+    blank lines are lines too (they get a prompt again), lines starting
+    with # are comments
+
+    every line is written after its prompt like the player typed it,
+    so the output reads like the session it replays, unless not `echo`
+    """
+
+    def __init__(
+        self, lines: Iterable[str], echo: bool = True, file: TextIO | None = None
+    ) -> None:
+        self.lines: Iterator[str] = iter(lines)
+        self.echo = echo
+        self.line = 0  # the number of the last line read
+        self.file = file  # the file opened for the lines, see close
+
+    @classmethod
+    def open(cls, path: str, echo: bool = True) -> Script:
+        """the script at `path`, "-" is stdin"""
+        if path == "-":
+            return cls(sys.stdin, echo)
+
+        file = Path(path).open()
+        return cls(file, echo, file)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def read(self, prompt: str) -> str:
+        for line in self.lines:
+            self.line += 1
+            line = line.rstrip("\r\n")
+
+            if line.startswith("#"):
+                continue
+
+            if self.echo:
+                sys.stdout.write(f"{prompt}{line}\n")
+
+            return line
+
+        raise ScriptEnd(prompt, self.line)
+
+
+class Recorder:
+    """another source, with every line read from it appended to `file`, a script"""
+
+    def __init__(self, source: InputSource, file: TextIO) -> None:
+        self.source = source
+        self.file = file
+
+    def read(self, prompt: str) -> str:
+        line = self.source.read(prompt)
+
+        self.file.write(f"{line}\n")
+        self.file.flush()
+
+        return line
+
+    def close(self) -> None:
+        self.file.close()
+        self.source.close()
+
+
+source: InputSource = Terminal()
+
+
+def ask(prompt: str) -> str:
+    """what got typed at `prompt`, the input() of every prompt of the game"""
+    return source.read(prompt)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from rich import get_console
+from rich.console import Console, Group
+from rich.table import Table
+
+# the battle screen, only printed again once it changed, see BattleView
+
+if TYPE_CHECKING:
+    from battle import Battlefield
+
+HEADERS = ("Name", "Current Health/Total Health", "Effects")
+
+# the state of a row, what it shows: (cells, bold name)
+type RowState = tuple[tuple[str, ...], bool]
+
+
+class BattleView:
+    """
+    the tables of a battle (allies, enemies, chili) as the battle> prompt shows them
+
+    the tables are only built and printed once what they show changes
+    (name, played state, health or effects of a unit, or the chili),
+    a command which changed nothing (help, typos, stat...) costs
+    comparing the state of the battle with the last printed one
+
+    the prompt scrolls, so every new screen is printed below the last
+    instead of being updated in place
+    """
+
+    def __init__(self, battle: Battlefield, console: Console | None = None) -> None:
+        self.battle = battle
+        self.console = get_console() if console is None else console
+        self.last: tuple | None = None  # the state of the last printed screen
+
+    def state(self) -> tuple[tuple[RowState, ...], tuple[RowState, ...], str]:
+        battle = self.battle
+
+        allies = tuple(
+            (
+                (ally.clsname, f"{ally.hp}/{ally.TOTAL_HP}", ", ".join(ally.effects)),
+                ally.clsname not in battle.played,  # still has to play, in bold
+            )
+            for ally in battle.allied_units.values()
+        )
+        enemies = tuple(
+            (
+                (enemy.name, f"{enemy.hp}/{enemy.TOTAL_HP}", ", ".join(enemy.effects)),
+                False,
+            )
+            for enemy in battle.enemy_units.values()
+        )
+
+        return allies, enemies, f"{battle.chili}%"
+
+    def draw(self, force: bool = False) -> bool:
+        """
+        print the screen if it changed since the last one,
+        force: print it even if it didnt
+
+        -> if the screen got printed
+        """
+        state = self.state()
+
+        if not force and state == self.last:
+            return False
+
+        allies, enemies, chili = state
+        self.last = state
+
+        self.console.print(
+            Group(
+                table("Allies", HEADERS, allies),
+                table("Enemies", HEADERS, enemies),
+                table(None, ("chili",), (((chili,), False),)),
+            )
+        )
+        return True
+
+
+def table(
+    title: str | None, headers: Sequence[str], states: Sequence[RowState]
+) -> Table:
+    t = Table(title=title)
+
+    for header in headers:
+        t.add_column(header)
+
+    for cells, bold in states:
+        name, *rest = cells
+        t.add_row(f"[b]{name}[/b]" if bold else name, *rest)
+
+    return t
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import secrets
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from journal import Journal
+
+# random numbers for battles, see BattleRNG
+
+
+class BattleRNG:
+    """
+    the random number service of a single battle
+
+    seeded, so the same seed replays the same battle,
+    and splittable, so worker processes and forks get their own
+    independent but reproducible streams (see split)
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        if seed is None:
+            seed = secrets.randbits(63)
+
+        self.seed = seed
+        self._random = random.Random(seed)
+
+        # every draw gets recorded if a journal is attached, see Battlefield
+        self.journal: Journal | None = None
+        self.draws = 0
+
+    def random(self) -> float:
+        """the next float in [0.0, 1.0)"""
+        value = self._random.random()
+
+        if self.journal is not None:
+            self.journal.rng(self.draws, value)
+
+        self.draws += 1
+        return value
+
+    def chance(self, chance: int) -> bool:
+        """True with a `chance`% probability"""
+        if chance > 100 or chance < 0:
+            raise ValueError(
+                f"Invalid chance parameter: {chance},"
+                " expected an integer in range 0-100 (inclusive)"
+            )
+
+        return self.random() * 100 < chance
+
+    def choice[T](self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+
+        return seq[int(self.random() * len(seq))]
+
+    def derive(self, key: int | str) -> int:
+        """a seed for the child stream `key`, see split"""
+        digest = hashlib.blake2b(f"{self.seed}:{key}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest) >> 1
+
+    def split(self, key: int | str) -> BattleRNG:
+        """
+        an independent stream for `key`, for example a worker or a battle number,
+        the same seed and key always give the same stream
+        """
+        return type(self)(self.derive(key))
+
+    def copy(self) -> BattleRNG:
+        """
+        a copy at the same position of the same stream,
+        it draws exactly what this one would have, see Battlefield.fork
+        """
+        new = type(self).__new__(type(self))
+        new.seed = self.seed
+        new._random = random.Random()
+        new._random.setstate(self._random.getstate())
+        new.journal = None
+        new.draws = self.draws
+        return new
@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+from collections.abc import Generator, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from battle import result
+    from journal import Journal
+
+# monte carlo battle simulations for balance testing
+# every battle is played headlessly (see Battlefield.run)
+# and fanned out over a process pool
+
+# dict[birdname, classname], same as picked.json
+type Team = Mapping[str, str]
+
+
+@dataclass
+class SimulationStats:
+    """
+    aggregated outcomes of simulated battles
+
+    `draws` are battles stopped by max_turns,
+    `errors` are battles which raised, `error` keeps the traceback of the first one
+    """
+
+    battles: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    errors: int = 0
+    error: str | None = None
+    # totals, use the properties for averages
+    turns_to_win: int = 0
+    surviving_hp: int = 0
+    total_hp: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+    @property
+    def mean_turns_to_win(self) -> float:
+        return self.turns_to_win / self.wins if self.wins else 0.0
+
+    @property
+    def mean_surviving_hp(self) -> float:
+        """average ally health left over after a won battle"""
+        return self.surviving_hp / self.wins if self.wins else 0.0
+
+    @property
+    def surviving_hp_perc(self) -> float:
+        return self.surviving_hp / self.total_hp * 100 if self.total_hp else 0.0
+
+    def merge(self, other: SimulationStats) -> None:
+        self.battles += other.battles
+        self.wins += other.wins
+        self.losses += other.losses
+        self.draws += other.draws
+        self.errors += other.errors
+        self.error = self.error or other.error
+        self.turns_to_win += other.turns_to_win
+        self.surviving_hp += other.surviving_hp
+        self.total_hp += other.total_hp
+
+    def copy(self) -> SimulationStats:
+        new = SimulationStats()
+        new.merge(self)
+        return new
+
+    def __str__(self) -> str:
+        return (
+            f"battles={self.battles} win_rate={self.win_rate:.1%}"
+            f" turns_to_win={self.mean_turns_to_win:.1f}"
+            f" surviving_hp={self.mean_surviving_hp:.0f}"
+            f" ({self.surviving_hp_perc:.0f}%)"
+            f" draws={self.draws} errors={self.errors}"
+        )
+
+
+@dataclass
+class Chunk:
+    """a batch of battles for one worker, picklable"""
+
+    team: dict[str, str]
+    seeds: list[int]
+    policy: str = "random"
+    max_turns: int | None = 500
+    stats: SimulationStats = field(default_factory=SimulationStats)
+    # the sqlite profile (see profiledb.py) to record every battle in
+    profile: str | None = None
+    level: int | None = None  # of the birds, None for data/general.json's
+
+
+def play(
+    team: Team,
+    seed: int,
+    policy: str = "random",
+    max_turns: int | None = 500,
+    journal: Journal | None = None,
+) -> tuple[result, int, int, int]:
+    """
+    play a single headless battle of `team` against the dummy waves,
+    recorded in `journal` if given
+
+    -> (result, turns, surviving ally hp, total ally hp)
+    """
+    from battle import Ally, Battlefield, dummy_waves, silent
+    from policies import POLICIES
+    from rng import BattleRNG
+
+    rng = BattleRNG(seed)
+
+    battle = Battlefield(
+        *dummy_waves(rng),
+        allies=[Ally(name, cls) for name, cls in team.items()],
+        echo=silent,
+        chili=100,
+        rng=rng,
+        journal=journal,
+    )
+
+    res = battle.run(POLICIES[policy](seed), max_turns=max_turns)
+
+    allies = battle.allied_units.values()
+
+    return (
+        res,
+        battle.turn,
+        sum(max(ally.hp, 0) for ally in allies),
+        sum(ally.TOTAL_HP for ally in allies),
+    )
+
+
+def run_chunk(chunk: Chunk) -> SimulationStats:
+    """play every battle of `chunk`, this runs inside the worker processes"""
+    from battle import result
+
+    stats = chunk.stats
+    records = []
+
+    if chunk.level is not None:
+        import allies
+
+        allies.set_level(chunk.level)
+
+    for seed in chunk.seeds:
+        stats.battles += 1
+
+        journal = None
+
+        if chunk.profile is not None:
+            from journal import Journal
+
+            journal = Journal()
+
+        try:
+            res, turns, hp, total = play(
+                chunk.team, seed, chunk.policy, chunk.max_turns, journal
+            )
+        except Exception:
+            import traceback
+
+            stats.errors += 1
+            stats.error = stats.error or f"seed {seed}:\n{traceback.format_exc()}"
+            continue
+
+        if journal is not None:
+            from profiledb import BattleRecord, ability_stats
+
+            records.append(
+                BattleRecord(
+                    chunk.team,
+                    res.name,
+                    turns,
+                    seed,
+                    chunk.policy,
+                    ability_stats(journal),
+                )
+            )
+
+        if res == result.won:
+            stats.wins += 1
+            stats.turns_to_win += turns
+            stats.surviving_hp += hp
+            stats.total_hp += total
+        elif res == result.lost:
+            stats.losses += 1
+        else:
+            stats.draws += 1
+
+    if chunk.profile is not None:
+        from profiledb import Profile
+
+        # one transaction per chunk, the other workers wait their turn
+        profile = Profile(chunk.profile)
+        profile.record(records)
+        profile.close()
+
+    return stats
+
+
+def quiet_worker() -> None:
+    """worker processes have no terminal, mute the prints deep inside the engine"""
+    sys.stdout = open(os.devnull, "w")
+
+
+def simulate(
+    team: Team,
+    n: int,
+    workers: int | None = None,
+    seed: int | None = None,
+    policy: str = "random",
+    max_turns: int | None = 500,
+    chunksize: int | None = None,
+    profile: str | None = None,
+) -> Generator[SimulationStats, None, None]:
+    """
+    simulate `n` battles of `team` across a process pool
+
+    yields the running aggregate every time a chunk of battles finishes,
+    the last yielded value covers all `n` battles
+
+    every battle gets its own rng stream split from `seed`,
+    so the results dont depend on the amount of workers
+
+    profile: a sqlite profile (see profiledb.Profile) to record every battle in,
+    the birds play at its level, it has to exist (`profiledb.py init`)
+    """
+    from rng import BattleRNG
+
+    level = None
+
+    if profile is not None:
+        # sqlite would create an empty one, which main.py would then pick up
+        if not os.path.exists(profile):
+            raise FileNotFoundError(
+                f"No profile at {profile}, create it with python profiledb.py init"
+            )
+
+        from allies import level_of
+        from profiledb import Profile
+
+        with closing(Profile(profile)) as db:
+            if "general" in db:
+                level = level_of(db["general"].content)
+
+    workers = workers or os.cpu_count() or 1
+    master = BattleRNG(seed)
+    seeds = [master.derive(i) for i in range(n)]
+
+    if chunksize is None:
+        # a few chunks per worker to even out long and short battles
+        chunksize = max(1, min(250, n // (workers * 4)))
+
+    chunks = [
+        Chunk(
+            dict(team),
+            seeds[i : i + chunksize],
+            policy,
+            max_turns,
+            profile=profile,
+            level=level,
+        )
+        for i in range(0, n, chunksize)
+    ]
+
+    total = SimulationStats()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=quiet_worker) as pool:
+        futures = [pool.submit(run_chunk, chunk) for chunk in chunks]
+
+        for future in as_completed(futures):
+            total.merge(future.result())
+            yield total.copy()
+
+
+def teams(birds: Iterable[str] | None = None) -> Generator[dict[str, str], None, None]:
+    """
+    every team composition with one class per bird, for balance sweeps
+
+    only classes that are actually implemented in allies.CLASSES_DICT
+    are used, BIRDS_TABLE lists a few which arent there yet
+    """
+    from allies import CLASSES_DICT
+    from value_index import BIRDS_TABLE
+
+    birds = list(BIRDS_TABLE if birds is None else birds)
+
+    choices = [
+        [cls for cls in BIRDS_TABLE[bird] if cls in CLASSES_DICT[bird].classes]
+        for bird in birds
+    ]
+
+    for classes in itertools.product(*choices):
+        yield dict(zip(birds, classes))
+
+
+def parse_team(args: Iterable[str]) -> dict[str, str]:
+    team = {}
+
+    for arg in args:
+        bird, sep, cls = arg.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected bird=class, got '{arg}'")
+        team[bird] = cls
+
+    return team
+
+
+def positive(arg: str) -> int:
+    n = int(arg)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected at least 1, got {n}")
+    return n
+
+
+def report(stats: SimulationStats) -> None:
+    """the first battle which raised, an engine bug, not a loss"""
+    print(
+        f"{stats.errors} of {stats.battles} battles raised, the first one at",
+        stats.error,
+        file=sys.stderr,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    from policies import POLICIES
+
+    parser = argparse.ArgumentParser(
+        description="simulate headless battles to measure team balance"
+    )
+    parser.add_argument(
+        "team",
+        nargs="*",
+        help="bird=class pairs, defaults to data/picked.json",
+    )
+    parser.add_argument("-n", type=positive, default=1000, help="battles per team")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--policy", default="random", choices=POLICIES)
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="a sqlite profile to record every battle in, see profiledb.py",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="simulate every implemented team composition instead",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.profile is not None and not os.path.exists(args.profile):
+        parser.error(
+            f"no profile at {args.profile}, create it with python profiledb.py init"
+        )
+
+    errored = False
+
+    if args.sweep:
+        for team in teams():
+            *_, stats = simulate(
+                team,
+                args.n,
+                args.workers,
+                args.seed,
+                args.policy,
+                args.max_turns,
+                profile=args.profile,
+            )
+            print(" ".join(f"{b}={c}" for b, c in team.items()), stats)
+
+            if stats.errors:
+                report(stats)
+                errored = True
+
+        sys.exit(1 if errored else 0)
+
+    if args.team:
+        team = parse_team(args.team)
+    else:
+        import json
+        from pathlib import Path
+
+        team = json.loads((Path(__file__).parent / "data/picked.json").read_text())
+
+    for stats in simulate(
+        team,
+        args.n,
+        args.workers,
+        args.seed,
+        args.policy,
+        args.max_turns,
+        profile=args.profile,
+    ):
+        print(stats)
+
+    if stats.errors:
+        report(stats)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
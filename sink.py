@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Final
+
+# where the messages of the engine go, see EventSink
+
+DEBUG: Final = 10  # traces for whoever works on the engine
+INFO: Final = 20  # what happens in a battle, what the battle> prompt shows
+
+NOBODY: Final = 1000  # the level of a sink without subscribers
+
+
+class EventSink:
+    """
+    the messages of a battle (Battlefield.log) with their levels,
+    every subscriber gets the ones at or above its level
+
+    a message is a str.format string and its arguments,
+    it only gets formatted once a subscriber wants it,
+    so a sink nobody listens to (headless battles, forks)
+    costs a call and a comparison per message
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: list[tuple[int, Callable[[str], object]]] = []
+        self.level = NOBODY  # the lowest level anybody listens to
+
+    def subscribe(self, callback: Callable[[str], object], level: int = INFO) -> None:
+        self.subscribers.append((level, callback))
+        self.level = min(self.level, level)
+
+    def unsubscribe(self, callback: Callable[[str], object]) -> None:
+        self.subscribers = [
+            (level, subscriber)
+            for level, subscriber in self.subscribers
+            if subscriber is not callback
+        ]
+        self.level = min((level for level, _ in self.subscribers), default=NOBODY)
+
+    def emit(self, level: int, message: str, *args: object) -> None:
+        if level < self.level:
+            return
+
+        text = message.format(*args) if args else message
+
+        for wanted, callback in self.subscribers:
+            if level >= wanted:
+                callback(text)
+
+    def debug(self, message: str, *args: object) -> None:
+        if DEBUG >= self.level:
+            self.emit(DEBUG, message, *args)
+
+    def info(self, message: str, *args: object) -> None:
+        if INFO >= self.level:
+            self.emit(INFO, message, *args)
+
+
+# the debug traces of code which isnt part of a battle yet, like Ability.sbm
+engine = EventSink()
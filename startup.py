@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# startup benchmark, how long main.py takes to get to the main menu> prompt
+# python startup.py
+# python startup.py --budget 150  (exit code 1 above 150ms, for catching regressions)
+
+MAIN = Path(__file__).parent / "main.py"
+PROMPT = b"main menu> "
+
+# the modules which should only get imported once a menu needs them
+LAZY = ("battle", "controls", "help", "allies", "rich")
+
+
+def cold_start(*flags: str) -> tuple[float, bytes]:
+    """
+    start main.py in a new interpreter and wait for the main menu
+
+    -> (seconds until the prompt, what the interpreter wrote to stderr)
+    """
+    start = time.perf_counter()
+
+    process = subprocess.Popen(
+        [sys.executable, *flags, str(MAIN)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert process.stdout is not None
+
+    out = b""
+    while not out.endswith(PROMPT):
+        char = process.stdout.read(1)
+        if not char:
+            raise RuntimeError(f"main.py exited before the prompt: {out!r}")
+        out += char
+
+    elapsed = time.perf_counter() - start
+
+    process.kill()
+    _, err = process.communicate()
+
+    return elapsed, err
+
+
+def import_times() -> list[tuple[int, int, str]]:
+    """
+    what got imported before the main menu, with `python -X importtime`
+
+    -> list[(cumulative us, self us, module)], slowest first
+    """
+    _, err = cold_start("-X", "importtime")
+
+    times = []
+    for line in err.decode().splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        own, cumulative, module = line.removeprefix("import time:").split("|")
+        times.append((int(cumulative), int(own), module.strip()))
+
+    return sorted(times, reverse=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="measure the cold start of the game up to the main menu"
+    )
+    parser.add_argument("-n", type=int, default=5, help="cold starts to time")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to show")
+    parser.add_argument(
+        "--budget", type=float, default=None, help="fail above this many ms"
+    )
+
+    args = parser.parse_args(argv)
+
+    starts = [cold_start()[0] * 1000 for _ in range(args.n)]
+    median = statistics.median(starts)
+
+    print(
+        f"main menu after {median:.1f}ms (median of {args.n},"
+        f" min {min(starts):.1f}ms, max {max(starts):.1f}ms)"
+    )
+
+    times = import_times()
+
+    print(f"\nslowest imports (cumulative, self) of {len(times)}:")
+    for cumulative, own, module in times[: args.top]:
+        print(f"{cumulative / 1000:8.1f}ms {own / 1000:8.1f}ms  {module}")
+
+    failed = False
+
+    eager = sorted({module.split(".")[0] for *_, module in times} & set(LAZY))
+    if eager:
+        print(f"\nimported before the main menu: {', '.join(eager)}")
+        failed = True
+
+    if args.budget is not None and median > args.budget:
+        print(f"\nover the budget of {args.budget:.0f}ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
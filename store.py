@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+# the json files of data/, read when first used and saved in the background, see Store
+
+
+class Document:
+    """
+    a json file of a Store, read on the first use of `content`
+
+    `save` only serializes the content (so the file gets what the
+    content was at the time of the save, later changes wait for the
+    next save), the writing is left to the store's writer thread
+    """
+
+    def __init__(self, path: Path, store: Store) -> None:
+        self.path = path
+        self.store = store
+        self._content: dict | None = None
+        self.saved: str | None = None  # the text of the last save (or read)
+
+    @property
+    def content(self) -> dict:
+        if self._content is None:
+            self.saved = self.path.read_text()
+            self._content = json.loads(self.saved)
+
+        return self._content
+
+    @content.setter
+    def content(self, content: dict) -> None:
+        self._content = content
+
+    def save(self, data: dict | None = None) -> None:
+        if data is not None:
+            self._content = data
+
+        text = json.dumps(self.content, indent=4)
+
+        # unchanged since the last save, its already written or waiting to be
+        if text != self.saved:
+            self.saved = text
+            self.store.schedule(self, text)
+
+
+class Store(Mapping[str, Document]):
+    """
+    the json files of a directory, by name without the suffix (`store["general"]`)
+
+    nothing is read until a document's content is, and saved documents
+    are written by a background thread `delay` seconds after their last save,
+    so saving a few times in a row writes once and the prompt never waits
+    for the disk, a document saved unchanged isnt written at all
+
+    every write goes to a temporary file first, which then replaces
+    the document, so a crash mid write never leaves half a file,
+    whatever is still waiting gets written on exit (see flush)
+    """
+
+    def __init__(self, directory: Path, delay: float = 0.25) -> None:
+        self.directory = directory
+        self.delay = delay
+
+        self.documents = {
+            path.stem: Document(path, self) for path in directory.glob("*.json")
+        }
+
+        self.pending: dict[Document, str] = {}  # the text to write, by document
+        self.lock = threading.Lock()  # for pending
+        self.writing = threading.Lock()  # one flush at a time, the writer's or on exit
+        self.wake = threading.Event()
+        self.writer: threading.Thread | None = None
+
+    def __getitem__(self, name: str) -> Document:
+        return self.documents[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.documents)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def schedule(self, document: Document, text: str) -> None:
+        with self.lock:
+            self.pending[document] = text
+
+            if self.writer is None:
+                self.writer = threading.Thread(
+                    target=self.run, name="store writer", daemon=True
+                )
+                self.writer.start()
+                atexit.register(self.flush)
+
+        self.wake.set()
+
+    def run(self) -> None:
+        while True:
+            self.wake.wait()
+
+            # debounce, saves coming in while waiting reset the timer
+            while self.wake.is_set():
+                self.wake.clear()
+                self.wake.wait(self.delay)
+
+            self.flush()
+
+    def flush(self) -> None:
+        """write every document waiting to be written, now"""
+        with self.writing:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+
+            for document, text in pending.items():
+                try:
+                    write(document.path, text)
+                except OSError as error:
+                    print(
+                        f"Couldnt save {document.path.name}: {error}", file=sys.stderr
+                    )
+
+                    # tried again with the next flush, unless a newer save replaced it
+                    with self.lock:
+                        self.pending.setdefault(document, text)
+
+
+def write(path: Path, text: str) -> None:
+    # the temporary file is in the same directory, os.replace is atomic
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with temporary.open("w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from battle import Ally, Battlefield, dummy_waves, silent
+from effects import LifeDrain, ShockShield, ThornyShield, ThunderStorm
+from journal import Journal
+from rng import BattleRNG
+
+# the batched area attacks against hitting every target in turn
+# python -m pytest test_battle.py
+
+TEAM = {"red": "knight", "chuck": "mage", "matilda": "cleric", "blues": "marksmen"}
+
+
+def battle(seed: int, storm: bool = False) -> Battlefield:
+    """a seeded battle with a mage of 30 hp and enemies of 200 hp, see state"""
+    rng = BattleRNG(seed)
+    allies = [Ally(bird, cls) for bird, cls in TEAM.items()]
+    b = Battlefield(
+        *dummy_waves(rng),
+        allies=allies,
+        echo=silent,
+        chili=100,
+        rng=rng,
+        journal=Journal(),
+    )
+
+    mage = b.allied_units["mage"]
+    mage.TOTAL_HP = mage.hp = 30
+
+    enemies = list(b.enemy_units.values())
+    for enemy in enemies:
+        enemy.TOTAL_HP = enemy.hp = 200
+
+    # after_hit effects which hit the others, hit back or heal, so the order
+    # matters, not a thunderstorm with a shield hitting back, they would
+    # hit each other forever
+    if storm:
+        storm_effect = ThunderStorm("Storm", 2, shared_damage_perc=50)
+        list(enemies[0].add_neg_effects(storm_effect))
+    else:
+        enemies[1].add_pos_effects(ThornyShield("Thorns", 2, percentage=40))
+        enemies[2].add_pos_effects(ShockShield("Shock", 2, damage=15))
+        drain = LifeDrain("Drain", 2, drain=lambda victim, attacker, damage: damage)
+        list(enemies[3].add_neg_effects(drain))
+
+    return b
+
+
+def state(b: Battlefield) -> tuple:
+    """everything a hit can change, the journal keeps the order it happened in"""
+    assert b.journal is not None
+
+    return (
+        tuple(b.journal),
+        b.result,
+        b.chili,
+        b.rng.draws,
+        tuple(
+            (
+                name,
+                unit.hp,
+                tuple(
+                    (effect.name, effect.is_pos, b.expiry.remaining(unit, effect))
+                    for effect in unit.effects.values()
+                ),
+            )
+            for name, unit in b.units.items()
+        ),
+    )
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("damage", [3, 40, 500])
+@pytest.mark.parametrize("storm", [False, True])
+def test_deal_damage_many_is_sequential(seed: int, damage: int, storm: bool) -> None:
+    batched = battle(seed, storm)
+    sequential = battle(seed, storm)
+
+    source = batched.allied_units["mage"]
+    batched.deal_damage_many(
+        ((enemy, damage, ()) for enemy in batched.enemy_units.values()), source
+    )
+
+    source = sequential.allied_units["mage"]
+    for enemy in list(sequential.enemy_units.values()):
+        enemy.deal_damage(damage, source)
+
+    assert state(batched) == state(sequential)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_heal_many_is_sequential(seed: int) -> None:
+    batched = battle(seed)
+    sequential = battle(seed)
+
+    for b in (batched, sequential):
+        for ally in b.allied_units.values():
+            ally.hp -= 20
+
+    batched.heal_many((ally, 30) for ally in batched.allied_units.values())
+    for ally in list(sequential.allied_units.values()):
+        ally.heal(30)
+
+    assert state(batched) == state(sequential)
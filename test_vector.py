@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+# the vector engine against the object engine, see vector.cross_validate
+# python -m pytest test_vector.py
+
+np = pytest.importorskip("numpy")
+
+from vector import EffectSpec, UnitSpec, cross_validate, dummy_wave_arrays  # noqa: E402
+
+SEEDS = list(range(8))
+
+TEAMS = {
+    "plain": [UnitSpec(900, 60), UnitSpec(800, 80), UnitSpec(700, 100)],
+    "effects": [
+        UnitSpec(
+            1200,
+            70,
+            hit=(EffectSpec("weaken", 2, 40), EffectSpec("damage_debuff", 2, 30)),
+            buff=(EffectSpec("shield", 1, 35), EffectSpec("healing", 2, 40)),
+        ),
+        UnitSpec(
+            800,
+            90,
+            hit=(EffectSpec("gooey", 0, 10), EffectSpec("toxic", 2, 25)),
+            buff=(EffectSpec("damage_buff", 3, 20),),
+        ),
+        UnitSpec(700, 110, hit=(EffectSpec("knock", 1), EffectSpec("freeze", 2))),
+    ],
+}
+
+ENEMY = {
+    "enemy_hit": (EffectSpec("weaken", 1, 60), EffectSpec("toxic", 2, 20)),
+    "enemy_buff": (EffectSpec("healing", 2, 15), EffectSpec("shield", 1, 30)),
+}
+
+
+def test_dummy_wave_arrays() -> None:
+    from battle import dummy_waves
+    from rng import BattleRNG
+
+    seeds = [0, 1, -5, 2**40 + 7]
+    hp, damage = dummy_wave_arrays(seeds)
+
+    for i, seed in enumerate(seeds):
+        waves = list(dummy_waves(BattleRNG(seed)))
+
+        assert hp[i].tolist() == [[enemy.hp for enemy in wave] for wave in waves]
+        assert damage[i].tolist() == [
+            [enemy.damage for enemy in wave] for wave in waves
+        ]
+
+
+@pytest.mark.parametrize("team", TEAMS)
+@pytest.mark.parametrize("enemy", [False, True])
+@pytest.mark.parametrize("max_turns", [5, 30])
+def test_cross_validate(team: str, enemy: bool, max_turns: int) -> None:
+    kwargs = ENEMY if enemy else {}
+    assert cross_validate(TEAMS[team], SEEDS, max_turns, **kwargs) == []
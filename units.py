@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+from collections.abc import Callable, ItemsView, Iterator, KeysView, Mapping, ValuesView
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Final
+
+# the living units of a battle, see UnitRegistry
+
+if TYPE_CHECKING:
+    from battle import Ally
+    from enemies import Enemy
+    from view import View
+
+
+def unit_key(unit: View) -> str:
+    """the name a unit is looked up by, allies go by their class name"""
+    return unit.clsname if unit.is_ally else unit.name  # type: ignore
+
+
+# how the health indexes order units, the lowest key comes first,
+# the unit id breaks ties like min() and max() over the registry would
+# (the registry is in the order units got added, ids only go up)
+
+HP: Final = "hp"
+MOST_HP: Final = "most_hp"
+HP_PERCENT: Final = "hp_percent"
+
+ORDERS: dict[str, Callable[[View], float]] = {
+    HP: lambda unit: unit.hp,
+    MOST_HP: lambda unit: -unit.hp,
+    HP_PERCENT: lambda unit: unit.hp / (unit.TOTAL_HP / 100),
+}
+
+
+class HealthIndex:
+    """
+    the units of one side ordered by `order` (one of ORDERS)
+
+    a heap of (key, id, seq, unit), every health change pushes
+    a new entry and the outdated ones are skipped once they come up,
+    so updates and the lowest query are O(log n),
+    the heap gets rebuilt once it is mostly outdated entries
+    """
+
+    def __init__(self, order: str, units: Mapping[str, View]) -> None:
+        self.key = ORDERS[order]
+        self.units = units  # the side, to tell if a unit is still there
+        self.heap: list[tuple[float, int, int, View]] = []
+        self.seq = itertools.count()
+
+    def push(self, unit: View) -> None:
+        heapq.heappush(self.heap, (self.key(unit), unit.id, next(self.seq), unit))
+
+        if len(self.heap) > 4 * len(self.units) + 16:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        self.heap = [
+            (self.key(unit), unit.id, next(self.seq), unit)
+            for unit in self.units.values()
+        ]
+        heapq.heapify(self.heap)
+
+    def first(self) -> View:
+        heap = self.heap
+
+        while heap:
+            key, id, _, unit = heap[0]
+
+            if self.units.get(unit_key(unit)) is not unit:  # dead or replaced
+                heapq.heappop(heap)
+                continue
+
+            current = self.key(unit)
+            if key == current:
+                return unit
+
+            # outdated, the unit has a newer entry if its health went through
+            # View.hp, put this one back in place in case it didnt
+            heapq.heapreplace(heap, (current, id, next(self.seq), unit))
+
+        raise ValueError("No units on this side")
+
+
+class UnitRegistry(Mapping[str, "View"]):
+    """
+    every living unit of a battle, a mapping of unit_key() to unit
+
+    kept up to date as units get added, die or get swapped in by the next wave,
+    instead of merging the allied and enemy dictionaries on every access
+
+    lookups by name, by id and by side are all dictionary lookups,
+    `allies` and `enemies` are read only views of each side,
+    keys(), values() and items() are views as well, nothing gets copied
+
+    dont add or remove units while iterating over any of the views
+
+    each side also keeps health indexes (see HealthIndex) for targeting,
+    lowest(), highest() and lowest_percent(), View.hp keeps them up to date
+
+    and the keys are kept sorted too, for finding units by the start
+    of their name (what the battle> prompt accepts), see prefixed
+    """
+
+    def __init__(self) -> None:
+        self._units: dict[str, View] = {}
+        self._by_id: dict[int, View] = {}
+        self._allies: dict[str, Ally] = {}
+        self._enemies: dict[str, Enemy] = {}
+        self._names: list[str] = []  # the keys, sorted
+
+        self.allies: Mapping[str, Ally] = MappingProxyType(self._allies)
+        self.enemies: Mapping[str, Enemy] = MappingProxyType(self._enemies)
+
+        # dict[is_ally, dict[order, index]], an index gets built by its first query
+        self._health: dict[bool, dict[str, HealthIndex]] = {True: {}, False: {}}
+
+    def add(self, unit: View) -> None:
+        """add `unit`, it has to have its id already"""
+        key = unit_key(unit)
+
+        old = self._units.get(key)
+        if old is not None:  # same name, the new unit replaces it
+            self.remove(old)
+
+        self._units[key] = unit
+        bisect.insort(self._names, key)
+        self._by_id[unit.id] = unit
+
+        if unit.is_ally:
+            self._allies[key] = unit  # type: ignore
+        else:
+            self._enemies[key] = unit  # type: ignore
+
+        self.hp_changed(unit)
+
+    def remove(self, unit: View) -> None:
+        key = unit_key(unit)
+
+        del self._units[key]
+        del self._by_id[unit.id]
+        del self._names[bisect.bisect_left(self._names, key)]
+
+        if unit.is_ally:
+            del self._allies[key]
+        else:
+            del self._enemies[key]
+
+    def prefixed(self, prefix: str, limit: int | None = None) -> list[str]:
+        """
+        the keys starting with `prefix` in sorted order, at most `limit` of them,
+        a binary search to the first one instead of looking at every key
+
+        prefixed(name, 2) tells a unique match from an ambiguous one
+        """
+        names = self._names
+        start = bisect.bisect_left(names, prefix)
+        stop = len(names) if limit is None else min(len(names), start + limit)
+
+        found = []
+        for i in range(start, stop):
+            if not names[i].startswith(prefix):
+                break
+            found.append(names[i])
+
+        return found
+
+    def by_id(self, id: int) -> View:
+        return self._by_id[id]
+
+    def has(self, unit: View) -> bool:
+        """if `unit` itself (not just one by its name) is in the battle"""
+        return self._by_id.get(unit.id) is unit
+
+    def side(self, is_ally: bool) -> Mapping[str, View]:
+        return self.allies if is_ally else self.enemies
+
+    def hp_changed(self, unit: View) -> None:
+        """reorder `unit` in the health indexes, called by View.hp"""
+        if self._by_id.get(unit.id) is not unit:
+            return
+
+        for index in self._health[unit.is_ally].values():
+            index.push(unit)
+
+    def health(self, is_ally: bool, order: str) -> HealthIndex:
+        index = self._health[is_ally].get(order)
+
+        if index is None:
+            index = self._health[is_ally][order] = HealthIndex(
+                order, self._allies if is_ally else self._enemies
+            )
+            index.rebuild()
+
+        return index
+
+    def lowest(self, is_ally: bool) -> View:
+        """
+        the unit of a side with the lowest hp, the first one on ties,
+        the same as min(side.values(), key=lambda unit: unit.hp)
+        """
+        return self.health(is_ally, HP).first()
+
+    def highest(self, is_ally: bool) -> View:
+        """the unit of a side with the highest hp, the first one on ties"""
+        return self.health(is_ally, MOST_HP).first()
+
+    def lowest_percent(self, is_ally: bool) -> View:
+        """the unit of a side with the lowest hp percentage, the first one on ties"""
+        return self.health(is_ally, HP_PERCENT).first()
+
+    def __getitem__(self, key: str) -> View:
+        return self._units[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._units
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._units)
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    # the dictionary's own views are faster than the Mapping mixins
+
+    def keys(self) -> KeysView[str]:
+        return self._units.keys()
+
+    def values(self) -> ValuesView[View]:
+        return self._units.values()
+
+    def items(self) -> ItemsView[str, View]:
+        return self._units.items()
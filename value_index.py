@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import marshal
+import os
+import sys
 from enum import Enum, auto
+from pathlib import Path
+from typing import Any, Final
 
-# fmt: off
 
 class ABLTFLAGS(Enum):
     HEALING = auto()
@@ -23,241 +29,155 @@ class Target(Enum):
     others = auto()
 
 
-BIRDS_TABLE: dict[str, list[str]] = {
-    "red": ["knight", "guardian", "samurai", "avenger", "paladin", "stone-guard"],
-    "chuck": [
-        "mage",
-        "lightning-bird",
-        "rainbird",
-        "wizard",
-        "thunderbird",
-        "illusionist",
-    ],
-    "matilda": ["cleric", "druid", "princess", "priestess", "bard", "witch"],
-    "bomb": ["pirate", "cannoneer", "berserker", "capt'n", "sea dog", "frost savage"],
-    "blues": ["trickers", "rogues", "marksmen", "skulkers", "treasure-hunters"],
-}
-
-VALUE_INDEX = {
-    "red": {
-        "knight": {
-            "attack": {
-                "damage": 115
-            },
-            "passive": {}
-        },
-        "guardian": {
-            "attack": {
-                "damage": 110
-            },
-            "passive": {}
-        },
-        "samurai": {
-            "attack": {
-                "damage": 50,
-                "slice": 3
-            }
-        },
-        "avenger": {
-            "attack": {
-                "damage": 90
-            },
-            "passive": {}
-        },
-        "paladin": {
-            "attack": {
-                "damage": 135,
-                "heal": 30
-            },
-            "passive": {}
-        },
-        "stone guard": {
-            "attack": {
-                "damage": 65,
-                "slice": 2
-            }
-        },
-        "chili": {
-            "damage": 500,
-            "arena": 350
-        }
-    },
-    "chuck": {
-        "mage": {
-            "attack": {
-                "damage": 55
-            },
-            "passive": {
-                "damage": 75
-            }
-        },
-        "lightning-bird": {
-            "attack": {
-                "damage": 45,
-                "dispell_chance": 65
-            },
-            "passive": {}
-        },
-        "rainbird": {
-            "attack": {
-                "damage": 20,
-                "poison": 35
-            },
-            "passive": {
-                "heal": 20
-            }
-        },
-        "wizard": {
-            "attack": {
-                "damage": 100,
-                "damage1": 67,
-                "damage2": 45,
-                "damage3": 30
-            },
-            "passive": {
-                "chili_boost": 5,
-                "stun_chance": 20
-            }
-        },
-        "thunderbird": {
-            "attack": {
-                "damage": 50,
-                "effectiveness": 25
-            },
-            "passive": {
-                "damage": 45
-            }
-        },
-        "illusionist": {
-            "attack": {
-                "damage": 100,
-                "shared_damage": 35
-            },
-            "passive": {
-                "super_atk_damage": 50
-            }
-        },
-        "chili": {
-            "supers": 5,
-            "arena": 3
-        }
-    },
-    "matilda": {
-        "cleric": {
-            "attack": {
-                "damage": 110,
-                "heal": 25
-            },
-            "passive": {
-                "heal": 15
-            }
-        },
-        "druid": {
-            "attack": {
-                "damage": 35,
-                "poison": 100
-            },
-            "passive": {
-                "heal": 22,
-                "others": 10
-            }
-        },
-        "princess": {
-            "attack": {
-                "damage": 125
-            },
-            "passive": {
-                "heal": 30
-            }
-        },
-        "bard": {
-            "attack": {
-                "damage": 160,
-                "stun_chance": 15
-            },
-            "passive": {
-                "main_heal": 10,
-                "side_heal": 5
-            }
-        },
-        "witch": {
-            "attack": {
-                "damage": 160
-            },
-            "passive": {
-                "attack": 20,
-                "health": 20
-            }
-        },
-        "chili": {
-            "heal": 35
-        }
-    },
-    "bomb": {
-        "chili": {
-            "damage": 150
-        },
-        "pirate": {
-            "attack": {
-                "damage": 100
-            },
-            "passive": {
-                "buff": 25
-            }
-        },
-        "cannoneer": {
-            "attack": {
-                "damage": 30,
-                "slice": 3,
-                "debuff": 20
-            },
-            "passive": {
-                "eff": 80
-            }
-        },
-        "capt'n": {
-            "attack": {
-                "damage": 90
-            },
-            "passive": {
-                "deplete": 10,
-                "buff": 60
-            }
-        },
-        "berserker": {
-            "attack": {
-                "damage": 105
-            },
-            "passive": {}
-        },
-        "sea-dog": {
-            "attack": {
-                "damage": 125
-            },
-            "passive": {}
-        },
-        "frost-savage": {
-            "attack": {
-                "damage": 90,
-                "bonus": 150
-            },
-            "passive": {
-                "chance": 25,
-                "turns": 1
-            }
-        }
-    },
-    "blues": {
-        "chili": {
-            "damage": 200
-        },
-        "marksmen": {
-            "attack": {
-                "damage": 50,
-                "slice": 2,
-                "weaken": 35
-            },
-            "passive": {}
-        }
-    }
-}
+# the classes of every bird and the stats of their abilities are in data/stats.json:
+#
+# {
+#     "birds": {"<bird>": ["<classname>", ...]},
+#     "abilities": {
+#         "<bird>": {
+#             "<classname>": {"attack": {"<stat>": int}, "passive": {"<stat>": int}},
+#             "chili": {"<stat>": int}
+#         }
+#     }
+# }
+#
+# checked once with validate, then cached compiled (marshal) in __pycache__,
+# the next launches only check the file's mtime (or its hash if it was touched)
+# and SCHEMA_VERSION
+
+STATS_FILE = Path(__file__).parent / "data" / "stats.json"
+CACHE_FILE = (
+    Path(__file__).parent
+    / "__pycache__"
+    / f"stats.{sys.implementation.cache_tag}.marshal"
+)
+
+# part of the cache, a cache of another version gets validated again,
+# bump it with every change to the layout above or to validate
+SCHEMA_VERSION: Final = 2
+
+TYPS = ("attack", "passive")
+
+
+def validate(data: Any) -> tuple[dict[str, list[str]], dict[str, dict]]:
+    """
+    check the contents of data/stats.json against the schema above
+
+    -> (BIRDS_TABLE, VALUE_INDEX), raises ValueError with where the file is wrong
+    """
+
+    def check(ok: bool, where: str, expected: str) -> None:
+        if not ok:
+            raise ValueError(f"{STATS_FILE.name}: {where} should be {expected}")
+
+    def check_stats(stats: Any, where: str) -> None:
+        check(isinstance(stats, dict), where, "an object of stats")
+
+        for stat, value in stats.items():
+            # stats become attributes of abilities, see allies.STATS
+            check(
+                stat.isidentifier() and not stat.startswith("_"),
+                f"{where}.{stat}",
+                "named like an attribute",
+            )
+            check(
+                isinstance(value, int) and not isinstance(value, bool),
+                f"{where}.{stat}",
+                "an int",
+            )
+
+    check(isinstance(data, dict), "the file", "an object")
+    check(
+        set(data) == {"birds", "abilities"}, "the file", 'only "birds" and "abilities"'
+    )
+
+    birds, abilities = data["birds"], data["abilities"]
+
+    check(isinstance(birds, dict), "birds", "an object")
+    for bird, classnames in birds.items():
+        check(
+            isinstance(classnames, list)
+            and all(isinstance(name, str) for name in classnames),
+            f"birds.{bird}",
+            "a list of classnames",
+        )
+
+    check(isinstance(abilities, dict), "abilities", "an object")
+    for bird, classes in abilities.items():
+        check(bird in birds, f"abilities.{bird}", "a bird in birds")
+        check(isinstance(classes, dict), f"abilities.{bird}", "an object")
+        # every bird has a chili (allies.STATS[bird, None, "chili"])
+        check("chili" in classes, f"abilities.{bird}", 'an object with a "chili"')
+
+        for classname, typs in classes.items():
+            where = f"abilities.{bird}.{classname}"
+
+            if classname == "chili":
+                check_stats(typs, where)
+                continue
+
+            check(isinstance(typs, dict), where, "an object")
+            for typ, stats in typs.items():
+                check(typ in TYPS, f"{where}.{typ}", f"one of {', '.join(TYPS)}")
+                check_stats(stats, f"{where}.{typ}")
+
+    for bird in birds:
+        check(bird in abilities, f"abilities.{bird}", "there, with its chili")
+
+    return birds, abilities
+
+
+def load(
+    path: Path = STATS_FILE, cache: Path = CACHE_FILE
+) -> tuple[dict[str, list[str]], dict[str, dict]]:
+    """
+    -> (BIRDS_TABLE, VALUE_INDEX) of `path`, from `cache` if it is
+    still up to date, otherwise validated again and cached
+    """
+    mtime = path.stat().st_mtime_ns
+    content = None
+
+    try:
+        version, cached_mtime, digest, birds, abilities = marshal.loads(
+            cache.read_bytes()
+        )
+
+        if version != SCHEMA_VERSION:
+            raise ValueError("a cache of another version")
+
+        if cached_mtime == mtime:
+            return birds, abilities
+
+        # touched (checkouts, copies) but maybe not changed
+        content = path.read_bytes()
+        if digest == hashlib.sha256(content).hexdigest():
+            save(cache, SCHEMA_VERSION, mtime, digest, birds, abilities)
+            return birds, abilities
+
+    except (OSError, EOFError, ValueError, TypeError):
+        pass  # no cache yet, or a broken one
+
+    if content is None:
+        content = path.read_bytes()
+
+    birds, abilities = validate(json.loads(content))
+    digest = hashlib.sha256(content).hexdigest()
+    save(cache, SCHEMA_VERSION, mtime, digest, birds, abilities)
+
+    return birds, abilities
+
+
+def save(cache: Path, *entry: object) -> None:
+    # written to a temporary file first, so a process reading
+    # the cache at the same time never sees half of it
+    temporary = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+
+    try:
+        cache.parent.mkdir(exist_ok=True)
+        temporary.write_bytes(marshal.dumps(entry))
+        os.replace(temporary, cache)
+    except OSError:
+        pass  # a read only install, the stats just get validated every launch
+
+
+BIRDS_TABLE, VALUE_INDEX = load()
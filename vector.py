@@ -0,0 +1,754 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from waves import DUMMY_ENEMIES, DUMMY_FIRST, DUMMY_LEVELS, DUMMY_SPREAD
+
+if TYPE_CHECKING:
+    from battle import Battlefield
+
+# a struct of arrays battle engine, many battles played in lockstep, see VectorBattles
+#
+# this is a model of a subset of the game for balance sweeps,
+# units are plain specs (see UnitSpec) instead of bird classes,
+# every ally attacks the first enemy like policies.AttackFirstPolicy,
+# and only the effects in KINDS exist, within that subset
+# the numbers are exactly the ones of the object engine, see cross_validate
+
+KINDS = (
+    "shield",
+    "weaken",
+    "damage_buff",
+    "damage_debuff",
+    "toxic",
+    "thorny",
+    "gooey",
+    "healing",
+    "knock",
+    "freeze",
+)
+
+(
+    SHIELD,
+    WEAKEN,
+    DAMAGE_BUFF,
+    DAMAGE_DEBUFF,
+    TOXIC,
+    THORNY,
+    GOOEY,
+    HEALING,
+    KNOCK,
+    FREEZE,
+) = range(len(KINDS))
+
+POSITIVE = frozenset({SHIELD, DAMAGE_BUFF, HEALING})
+
+# the effects with an end of turn event, in this order, poisons first
+END_OF_TURN = np.array([TOXIC, THORNY, GOOEY, HEALING])
+
+# sorts after every sequence number
+NEVER = np.int64(np.iinfo(np.int64).max)
+
+# the outcomes of a battle, see battle.result
+NO_RESULT, LOST, WON = 0, 1, 2
+
+
+class EffectSpec(NamedTuple):
+    """
+    an effect to apply, `kind` is one of KINDS
+
+    strength: the effectiveness of shield, weaken and the damage buffs,
+    the damage of the poisons and the healing of healing,
+    unused by knock and freeze
+
+    damage_buff and damage_debuff are kept and expire like every other effect
+    but dont change any damage, the object engine never dispatches on_attack
+    """
+
+    kind: str
+    turns: int
+    strength: int = 0
+
+
+@dataclass(frozen=True)
+class UnitSpec:
+    """
+    a unit of a vectorized battle
+
+    hit: negative effects put on whoever this unit attacks
+    buff: positive effects this unit puts on itself after each attack
+    """
+
+    hp: int
+    damage: int
+    hit: tuple[EffectSpec, ...] = ()
+    buff: tuple[EffectSpec, ...] = ()
+
+
+def compile_effects(specs: Sequence[EffectSpec]) -> list[tuple[int, int, int]]:
+    """-> list[(kind index, turns, strength)]"""
+    compiled = []
+
+    for spec in specs:
+        if spec.kind not in KINDS:
+            raise ValueError(
+                f"Unsupported effect '{spec.kind}', expected one of {KINDS}"
+            )
+
+        compiled.append((KINDS.index(spec.kind), spec.turns, spec.strength))
+
+    return compiled
+
+
+class VectorBattles:
+    """
+    K independent battles stored as arrays and stepped in lockstep
+
+    every unit has a slot, the allies come first, then the enemies
+    of the current wave, per battle and slot there is
+    `hp`, `total_hp` and `damage`, and per effect kind the effect's
+    remaining `turns`, `strength` and `seq`, the order it got applied in
+
+    the object engine dispatches an event to the effects of its units
+    in slot order (the order of their ids), a unit's positive effects
+    before its negative ones, then in the order they got applied in,
+    see effects.HookRegistry
+
+    the effect arrays are indexed [kind, battle, slot],
+    so every kind is one contiguous (K, S) array
+
+    waves_hp, waves_damage: arrays of shape (K, waves, enemies per wave)
+    enemy_hit, enemy_buff: the effects of every enemy, see UnitSpec
+
+    all the loops are over slots, effects or actions, never over battles
+    """
+
+    def __init__(
+        self,
+        allies: Sequence[UnitSpec],
+        waves_hp: np.ndarray,
+        waves_damage: np.ndarray,
+        enemy_hit: Sequence[EffectSpec] = (),
+        enemy_buff: Sequence[EffectSpec] = (),
+        chili: int = 0,
+    ) -> None:
+        if waves_hp.shape != waves_damage.shape or waves_hp.ndim != 3:
+            raise ValueError("waves_hp and waves_damage need the same (K, W, E) shape")
+
+        K, W, E = waves_hp.shape
+        A = len(allies)
+        S = A + E
+        N = len(KINDS)
+
+        self.K, self.W, self.A, self.E, self.S = K, W, A, E, S
+
+        self.waves_hp = waves_hp.astype(np.int32)
+        self.waves_damage = waves_damage.astype(np.int32)
+
+        self.ally_hit = [compile_effects(ally.hit) for ally in allies]
+        self.ally_buff = [compile_effects(ally.buff) for ally in allies]
+        self.enemy_hit = compile_effects(enemy_hit)
+        self.enemy_buff = compile_effects(enemy_buff)
+
+        # the kinds which can show up at all, the others never get looked at
+        used = {
+            kind
+            for effects in (
+                *self.ally_hit,
+                *self.ally_buff,
+                self.enemy_hit,
+                self.enemy_buff,
+            )
+            for kind, _, _ in effects
+        }
+        self.kinds = sorted(used)
+        self.end_of_turn_kinds = END_OF_TURN[np.isin(END_OF_TURN, self.kinds)]
+        self.on_hit = WEAKEN in used or SHIELD in used
+        self.knocks = [kind for kind in (KNOCK, FREEZE) if kind in used]
+
+        self.hp = np.zeros((K, S), np.int32)
+        self.total_hp = np.zeros((K, S), np.int32)
+        self.damage = np.zeros((K, S), np.int32)
+        self.present = np.zeros((K, S), bool)
+        # which unit is in a slot, a new one for every spawned enemy
+        self.occupant = np.zeros((K, S), np.int64)
+
+        self.active = np.zeros((N, K, S), bool)
+        self.turns = np.zeros((N, K, S), np.int32)
+        self.strength = np.zeros((N, K, S), np.int32)
+        self.seq = np.zeros((N, K, S), np.int64)
+        self.applied = np.zeros(K, np.int64)  # the next seq
+
+        self.chili = np.full(K, chili, np.int32)
+        self.turn = np.zeros(K, np.int32)
+        self.wave = np.zeros(K, np.intp)  # index into the waves, wave_int - 1
+        self.result = np.full(K, NO_RESULT, np.int8)
+        self.played = np.zeros((K, A), bool)
+
+        hp = np.array([ally.hp for ally in allies], np.int32)
+        self.hp[:, :A] = hp
+        self.total_hp[:, :A] = hp
+        self.damage[:, :A] = [ally.damage for ally in allies]
+        self.present[:, :A] = True
+        self.occupant[:, :A] = np.arange(A)
+        self.spawned = A
+
+        self.spawn(np.arange(K))
+
+        # dict[phase, (N, 1, S) mask of the effects ticking down at it],
+        # the positive effects of allies and the negative effects of enemies
+        # tick at the start of the allies' turn, see expiry.phase_of
+        positive = np.isin(np.arange(N), list(POSITIVE))[:, None, None]
+        is_ally = (np.arange(S) < A)[None, None, :]
+        self.ticking = {True: is_ally == positive, False: is_ally != positive}
+
+        # dict[phase, (len(end_of_turn_kinds), S) mask of the end of turn effects
+        # which do something], poisons hurt enemies at the start of the allies'
+        # turn and allies at the start of the enemies' turn, healing the other way
+        poison = (self.end_of_turn_kinds != HEALING)[:, None]
+        is_ally = is_ally[0]
+        self.firing = {True: poison != is_ally, False: poison == is_ally}
+
+    @classmethod
+    def from_seeds(
+        cls,
+        allies: Sequence[UnitSpec],
+        seeds: Sequence[int],
+        enemy_hit: Sequence[EffectSpec] = (),
+        enemy_buff: Sequence[EffectSpec] = (),
+        chili: int = 0,
+    ) -> VectorBattles:
+        """one battle against battle.dummy_waves(BattleRNG(seed)) per seed"""
+        waves_hp, waves_damage = dummy_wave_arrays(seeds)
+        return cls(allies, waves_hp, waves_damage, enemy_hit, enemy_buff, chili)
+
+    # units
+
+    def spawn(self, b: np.ndarray) -> None:
+        """fill the enemy slots of the battles `b` with their current wave"""
+        A = self.A
+        wave = self.wave[b]
+
+        hp = self.waves_hp[b, wave]
+        self.hp[b, A:] = hp
+        self.total_hp[b, A:] = hp
+        self.damage[b, A:] = self.waves_damage[b, wave]
+        self.present[b, A:] = hp > 0
+        self.active[:, b, A:] = False
+
+        self.occupant[b, A:] = self.spawned + np.arange(self.E)
+        self.spawned += self.E
+
+    def death_check(self, b: np.ndarray) -> None:
+        """Battlefield.death_check for the battles `b`"""
+        A = self.A
+
+        dead = self.present[b] & (self.hp[b] <= 0)
+        rows, slots = np.nonzero(dead)
+        self.present[b[rows], slots] = False
+        self.active[:, b[rows], slots] = False
+
+        self.result[b[~self.present[b, :A].any(1)]] = LOST
+
+        cleared = ~self.present[b, A:].any(1)
+        more = self.wave[b] + 1 < self.W
+
+        self.next_wave(b[cleared & more])
+        self.result[b[cleared & ~more]] = WON
+
+    def next_wave(self, b: np.ndarray) -> None:
+        if not len(b):
+            return
+
+        self.wave[b] += 1
+        self.spawn(b)
+        self.played[b] = False
+
+    # effects
+
+    def apply(self, b: np.ndarray, slot: np.ndarray, effects) -> None:
+        """put `effects` (compiled, see compile_effects) on `slot` of the battles `b`"""
+        if not effects or not len(b):
+            return
+
+        applied = self.applied[b]
+
+        for kind, turns, strength in effects:
+            self.active[kind, b, slot] = True
+            self.turns[kind, b, slot] = turns
+            self.strength[kind, b, slot] = strength
+            self.seq[kind, b, slot] = applied
+            applied += 1
+
+        self.applied[b] = applied
+
+    def tick(self, b: np.ndarray, allies: bool) -> None:
+        """ExpiryWheel.tick, effects with 0 or less turns never expire"""
+        rows = np.zeros(self.K, bool)
+        rows[b] = True
+
+        for kind in self.kinds:
+            active, turns = self.active[kind], self.turns[kind]
+
+            ticking = active & self.ticking[allies][kind] & rows[:, None] & (turns > 0)
+
+            turns -= ticking
+            active &= ~(ticking & (turns == 0))
+
+    def registered(self, b: np.ndarray, kind: int) -> np.ndarray:
+        """(len(b), S) mask of the effects of `kind` in the battle's hooks"""
+        return self.active[kind, b] & self.present[b]
+
+    # damage
+
+    def deal_damage(
+        self, b: np.ndarray, victim: np.ndarray, damage: np.ndarray, effects=()
+    ) -> None:
+        """
+        View.deal_damage of `damage` to `victim` in each of the battles `b`
+
+        the on_hit effects are the weakens of every unit (Weaken doesnt check
+        its wearer) and the shield of the victim, in the order of their slots,
+        the victim's shield before its weaken, like the hooks of the object engine
+        """
+        damage = damage.astype(np.int64)
+
+        if self.on_hit:
+            damage = self.on_hit_chain(b, victim, damage)
+
+        self.chili[b] = np.minimum(self.chili[b] + 5, 100)
+        self.hp[b, victim] = np.minimum(
+            self.hp[b, victim] - damage, self.total_hp[b, victim]
+        )
+
+        self.apply(b, victim, effects)
+
+    def on_hit_chain(
+        self, b: np.ndarray, victim: np.ndarray, damage: np.ndarray
+    ) -> np.ndarray:
+        n = len(b)
+        rows = np.arange(n)
+        S = self.S
+
+        weakens = self.registered(b, WEAKEN)
+        shield = self.active[SHIELD, b, victim] & self.present[b, victim]
+
+        # (n, S + 1), the last column is the victim's shield,
+        # a unit has one of each, so the slot and pos before neg are the order
+        order = np.empty((n, S + 1), np.int64)
+        order[:, :S] = np.where(weakens, 2 * np.arange(S) + 1, NEVER)
+        order[:, S] = np.where(shield, 2 * victim, NEVER)
+
+        strength = np.empty((n, S + 1), np.int64)
+        strength[:, :S] = self.strength[WEAKEN, b]
+        strength[:, S] = self.strength[SHIELD, b, victim]
+
+        hooks = weakens.sum(1) + shield
+        ranked = np.argsort(order, axis=1, kind="stable")
+
+        for rank in range(int(hooks.max(initial=0))):
+            use = rank < hooks
+            column = ranked[:, rank]
+            eff = strength[rows, column]
+
+            shielded = percent(damage, 100 - eff)
+            weakened = percent(damage, 200 - eff)
+
+            damage = np.where(use, np.where(column == S, shielded, weakened), damage)
+
+        return damage
+
+    def heal(self, b: np.ndarray, target: np.ndarray, heal: np.ndarray) -> None:
+        self.hp[b, target] = np.minimum(
+            self.hp[b, target] + heal, self.total_hp[b, target]
+        )
+
+    # turns
+
+    def end_of_turn(self, b: np.ndarray, allies: bool) -> None:
+        """
+        the end of turn hooks at the start of the allies' or enemies' turn,
+        the healings and poisons in the order of the hooks (see VectorBattles),
+        a death check after every one, like Battlefield.allies_turn
+
+        the effects are the ones registered when the loop starts,
+        effects of units which die during the loop still run,
+        a poison whose wearer is gone only adds its chili
+        """
+        S = self.S
+        n = len(b)
+        kinds = self.end_of_turn_kinds
+
+        if not len(kinds):
+            return
+
+        # (n, kinds * S), indexed by kind * S + slot, the object engine also
+        # runs a death check after the effects which dont do anything,
+        # those have nothing to check so they get left out
+        registered = (
+            self.active[kinds][:, b] & self.present[b] & self.firing[allies][:, None, :]
+        )
+        registered = registered.transpose(1, 0, 2).reshape(n, -1)
+
+        # (slot, pos before neg, seq) as one key, seq stays below `applied`
+        slots = np.arange(S)[None, :]
+        negative = (kinds != HEALING)[:, None].astype(np.int64)
+        group = (2 * slots + negative).reshape(1, -1)
+        seq = self.seq[kinds][:, b].transpose(1, 0, 2).reshape(n, -1)
+        limit = int(self.applied[b].max(initial=0)) + 1
+
+        keys = np.where(registered, group * limit + seq, NEVER)
+        ranked = np.argsort(keys, axis=1, kind="stable")
+        hooks = registered.sum(1)
+
+        strength = self.strength[kinds][:, b].transpose(1, 0, 2).reshape(n, -1)
+        occupant = self.occupant[b]
+
+        for rank in range(int(hooks.max(initial=0))):
+            live = (rank < hooks) & (self.result[b] == NO_RESULT)
+            rows = np.nonzero(live)[0]
+
+            if not len(rows):
+                break
+
+            battles = b[rows]
+            entry = ranked[rows, rank]
+            slot = entry % S
+            poison = kinds[entry // S] != HEALING
+            amount = strength[rows, entry]
+
+            there = self.present[battles, slot] & (
+                self.occupant[battles, slot] == occupant[rows, slot]
+            )
+
+            hit = poison & there
+            self.deal_damage(battles[hit], slot[hit], amount[hit])
+
+            ghost = poison & ~there
+            self.chili[battles[ghost]] = np.minimum(self.chili[battles[ghost]] + 5, 100)
+
+            healed = ~poison & there
+            self.heal(battles[healed], slot[healed], amount[healed])
+
+            self.death_check(battles)
+
+    def allies_turn(self, b: np.ndarray) -> None:
+        self.played[b] = False
+        self.turn[b] += 1
+        self.tick(b, allies=True)
+        self.end_of_turn(b, allies=True)
+
+    def allies_actions(self, b: np.ndarray) -> None:
+        """every ally who can attacks the first enemy, like AttackFirstPolicy"""
+        A = self.A
+
+        knocked = self.knocked()
+
+        while len(b):
+            can = self.present[b, :A] & ~self.played[b] & ~knocked[b]
+            b = b[can.any(1) & (self.result[b] == NO_RESULT)]
+
+            if not len(b):
+                return
+
+            can = self.present[b, :A] & ~self.played[b] & ~knocked[b]
+            ally = can.argmax(1)
+            target = A + self.present[b, A:].argmax(1)
+
+            self.played[b, ally] = True
+
+            # the allies have different effects, so one pass per ally slot
+            for slot in range(A):
+                mine = ally == slot
+                if not mine.any():
+                    continue
+
+                battles, victims = b[mine], target[mine]
+                self.deal_damage(
+                    battles, victims, self.damage[battles, slot], self.ally_hit[slot]
+                )
+                self.apply(battles, np.full(len(battles), slot), self.ally_buff[slot])
+
+            self.death_check(b)
+
+            knocked = self.knocked()
+
+    def knocked(self) -> np.ndarray:
+        """(N, A) mask of the allies who cant act"""
+        knocked = np.zeros((self.K, self.A), bool)
+        for kind in self.knocks:
+            knocked |= self.active[kind, :, : self.A]
+        return knocked
+
+    def enemies_turn(self, b: np.ndarray) -> None:
+        A = self.A
+
+        self.tick(b, allies=False)
+        self.end_of_turn(b, allies=False)
+
+        # the enemies alive when the attacks start, in order
+        occupant = self.occupant[b, A:].copy()
+        present = self.present[b, A:].copy()
+
+        for enemy in range(self.E):
+            slot = A + enemy
+            attacks = (
+                present[:, enemy]
+                & self.present[b, slot]
+                & (self.occupant[b, slot] == occupant[:, enemy])
+                & (self.result[b] == NO_RESULT)
+            )
+            battles = b[attacks]
+
+            if not len(battles):
+                continue
+
+            # the lowest health ally, the first one on ties, see Enemy.set_target
+            hp = np.where(self.present[battles, :A], self.hp[battles, :A], NEVER)
+            target = hp.argmin(1)
+
+            self.deal_damage(
+                battles, target, self.damage[battles, slot], self.enemy_hit
+            )
+            self.apply(battles, np.full(len(battles), slot), self.enemy_buff)
+            self.death_check(battles)
+
+    def run(self, max_turns: int) -> np.ndarray:
+        """
+        play every battle until it ends or `max_turns` rounds were played,
+        like Battlefield.run, -> the result of every battle,
+        NO_RESULT, LOST or WON
+        """
+        everything = np.arange(self.K)
+
+        while True:
+            b = everything[(self.result == NO_RESULT) & (self.turn < max_turns)]
+            if not len(b):
+                return self.result
+
+            self.allies_turn(b)
+            self.allies_actions(b[self.result[b] == NO_RESULT])
+            self.enemies_turn(b[self.result[b] == NO_RESULT])
+
+
+def percent(value: np.ndarray, pct: np.ndarray) -> np.ndarray:
+    """dmg.percent of arrays, truncated toward 0 the same way"""
+    scaled = value * pct
+    return np.sign(scaled) * (np.abs(scaled) // 100)
+
+
+def dummy_wave_arrays(seeds: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    battle.dummy_waves(BattleRNG(seed)) for every seed as (hp, damage) arrays
+    of shape (len(seeds), 97, 7), without building any Enemy
+
+    BattleRNG serves the draws of random.Random(seed) in order, both are
+    the mersenne twister, so numpy's MT19937 gets the state random.Random(seed)
+    starts with and makes the same floats, all draws of a seed in one go
+    """
+    waves, enemies = len(DUMMY_LEVELS), DUMMY_ENEMIES
+    draws = waves * enemies * 2  # health then damage, for every enemy
+
+    floats = np.empty((len(seeds), draws))
+    bits = np.random.MT19937()
+    generator = np.random.Generator(bits)
+
+    for i, seed in enumerate(seeds):
+        _, (*key, pos), _ = random.Random(seed).getstate()
+
+        bits.state = {
+            "bit_generator": "MT19937",
+            "state": {"key": np.array(key, dtype=np.uint32), "pos": pos},
+        }
+        floats[i] = generator.random(draws)
+
+    # choice(range(mul - spread, mul + spread + 1, spread)) of 3 values,
+    # mul = level * 10
+    picks = (floats * 3).astype(np.int64).reshape(len(seeds), waves, enemies, 2)
+    mul = np.asarray(DUMMY_LEVELS, dtype=np.int64)[None, :, None, None] * 10
+    rolled = mul - DUMMY_SPREAD + picks * DUMMY_SPREAD
+
+    hp = np.full((len(seeds), waves + 1, enemies), DUMMY_FIRST, np.int64)
+    damage = np.full((len(seeds), waves + 1, enemies), DUMMY_FIRST, np.int64)
+    hp[:, 1:] = rolled[..., 0]
+    damage[:, 1:] = rolled[..., 1]
+
+    return hp, damage
+
+
+# cross validation against the object engine
+
+
+def make_effect(kind: int, turns: int, strength: int):
+    from effects import (
+        DamageBuff,
+        DamageDebuff,
+        Freeze,
+        GooeyPoison,
+        Healing,
+        Knock,
+        Shield,
+        ThornyPoison,
+        ToxicPoison,
+        Weaken,
+    )
+
+    name = KINDS[kind]
+
+    if kind in (SHIELD, WEAKEN, DAMAGE_BUFF, DAMAGE_DEBUFF):
+        cls = {
+            SHIELD: Shield,
+            WEAKEN: Weaken,
+            DAMAGE_BUFF: DamageBuff,
+            DAMAGE_DEBUFF: DamageDebuff,
+        }[kind]
+        return cls(name=name, turns=turns, effectiveness=strength)
+
+    if kind in (TOXIC, THORNY, GOOEY):
+        cls = {TOXIC: ToxicPoison, THORNY: ThornyPoison, GOOEY: GooeyPoison}[kind]
+        return cls(name=name, turns=turns, damage=strength)
+
+    if kind == HEALING:
+        return Healing(name=name, turns=turns, healing=strength)
+
+    return (Knock if kind == KNOCK else Freeze)(name=name, turns=turns)
+
+
+def object_battle(
+    allies: Sequence[UnitSpec],
+    seed: int,
+    enemy_hit: Sequence[EffectSpec] = (),
+    enemy_buff: Sequence[EffectSpec] = (),
+    chili: int = 0,
+) -> Battlefield:
+    """the battle VectorBattles.from_seeds models for `seed`, in the object engine"""
+    from battle import Ally, Battlefield, dummy_waves, silent
+    from enemies import Enemy
+    from rng import BattleRNG
+
+    class SpecAlly(Ally):
+        def __init__(self, name: str, spec: UnitSpec) -> None:
+            self.name = self.clsname = name
+            self.TOTAL_HP = self._hp = spec.hp
+            self.is_ally = True
+            self.neg_effects = {}
+            self.pos_effects = {}
+            self.spec = spec
+            self.hit = compile_effects(spec.hit)
+            self.buff = compile_effects(spec.buff)
+
+        def attack(self, target: Enemy) -> None:
+            target.deal_damage(
+                self.spec.damage, self, [make_effect(*e) for e in self.hit]
+            )
+            self.add_pos_effects(*[make_effect(*e) for e in self.buff])
+            self.battle.death_check()
+
+    class SpecEnemy(Enemy):
+        def attack(self) -> None:
+            self.set_target()
+            self.current_target.deal_damage(
+                self.damage, self, [make_effect(*e) for e in hit]
+            )
+            self.add_pos_effects(*[make_effect(*e) for e in buff])
+
+    hit = compile_effects(enemy_hit)
+    buff = compile_effects(enemy_buff)
+
+    rng = BattleRNG(seed)
+    waves = [
+        [SpecEnemy(enemy.name, enemy.TOTAL_HP, enemy.damage) for enemy in wave]
+        for wave in dummy_waves(rng)
+    ]
+
+    return Battlefield(
+        *waves,
+        allies=[SpecAlly(f"ally{i}", spec) for i, spec in enumerate(allies)],
+        echo=silent,
+        chili=chili,
+        rng=rng,
+    )
+
+
+def cross_validate(
+    allies: Sequence[UnitSpec],
+    seeds: Sequence[int],
+    max_turns: int = 50,
+    enemy_hit: Sequence[EffectSpec] = (),
+    enemy_buff: Sequence[EffectSpec] = (),
+    chili: int = 0,
+) -> list[int]:
+    """
+    play the same seeded battles in both engines
+    -> the seeds whose outcome, turn, wave, chili, health
+    or effects (with their remaining turns) differ, empty when they agree
+    """
+    from policies import AttackFirstPolicy
+
+    vector = VectorBattles.from_seeds(allies, seeds, enemy_hit, enemy_buff, chili)
+    vector.run(max_turns)
+
+    mismatches = []
+
+    for i, seed in enumerate(seeds):
+        battle = object_battle(allies, seed, enemy_hit, enemy_buff, chili)
+
+        battle.run(AttackFirstPolicy(), max_turns=max_turns)
+
+        if state_of(battle) != vector_state_of(vector, i):
+            mismatches.append(seed)
+
+    return mismatches
+
+
+def state_of(battle: Battlefield) -> tuple:
+    from battle import result
+
+    outcome = {result.no_result: NO_RESULT, result.lost: LOST, result.won: WON}
+
+    units = tuple(
+        (
+            unit.hp,
+            unit.TOTAL_HP,
+            frozenset(
+                (effect.name, battle.expiry.remaining(unit, effect))
+                for effect in unit.effects.values()
+            ),
+        )
+        for unit in battle.units.values()
+    )
+
+    return outcome[battle.result], battle.turn, battle.wave_int, battle.chili, units
+
+
+def vector_state_of(vector: VectorBattles, i: int) -> tuple:
+    # remaining turns are counted down in place, effects without turns have None
+    units = tuple(
+        (
+            int(vector.hp[i, slot]),
+            int(vector.total_hp[i, slot]),
+            frozenset(
+                (
+                    KINDS[kind],
+                    int(vector.turns[kind, i, slot])
+                    if vector.turns[kind, i, slot] > 0
+                    else None,
+                )
+                for kind in np.nonzero(vector.active[:, i, slot])[0]
+            ),
+        )
+        for slot in np.nonzero(vector.present[i])[0]
+    )
+
+    return (
+        int(vector.result[i]),
+        int(vector.turn[i]),
+        int(vector.wave[i]) + 1,
+        int(vector.chili[i]),
+        units,
+    )
@@ -36,6 +36,18 @@ class View(ABC):
         if self._hp > self.TOTAL_HP:
             self._hp = self.TOTAL_HP
 
+        battle = getattr(self, "battle", None)
+        if battle is None:
+            return
+
+        if self._hp <= 0:  # for the next death_check
+            battle.dying[self.id] = self
+
+        battle.units.hp_changed(self)
+
+        if battle.journal is not None:
+            battle.journal.hp(self)
+
     def view(self) -> str:  # probably deprecated
         """Obsolete method, formatting is gonna made a different way a i think"""
         return f"{self.name} - {self.hp}/{self.TOTAL_HP}"  # type: ignore
@@ -47,19 +59,52 @@ class View(ABC):
     def effects(self):
         return self.pos_effects | self.neg_effects
 
+    def store_effect(self, effect: Effect) -> None:
+        """
+        put an already set up `effect` in its effect dictionary,
+        register it to the battle's hooks and schedule its expiry
+        """
+        effects = self.pos_effects if effect.is_pos else self.neg_effects
+
+        old = effects.get(effect.name)
+        if old is not None:
+            self.battle.hooks.unregister(self, old)
+
+        effects[effect.name] = effect
+        self.battle.hooks.register(self, effect)
+        self.battle.expiry.schedule(self, effect)
+
+        if self.battle.journal is not None:
+            self.battle.journal.effect_added(self, effect)
+
+    def remove_effect(self, effect: Effect) -> None:
+        """remove `effect` from its effect dictionary and from the battle's hooks"""
+        effects = self.pos_effects if effect.is_pos else self.neg_effects
+
+        # XXX EFFECTS CAN HAVE SAME NAME, dont remove the one which replaced it
+        if effects.get(effect.name) is not effect:
+            return
+
+        del effects[effect.name]
+        self.battle.hooks.unregister(self, effect)
+        self.battle.expiry.cancel(self, effect)
+
+        if self.battle.journal is not None:
+            self.battle.journal.effect_removed(self, effect)
+
     def cleanse(self):
         for effect in list(self.neg_effects.values()):
             if not effect.can_cleanse:
                 continue
             effect.on_cleanse()
-            del self.neg_effects[effect.name]
+            self.remove_effect(effect)
 
     def dispell(self):
         for effect in list(self.pos_effects.values()):
             if not effect.can_dispell:
                 continue
             effect.on_dispell()
-            del self.pos_effects[effect.name]
+            self.remove_effect(effect)
 
     def deal_damage[T: View](
         self,
@@ -104,11 +149,12 @@ class View(ABC):
 
         target = self if direct else self.get_target(source)
 
-        for effect_vals in [eff.effects.values() for eff in self.battle.units.values()]:
-            for effect in effect_vals:
-                target, source, damage, effects = effect.on_hit(
-                    target, source, damage, effects
-                )
+        hooks = self.battle.hooks
+
+        for effect in hooks["on_hit"]:
+            target, source, damage, effects = effect.on_hit(
+                target, source, damage, effects
+            )
 
         # print(
         #    f"new: damage={damage}, effects={', '.join(effect.name for effect in effects)}"
@@ -117,14 +163,16 @@ class View(ABC):
         # print(f"old: {self.battle.chili=}, {target.hp=}")
         self.battle.chili += 5
         target.hp -= damage
+
+        if self.battle.journal is not None:
+            self.battle.journal.damage(source, target, damage)
         # print(f"new: {self.battle.chili=}, {target.hp=}")
 
         effects = list(target.add_neg_effects(*effects))
         # print(f"actual effects: {', '.join(effect.name for effect in effects)}\n")
 
-        for effect_vals in [eff.effects.values() for eff in self.battle.units.values()]:
-            for effect in effect_vals:
-                effect.after_hit(target, source, damage, effects)
+        for effect in hooks["after_hit"]:
+            effect.after_hit(target, source, damage, effects)
 
         return target, source, damage, effects
 
@@ -132,19 +180,22 @@ class View(ABC):
         heal = int(heal)
         # print(f"An unknown source tries to heal {self.name}, heal={heal}")
         target = self
-        for effect_vals in [eff.effects.values() for eff in self.battle.units.values()]:
-            for effect in effect_vals:
-                heal = effect.on_heal(target=target, heal=heal)
+        hooks = self.battle.hooks
+
+        for effect in hooks["on_heal"]:
+            heal = effect.on_heal(target=target, heal=heal)
 
         # print(f"Actual heal: {heal}")
 
         # print(f"old: {target.hp=}")
         target.hp += heal
+
+        if self.battle.journal is not None:
+            self.battle.journal.heal(target, heal)
         # print(f"new: {target.hp=}")
 
-        for effect_vals in [eff.effects.values() for eff in self.battle.units.values()]:
-            for effect in effect_vals:
-                effect.after_heal(target=target, heal=heal)
+        for effect in hooks["after_heal"]:
+            effect.after_heal(target=target, heal=heal)
 
     def get_target(self, attacker: View) -> Self | View:
         """
@@ -181,20 +232,20 @@ class View(ABC):
 
             for _effect in self.neg_effects.values():
                 if type(effect) is type(_effect):
-                    to_delete.append(_effect.name)
+                    to_delete.append(_effect)
 
-            for name in to_delete:
-                del self.neg_effects[name]
+            for _effect in to_delete:
+                self.remove_effect(_effect)
 
             effect.wearer = self
             effect.is_pos = False  # if its an undefined effect
 
             yield effect
-            self.neg_effects[effect.name] = effect
+            self.store_effect(effect)
             effect.on_enter()
 
     def add_pos_effects(self, *effects: Effect) -> list[Effect]:
-        print(f"called add pos effect with '{effects}'")
+        self.battle.log.debug("called add pos effect with '{}'", effects)
         return_list = []
 
         for effect in effects:
@@ -207,17 +258,19 @@ class View(ABC):
 
             for _effect in self.pos_effects.values():
                 if type(effect) is type(_effect):
-                    to_delete.append(_effect.name)
+                    to_delete.append(_effect)
 
-            for name in to_delete:
-                del self.pos_effects[name]
+            for _effect in to_delete:
+                self.remove_effect(_effect)
 
             effect.wearer = self
             effect.is_pos = True  # if its an undefined effect
             return_list.append(effect)
 
-            self.pos_effects[effect.name] = effect
-            print(f"calling on enter for class {effect.__class__.__name__}")
+            self.store_effect(effect)
+            self.battle.log.debug(
+                "calling on enter for class {}", effect.__class__.__name__
+            )
             effect.on_enter()
 
         return return_list
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import weakref
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Final
+
+# the waves of a battle, pulled one at a time, see WaveStream
+
+if TYPE_CHECKING:
+    from battle import Battlefield
+    from enemies import Enemy
+
+# the dummy testing waves, battle.dummy_waves rolls them
+# and vector.dummy_wave_arrays rolls the same ones as arrays
+
+DUMMY_ENEMIES: Final = 7  # in every wave
+DUMMY_FIRST: Final = 10  # the health and damage of the weak first wave
+# the waves after it, a wave's health and damage are level * 10, give or take
+DUMMY_LEVELS: Final = range(5, 101)
+DUMMY_SPREAD: Final = 20  # a roll is this much less, the same or this much more
+
+
+class WaveStream:
+    """
+    the waves of a battle, pulled from `source` one at a time
+    when the battle gets to them, so `source` can be a generator
+    of as many waves as a campaign or an endless mode wants
+
+    a wave is kept until every battle reading the stream is past it,
+    a battle and its forks (see Battlefield.fork) read the same stream
+    and play the same waves, only the waves between the slowest
+    and the fastest of them stay in memory
+
+    `source` should not roll with a battle's rng, the forks would
+    pull the waves at different points of the battle,
+    give it an rng of its own (see BattleRNG.split)
+    """
+
+    def __init__(self, source: Iterable[list[Enemy]]) -> None:
+        self.source = iter(source)
+        self.buffer: list[list[Enemy]] = []
+        self.start = 0  # the index of the wave in buffer[0]
+        self.exhausted = False
+        # the battles reading this stream, a fork which gets thrown away stops counting
+        self.readers: weakref.WeakSet[Battlefield] = weakref.WeakSet()
+
+    def add_reader(self, battle: Battlefield) -> None:
+        self.readers.add(battle)
+
+    def remove_reader(self, battle: Battlefield) -> None:
+        """`battle` is done reading, see Battlefield.close"""
+        self.readers.discard(battle)
+
+    def shared(self) -> bool:
+        """if more than one battle reads the stream"""
+        return len(self.readers) > 1
+
+    def get(self, index: int) -> list[Enemy] | None:
+        """the wave at `index`, starting at 0, or None past the last wave"""
+        if index < self.start:
+            raise IndexError(f"Wave {index} was already released")
+
+        while index >= self.start + len(self.buffer):
+            if self.exhausted:
+                return None
+
+            wave = next(self.source, None)
+
+            if wave is None:
+                self.exhausted = True
+                return None
+
+            self.buffer.append(list(wave))
+
+        return self.buffer[index - self.start]
+
+    def release(self) -> None:
+        """forget the waves every reader is past"""
+        # Battlefield.wave_int is the index of the next wave
+        needed = min((battle.wave_int for battle in self.readers), default=self.start)
+        if needed > self.start:
+            del self.buffer[: needed - self.start]
+            self.start = needed